@@ -0,0 +1,199 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Plans describing how to extract results from the logs of an experiment
+
+Every experiment defines the same set of success criteria, figures of merit
+(FOMs), and FOM contexts as the other experiments of its application,
+workload, and modifiers. Their unexpanded definitions are collected once into
+an AnalysisTemplate, which is shared by all of these experiments (and their
+repeats), together with the regular expressions compiled for them.
+
+Each experiment expands a template into an AnalysisPlan, with the log paths
+and patterns of that experiment. Plans are kept by their experiment, and
+reused by setup, archive, and analyze until the variables of the experiment,
+its template, or the workspace success criteria change.
+"""
+
+import functools
+import os
+import re
+
+#: Maximum number of distinct compiled patterns to keep
+regex_cache_size = 4096
+
+#: Shared templates, keyed by application class, workload, modifiers, and
+#: the contents of their definitions
+_templates = {}
+
+
+@functools.lru_cache(maxsize=regex_cache_size)
+def compile_regex(pattern):
+    """Compile (with caching) a regular expression used in analysis
+
+    Unlike re.compile, the cache is not limited to a few hundred patterns,
+    which large workspaces with many applications would exceed.
+
+    Args:
+        pattern (str): Regular expression to compile
+
+    Returns:
+        (re.Pattern): The compiled regular expression
+    """
+    return re.compile(pattern)
+
+
+def shared_template(key, build):
+    """The template shared by experiments with the same key
+
+    Args:
+        key (tuple): Application class, workload, modifiers, and a signature
+            of their analysis definitions
+        build (function): Builds the template, if none exists for key yet
+
+    Returns:
+        (AnalysisTemplate): The shared template
+    """
+    template = _templates.get(key)
+    if template is None:
+        template = build()
+        _templates[key] = template
+    return template
+
+
+class AnalysisTemplate:
+    """Unexpanded success criteria, FOMs, and FOM contexts
+
+    Attributes:
+        criteria (list(tuple)): Scope, name, and definition of each success
+            criteria of the application and its modifiers
+        foms (dict): Definition of each FOM, with the index of the modifier
+            defining it (None for FOMs of the application)
+        contexts (dict): Definition of each FOM context
+        has_modifiers (bool): Whether any modifiers are applied
+    """
+
+    def __init__(self, criteria, foms, contexts, has_modifiers):
+        self.criteria = criteria
+        self.foms = foms
+        self.contexts = contexts
+        self.has_modifiers = has_modifiers
+        self._regexes = {}
+
+    def compile(self, pattern):
+        """Compiled regular expression of an expanded pattern
+
+        Args:
+            pattern (str): Regular expression to compile
+
+        Returns:
+            (re.Pattern): The compiled regular expression, shared by every
+            experiment using this template
+        """
+        regex = self._regexes.get(pattern)
+        if regex is None:
+            regex = compile_regex(pattern)
+            self._regexes[pattern] = regex
+        return regex
+
+
+class AnalysisPlan:
+    """Files, FOM contexts, and FOMs to extract from an experiment's logs
+
+    Attributes:
+        files (dict): Log files, mapped to the names of the success criteria,
+                      contexts, and FOMs to find in them
+        contexts (dict): Compiled regex and output format of each context
+        foms (dict): Compiled regex and attributes of each FOM
+        template (AnalysisTemplate): Template the plan was expanded from
+        criteria (list(tuple)): Scope, name, and expanded definition of each
+            success criteria of the application and its modifiers
+        variables: Snapshot of the experiment's variables the plan was
+            expanded with
+        criteria_signature (tuple): Signature of the workspace success
+            criteria the plan was built with
+        missing_files (list(str)): Success criteria files which did not exist
+            when the plan was built, and are not part of it
+    """
+
+    def __init__(
+        self,
+        files,
+        contexts,
+        foms,
+        template=None,
+        criteria=None,
+        variables=None,
+        criteria_signature=None,
+        missing_files=None,
+    ):
+        self.files = files
+        self.contexts = contexts
+        self.foms = foms
+        self.template = template
+        self.criteria = criteria or []
+        self.variables = variables
+        self.criteria_signature = criteria_signature
+        self.missing_files = missing_files or []
+
+    def is_valid(self, template, expander, criteria_list):
+        """Test if the plan still applies to an experiment
+
+        Args:
+            template (AnalysisTemplate): Current template of the experiment
+            expander (Expander): Expander of the experiment
+            criteria_list (ScopedCriteriaList): Current success criteria
+
+        Returns:
+            (bool): True if expanding the template again would build the same plan
+        """
+        return (
+            template is self.template
+            and criteria_list.signature() == self.criteria_signature
+            and expander.variables_match(self.variables)
+            and not any(os.path.exists(path) for path in self.missing_files)
+        )
+
+    def populate_criteria(self, criteria_list):
+        """Define the application and modifier success criteria of this plan
+
+        The criteria are only defined again when criteria_list holds those of
+        another plan.
+
+        Args:
+            criteria_list (ScopedCriteriaList): Criteria to populate
+        """
+        if criteria_list.definition_plan is self:
+            return
+
+        criteria_list.flush_scope("application_definition")
+        if self.template is not None and self.template.has_modifiers:
+            criteria_list.flush_scope("modifier_definition")
+
+        for scope, name, conf in self.criteria:
+            criteria_list.add_criteria(scope, name, **conf)
+        criteria_list.definition_plan = self
+
+    def file_regexes(self, file, criteria_list):
+        """All regular expressions which are applied to the lines of a file
+
+        Args:
+            file (str): Log file, which must be a key of self.files
+            criteria_list (ScopedCriteriaList): Criteria the plan was built with
+
+        Returns:
+            (tuple): Regular expressions, in the order they are tested
+        """
+        file_conf = self.files[file]
+        regexes = []
+        for crit_name in file_conf["success_criteria"]:
+            crit_obj = criteria_list.find_criteria(crit_name)
+            regexes.append(crit_obj.match if crit_obj.match is not None else crit_obj.anti_match)
+        regexes.extend(self.contexts[c]["regex"] for c in file_conf["contexts"])
+        regexes.extend(self.foms[fom]["regex"] for fom in file_conf["foms"])
+        return tuple(regexes)
@@ -16,6 +16,7 @@ import string
 import shutil
 import fnmatch
 import time
+import weakref
 from typing import List
 
 import llnl.util.filesystem as fs
@@ -26,6 +27,7 @@ import spack.util.spack_json
 import spack.util.environment
 import spack.util.compression
 
+import ramble.analysis_plan
 import ramble.config
 import ramble.graphs
 import ramble.stage
@@ -41,6 +43,7 @@ import ramble.success_criteria
 import ramble.util.executable
 import ramble.util.colors as rucolor
 import ramble.util.hashing
+import ramble.util.log_scanner
 import ramble.util.env
 import ramble.util.directives
 import ramble.util.stats
@@ -97,6 +100,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
     _builtin_required_key = "required"
     _inventory_file_name = "ramble_inventory.json"
     _status_file_name = "ramble_status.json"
+    _analysis_record_file_name = "ramble_analysis.json"
     _pipelines = [
         "analyze",
         "archive",
@@ -131,7 +135,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
         self.experiment_set = None
         self.internals = {}
         self.is_template = False
-        self.generated_experiments = []
+        self.generated_experiments = weakref.WeakSet()
         self.repeats = ramble.repeats.Repeats()
         self._command_list = []
         self.chained_experiments = None
@@ -153,6 +157,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
         self._input_lock = None
         self._software_lock = None
         self._experiment_graph = None
+        self._cached_analysis_plan = None
 
         self.hash_inventory = {
             "application_definition": None,
@@ -191,7 +196,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
     def copy(self):
         """Deep copy an application instance"""
         new_copy = type(self)(self._file_path)
-        self.generated_experiments.append(new_copy)
+        self.generated_experiments.add(new_copy)
 
         if self._env_variable_sets:
             new_copy.set_env_variable_sets(self._env_variable_sets.copy())
@@ -517,7 +522,9 @@ class ApplicationBase(metaclass=ApplicationMeta):
             del self.variables[var]
 
         for var, val in backup_variables.items():
-            self.variables[var] = val
+            # Avoid materializing unchanged variables from shared parent scopes
+            if var not in self.variables or self.variables[var] is not val:
+                self.variables[var] = val
 
         self._command_list = []
 
@@ -587,7 +594,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
         start_time = time.time()
         for mod_inst in self._modifier_instances:
             mod_inst.run_phase_hook(workspace, pipeline, phase)
-        phase_func = phase_node.attribute
+        phase_func = self._pipeline_graphs[pipeline].phase_function(phase)
         phase_func(workspace, app_inst=self)
         self._phase_times[phase] = time.time() - start_time
 
@@ -728,7 +735,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
                         self.expander.expand_var_name(self.keywords.experiment_index)
                     )
                     new_inst.repeats = self.repeats
-                    new_inst.read_status()
+                    new_inst.read_status(workspace)
 
                     # Extract inherited variables
                     if namespace.inherit_variables in cur_exp_def:
@@ -1248,6 +1255,40 @@ class ApplicationBase(metaclass=ApplicationMeta):
 
                 stage.cache_mirror(workspace.input_mirror_cache, workspace.input_mirror_stats)
 
+    def _input_path(self, input_conf):
+        """Path an input is fetched into"""
+        input_vars = {self.keywords.input_name: input_conf["input_name"]}
+        return self.expander.expand_var(input_conf["target_dir"], extra_vars=input_vars)
+
+    def input_downloads(self, workspace):
+        """Inputs the get_inputs phase would download into the fetch cache
+
+        Inputs without a checksum are not stored in the fetch cache, and are
+        skipped. So are inputs which a previous setup fetched into the same
+        path.
+
+        Yields:
+            (tuple): The input's fetcher, and its paths within the fetch cache
+            and mirrors (as a MirrorReference)
+        """
+        self.add_expand_vars(workspace)
+        self._inputs_and_fetchers(self.expander.workload_name)
+
+        for input_file, input_conf in self._input_fetchers.items():
+            fetcher = input_conf["fetcher"]
+            if not fetcher.cachable:
+                continue
+
+            input_path = self._input_path(input_conf)
+            digest_tuple = ("input-file", fetcher.digest, input_path)
+            if os.path.exists(input_path) and workspace.check_cache(digest_tuple, persistent=True):
+                continue
+
+            mirror_paths = ramble.mirror.mirror_archive_paths(
+                fetcher, os.path.join(self.name, input_file)
+            )
+            yield fetcher, mirror_paths
+
     register_phase("get_inputs", pipeline="setup")
 
     def _get_inputs(self, workspace, app_inst=None):
@@ -1261,17 +1302,25 @@ class ApplicationBase(metaclass=ApplicationMeta):
 
         for input_file, input_conf in self._input_fetchers.items():
             if not workspace.dry_run:
-                input_vars = {self.keywords.input_name: input_conf["input_name"]}
                 input_namespace = workload_namespace + "." + input_file
-                input_path = self.expander.expand_var(
-                    input_conf["target_dir"], extra_vars=input_vars
-                )
+                input_path = self._input_path(input_conf)
                 input_tuple = (f"input-file-{input_file}", input_path)
 
                 # Skip inputs that have already been cached
                 if workspace.check_cache(input_tuple):
                     continue
 
+                # Skip inputs with a known digest which a previous run already
+                # fetched into the same path
+                digest_tuple = None
+                if input_conf["fetcher"].digest:
+                    digest_tuple = ("input-file", input_conf["fetcher"].digest, input_path)
+                    if os.path.exists(input_path) and workspace.check_cache(
+                        digest_tuple, persistent=True
+                    ):
+                        workspace.add_to_cache(input_tuple)
+                        continue
+
                 mirror_paths = ramble.mirror.mirror_archive_paths(
                     input_conf["fetcher"], os.path.join(self.name, input_file)
                 )
@@ -1301,6 +1350,8 @@ class ApplicationBase(metaclass=ApplicationMeta):
                                 pass
 
                 workspace.add_to_cache(input_tuple)
+                if digest_tuple is not None:
+                    workspace.add_to_cache(digest_tuple, persistent=True)
             else:
                 logger.msg(f'DRY-RUN: Would download {input_conf["fetcher"].url}')
 
@@ -1410,13 +1461,24 @@ class ApplicationBase(metaclass=ApplicationMeta):
         experiment_run_dir = self.expander.experiment_run_dir
         inventory_file = os.path.join(experiment_run_dir, self._inventory_file_name)
 
-        if os.path.exists(inventory_file) and not force_compute:
+        # Index records are only trusted while the run directory they
+        # describe exists, as it may be removed outside of ramble
+        inventory = None
+        if not force_compute and os.path.isdir(experiment_run_dir):
+            inventory = workspace.experiment_index.get(
+                self._experiment_index_key(workspace), "inventory"
+            )
+
+        if inventory is not None:
+            self.hash_inventory = inventory
+
+        elif os.path.exists(inventory_file) and not force_compute:
             with open(inventory_file) as f:
                 self.hash_inventory = spack.util.spack_json.load(f)
 
         else:
             # Clean up variables before hashing
-            vars_to_hash = self.variables.copy()
+            vars_to_hash = dict(self.variables)
             self._clean_hash_variables(workspace, vars_to_hash)
 
             # Build inventory of attributes
@@ -1507,6 +1569,10 @@ class ApplicationBase(metaclass=ApplicationMeta):
             with open(inventory_file, "w+") as f:
                 spack.util.spack_json.dump(self.hash_inventory, f)
 
+        workspace.experiment_index.update(
+            self._experiment_index_key(workspace), "inventory", self.hash_inventory
+        )
+
     register_phase("archive_experiments", pipeline="archive")
 
     def _archive_experiments(self, workspace, app_inst=None):
@@ -1517,53 +1583,62 @@ class ApplicationBase(metaclass=ApplicationMeta):
         - Rendered templates within the experiment directory
         - All files that contain a figure of merit or success criteria
         - Any files that match an archive pattern
+
+        Files are added to the workspace's archiver, which writes them once
+        all experiments have been processed.
         """
         import glob
 
+        archiver = workspace.archiver
         experiment_run_dir = self.expander.experiment_run_dir
-        ws_archive_dir = workspace.latest_archive_path
+        archive_experiment_dir = os.path.relpath(experiment_run_dir, workspace.root)
 
-        archive_experiment_dir = experiment_run_dir.replace(workspace.root, ws_archive_dir)
+        experiment_namespace = self.expander.experiment_namespace
+        archiver.add_experiment(experiment_namespace, self.experiment_hash)
 
-        fs.mkdirp(archive_experiment_dir)
-
-        archive_lock = lk.Lock(os.path.join(archive_experiment_dir, ".ramble-exp-archive"))
+        def _add_file(file, dest_dir=None):
+            if dest_dir is None:
+                dest = os.path.relpath(file, workspace.root)
+                if dest.startswith(os.pardir):
+                    logger.debug(f"Not archiving {file}, which is outside of the workspace")
+                    return
+            else:
+                dest = os.path.join(dest_dir, os.path.basename(file))
+            archiver.add_file(file, dest, experiment=experiment_namespace)
 
-        with lk.WriteTransaction(archive_lock):
-            # Copy all of the templates to the archive directory
-            for template_name, _ in workspace.all_templates():
-                src = os.path.join(experiment_run_dir, template_name)
-                if os.path.exists(src):
-                    shutil.copy(src, archive_experiment_dir)
+        # Archive all of the templates
+        for template_name, _ in workspace.all_templates():
+            src = os.path.join(experiment_run_dir, template_name)
+            if os.path.exists(src):
+                _add_file(src, archive_experiment_dir)
 
-            # Copy all figure of merit files
-            criteria_list = workspace.success_list
-            analysis_files, _, _ = self._analysis_dicts(criteria_list)
-            for file, file_conf in analysis_files.items():
-                if os.path.exists(file):
-                    shutil.copy(file, archive_experiment_dir)
+        # Archive all figure of merit files
+        criteria_list = workspace.success_list
+        analysis_files, _, _ = self._analysis_dicts(criteria_list)
+        for file, file_conf in analysis_files.items():
+            if os.path.exists(file):
+                _add_file(file, archive_experiment_dir)
 
-            # Copy all archive patterns
-            archive_patterns = set(self.archive_patterns.keys())
-            if self.package_manager:
-                for pattern in self.package_manager.archive_patterns.keys():
-                    archive_patterns.add(pattern)
+        # Archive all archive patterns
+        archive_patterns = set(self.archive_patterns.keys())
+        if self.package_manager:
+            for pattern in self.package_manager.archive_patterns.keys():
+                archive_patterns.add(pattern)
 
-            for mod in self._modifier_instances:
-                for pattern in mod.archive_patterns.keys():
-                    archive_patterns.add(pattern)
+        for mod in self._modifier_instances:
+            for pattern in mod.archive_patterns.keys():
+                archive_patterns.add(pattern)
 
-            for pattern in archive_patterns:
-                exp_pattern = self.expander.expand_var(pattern)
-                for file in glob.glob(exp_pattern):
-                    dest_dir = os.path.dirname(file.replace(workspace.root, ws_archive_dir))
-                    fs.mkdirp(dest_dir)
-                    shutil.copy(file, dest_dir)
+        for pattern in archive_patterns:
+            exp_pattern = self.expander.expand_var(pattern)
+            for file in glob.glob(exp_pattern):
+                if os.path.isfile(file):
+                    _add_file(file)
 
-            for file_name in [self._inventory_file_name, self._status_file_name]:
-                file = os.path.join(experiment_run_dir, file_name)
-                if os.path.exists(file):
-                    shutil.copy(file, archive_experiment_dir)
+        for file_name in [self._inventory_file_name, self._status_file_name]:
+            file = os.path.join(experiment_run_dir, file_name)
+            if os.path.exists(file):
+                _add_file(file, archive_experiment_dir)
 
     register_phase("prepare_analysis", pipeline="analyze")
 
@@ -1617,12 +1692,25 @@ class ApplicationBase(metaclass=ApplicationMeta):
 
         fom_values = {}
 
+        # Expanded FOM names, keyed by FOM and the groups it matched
+        fom_names = {}
+
         criteria_list = workspace.success_list
 
-        files, contexts, foms = self._analysis_dicts(criteria_list)
+        plan = self._analysis_plan(criteria_list)
+        files, contexts, foms = plan.files, plan.contexts, plan.foms
+
+        # Criteria from workspace level scopes are shared between experiments,
+        # so clear matches from any previously analyzed experiment.
+        for criteria_obj in criteria_list.all_criteria():
+            criteria_obj.reset()
 
         exp_lock = self.experiment_lock()
 
+        fingerprint = self._analysis_fingerprint(files, contexts, foms, criteria_list)
+        if workspace.incremental_analysis and self._reuse_analysis(workspace, fingerprint):
+            return
+
         # Iterate over files. We already know they exist
         with lk.ReadTransaction(exp_lock):
             for file, file_conf in files.items():
@@ -1639,8 +1727,14 @@ class ApplicationBase(metaclass=ApplicationMeta):
                     criteria_list.find_criteria(c) for c in file_conf["success_criteria"]
                 ]
 
+                # Only lines which could match a criteria, context, or FOM
+                # regex are processed below.
+                scanner = ramble.util.log_scanner.LogScanner(
+                    plan.file_regexes(file, criteria_list)
+                )
+
                 with open(file) as f:
-                    for line in f.readlines():
+                    for line in scanner.lines(f):
                         logger.debug(f"Line: {line}")
                         new_per_file_crit_objs = []
                         for crit_obj in per_file_crit_objs:
@@ -1675,10 +1769,13 @@ class ApplicationBase(metaclass=ApplicationMeta):
                             fom_match = fom_conf["regex"].match(line)
 
                             if fom_match:
-                                fom_vars = {}
-                                for k, v in fom_match.groupdict().items():
-                                    fom_vars[k] = v
-                                fom_name = self.expander.expand_var(fom, extra_vars=fom_vars)
+                                fom_vars = fom_match.groupdict()
+                                fom_name_key = (fom, tuple(fom_vars.items()))
+                                if fom_name_key not in fom_names:
+                                    fom_names[fom_name_key] = self.expander.expand_var(
+                                        fom, extra_vars=fom_vars
+                                    )
+                                fom_name = fom_names[fom_name_key]
 
                                 if fom_conf["group"] in fom_conf["regex"].groupindex:
                                     logger.debug(" --- Matched fom %s" % fom_name)
@@ -1744,6 +1841,125 @@ class ApplicationBase(metaclass=ApplicationMeta):
 
         workspace.append_result(self.result.to_dict())
 
+        if fingerprint is not None and not workspace.dry_run:
+            self._write_analysis_record(workspace, fingerprint)
+
+    def _analysis_record_path(self):
+        return os.path.join(
+            self.expander.expand_var_name(self.keywords.experiment_run_dir),
+            self._analysis_record_file_name,
+        )
+
+    def _analysis_fingerprint(self, files, contexts, foms, criteria_list):
+        """Identify everything the analysis of this experiment depends on
+
+        The fingerprint contains the identity (size, modification time, and
+        inode) of each analyzed file, the experiment hash, and a digest of the
+        success criteria, contexts, and figures of merit used for analysis.
+
+        Returns:
+            (dict | None): The fingerprint, or None if the analysis of this
+            experiment cannot be reused (i.e. it defines a custom
+            evaluate_success function).
+        """
+        if type(self).evaluate_success is not ApplicationBase.evaluate_success:
+            return None
+
+        def pattern(regex):
+            return regex.pattern if regex is not None else None
+
+        analysis_config = {
+            "criteria": [
+                [
+                    crit.name,
+                    crit.mode,
+                    pattern(crit.match),
+                    pattern(crit.anti_match),
+                    self.expander.expand_var(crit.file) if crit.file else None,
+                    crit.fom_name,
+                    crit.fom_context,
+                    getattr(crit, "formula", None),
+                ]
+                for crit in criteria_list.all_criteria()
+            ],
+            "files": files,
+            "contexts": {
+                name: [pattern(conf["regex"]), conf["format"]] for name, conf in contexts.items()
+            },
+            "foms": {
+                name: dict(conf, regex=pattern(conf["regex"])) for name, conf in foms.items()
+            },
+        }
+
+        file_ids = {}
+        for file in sorted(files.keys()):
+            file_ids[file] = (
+                ramble.util.hashing.FileHashCache.fingerprint(os.stat(file))
+                if os.path.exists(file)
+                else None
+            )
+
+        return {
+            "files": file_ids,
+            "experiment_hash": self.experiment_hash,
+            "analysis_digest": ramble.util.hashing.hash_json(analysis_config),
+        }
+
+    def _reuse_analysis(self, workspace, fingerprint):
+        """Reuse the result of the previous analysis, if nothing changed since
+
+        Returns:
+            (bool): True if the previous result was reused, False otherwise
+        """
+        if fingerprint is None:
+            return False
+
+        record_path = self._analysis_record_path()
+        record = workspace.experiment_index.get(self._experiment_index_key(workspace), "analysis")
+        if record is None:
+            if not os.path.isfile(record_path):
+                return False
+
+            try:
+                with lk.ReadTransaction(self.experiment_lock()):
+                    with open(record_path) as f:
+                        record = spack.util.spack_json.load(f)
+            except (OSError, ValueError, spack.util.spack_json.SpackJSONError):
+                return False
+
+        if (
+            not isinstance(record, dict)
+            or record.get("fingerprint") != fingerprint
+            or record.get("status") not in experiment_status.__members__
+        ):
+            return False
+
+        logger.debug(f"Reusing analysis of unchanged experiment from {record_path}")
+        self.set_status(status=experiment_status[record["status"]])
+        self._init_result()
+        self.result.contexts = record["contexts"]
+        workspace.append_result(self.result.to_dict())
+        return True
+
+    def _write_analysis_record(self, workspace, fingerprint):
+        """Record the result of this analysis, and what it depended on"""
+        exp_dir = self.expander.expand_var_name(self.keywords.experiment_run_dir)
+        if not os.path.exists(exp_dir):
+            return
+
+        record = {
+            "fingerprint": fingerprint,
+            "status": self.get_status(),
+            "contexts": self.result.contexts,
+        }
+        with lk.WriteTransaction(self.experiment_lock()):
+            with open(self._analysis_record_path(), "w+") as f:
+                spack.util.spack_json.dump(record, f)
+
+        workspace.experiment_index.update(
+            self._experiment_index_key(workspace), "analysis", record
+        )
+
     def calculate_statistics(self, workspace):
         """Calculate statistics for results of repeated experiments
 
@@ -1949,94 +2165,169 @@ class ApplicationBase(metaclass=ApplicationMeta):
             contexts (dict): Any contexts that have been defined
             foms (dict): All figures of merit that need to be extracted
         """
+        plan = self._analysis_plan(criteria_list)
+        return plan.files, plan.contexts, plan.foms
 
-        files = {}
-        contexts = {}
-        foms = {}
+    def _analysis_template(self):
+        """Unexpanded analysis definitions of this experiment
 
-        # Add the application defined criteria
-        criteria_list.flush_scope("application_definition")
+        The template is shared by all experiments with the same application
+        class, workload, modifiers, and definitions. Definitions are part of
+        the key, as applications can add FOMs at analysis time (e.g. in
+        _prepare_analysis).
 
-        success_lists = [
-            ("application_definition", self.success_criteria),
+        Returns:
+            (AnalysisTemplate): The shared template
+        """
+        definitions = [
+            (self.success_criteria, self.figures_of_merit, self.figure_of_merit_contexts)
         ]
+        for mod in self._modifier_instances:
+            definitions.append(
+                (mod.success_criteria, mod.figures_of_merit, mod.figure_of_merit_contexts)
+            )
+        key = (
+            type(self),
+            self.expander.workload_name,
+            tuple((mod.name, mod._usage_mode) for mod in self._modifier_instances),
+            repr(definitions),
+        )
+        return ramble.analysis_plan.shared_template(key, self._build_analysis_template)
+
+    def _build_analysis_template(self):
+        """Collect the unexpanded analysis definitions of this experiment"""
+        criteria = []
+        success_lists = [("application_definition", self.success_criteria)]
 
         logger.debug(f" Number of modifiers are: {len(self._modifier_instances)}")
-        if self._modifier_instances:
-            criteria_list.flush_scope("modifier_definition")
         for mod in self._modifier_instances:
             success_lists.append(("modifier_definition", mod.success_criteria))
 
         for success_scope, success_list in success_lists:
-            for criteria, conf in success_list.items():
-                if conf["mode"] == "string":
-                    match = (
-                        self.expander.expand_var(conf["match"])
-                        if conf["match"] is not None
-                        else None
-                    )
-                    anti_match = (
-                        self.expander.expand_var(conf["anti_match"])
-                        if conf["anti_match"] is not None
-                        else None
-                    )
-                    criteria_list.add_criteria(
+            for name, conf in success_list.items():
+                criteria.append((success_scope, name, conf))
+
+        foms = {}
+        for fom, fom_def in self.figures_of_merit.items():
+            foms[fom] = dict(fom_def, origin=self.name, origin_type="application", modifier=None)
+
+        fom_contexts = self.figure_of_merit_contexts.copy()
+        for mod_idx, mod in enumerate(self._modifier_instances):
+            fom_contexts.update(mod.figure_of_merit_contexts)
+            for fom, fom_def in mod.figures_of_merit.items():
+                foms[fom] = dict(
+                    fom_def, origin=f"{mod}", origin_type="modifier", modifier=mod_idx
+                )
+
+        return ramble.analysis_plan.AnalysisTemplate(
+            criteria, foms, fom_contexts, bool(self._modifier_instances)
+        )
+
+    def _analysis_plan(self, criteria_list):
+        """Plan to analyze this experiment
+
+        The plan is expanded from the shared template of this experiment, and
+        kept until the experiment's variables, its template, or the workspace
+        success criteria change. Setup, archive, and analyze therefore reuse
+        the same plan.
+
+        Additionally, ensure the success criteria list is complete.
+
+        Returns:
+            (AnalysisPlan): Files, contexts, and FOMs to extract
+        """
+        template = self._analysis_template()
+        plan = self._cached_analysis_plan
+        if plan is None or not plan.is_valid(template, self.expander, criteria_list):
+            plan = self._expand_analysis_plan(template, criteria_list)
+            self._cached_analysis_plan = plan
+
+        plan.populate_criteria(criteria_list)
+        return plan
+
+    def _expand_analysis_plan(self, template, criteria_list):
+        """Expand the analysis template with the variables of this experiment"""
+        variables = self.expander.variables_snapshot()
+
+        criteria = []
+        for success_scope, name, conf in template.criteria:
+            if conf["mode"] == "string":
+                match = (
+                    self.expander.expand_var(conf["match"]) if conf["match"] is not None else None
+                )
+                anti_match = (
+                    self.expander.expand_var(conf["anti_match"])
+                    if conf["anti_match"] is not None
+                    else None
+                )
+                criteria.append(
+                    (
                         success_scope,
-                        criteria,
-                        mode=conf["mode"],
-                        match=match,
-                        file=conf["file"],
-                        anti_match=anti_match,
+                        name,
+                        {
+                            "mode": conf["mode"],
+                            "match": match,
+                            "file": conf["file"],
+                            "anti_match": anti_match,
+                        },
                     )
-                elif conf["mode"] == "fom_comparison":
-                    criteria_list.add_criteria(
+                )
+            elif conf["mode"] == "fom_comparison":
+                criteria.append(
+                    (
                         success_scope,
-                        criteria,
-                        conf["mode"],
-                        fom_name=conf["fom_name"],
-                        fom_context=conf["fom_context"],
-                        formula=conf["formula"],
+                        name,
+                        {
+                            "mode": conf["mode"],
+                            "fom_name": conf["fom_name"],
+                            "fom_context": conf["fom_context"],
+                            "formula": conf["formula"],
+                        },
                     )
+                )
+        criteria.append(
+            ("application_definition", "_application_function", {"mode": "application_function"})
+        )
 
-        criteria_list.add_criteria(
-            scope="application_definition",
-            name="_application_function",
-            mode="application_function",
+        plan = ramble.analysis_plan.AnalysisPlan(
+            {},
+            {},
+            {},
+            template=template,
+            criteria=criteria,
+            variables=variables,
+            criteria_signature=criteria_list.signature(),
         )
+        plan.populate_criteria(criteria_list)
+        files, contexts, foms = plan.files, plan.contexts, plan.foms
 
         # Extract file paths for all criteria
         for criteria in criteria_list.all_criteria():
             log_path = self.expander.expand_var(criteria.file)
-            if log_path not in files and os.path.exists(log_path):
+            if log_path not in files:
+                if not os.path.exists(log_path):
+                    plan.missing_files.append(log_path)
+                    continue
                 files[log_path] = self._new_file_dict()
 
-            if log_path in files:
-                files[log_path]["success_criteria"].append(criteria.name)
+            files[log_path]["success_criteria"].append(criteria.name)
 
         # Remap fom / context / file data
         # Could push this into the language features in the future
-        fom_definitions = self.figures_of_merit.copy()
-        for fom, fom_def in fom_definitions.items():
-            fom_def["origin"] = self.name
-            fom_def["origin_type"] = "application"
-
-        fom_contexts = self.figure_of_merit_contexts.copy()
-        for mod in self._modifier_instances:
-            fom_contexts.update(mod.figure_of_merit_contexts)
-
-            mod_vars = mod.modded_variables(self)
-
-            for fom, fom_def in mod.figures_of_merit.items():
-                fom_definitions[fom] = {"origin": f"{mod}", "origin_type": "modifier"}
-                for attr in fom_def.keys():
-                    if isinstance(fom_def[attr], list):
-                        fom_definitions[fom][attr] = fom_def[attr].copy()
+        mod_vars = {}
+        for fom, fom_def in template.foms.items():
+            conf = fom_def
+            mod_idx = fom_def["modifier"]
+            if mod_idx is not None:
+                if mod_idx not in mod_vars:
+                    mod_vars[mod_idx] = self._modifier_instances[mod_idx].modded_variables(self)
+                conf = {}
+                for attr, value in fom_def.items():
+                    if attr in ["origin", "origin_type", "modifier"] or isinstance(value, list):
+                        conf[attr] = value
                     else:
-                        fom_definitions[fom][attr] = self.expander.expand_var(
-                            fom_def[attr], mod_vars
-                        )
+                        conf[attr] = self.expander.expand_var(value, mod_vars[mod_idx])
 
-        for fom, conf in fom_definitions.items():
             log_path = self.expander.expand_var(conf["log_file"])
 
             if log_path not in files:
@@ -2049,7 +2340,7 @@ class ApplicationBase(metaclass=ApplicationMeta):
             files[log_path]["foms"].append(fom)
 
             foms[fom] = {
-                "regex": re.compile(r"%s" % self.expander.expand_var(conf["regex"])),
+                "regex": template.compile(self.expander.expand_var(conf["regex"])),
                 "contexts": [],
                 "group": conf["group_name"],
                 "units": conf["units"],
@@ -2059,25 +2350,41 @@ class ApplicationBase(metaclass=ApplicationMeta):
             if conf["contexts"]:
                 foms[fom]["contexts"].extend(conf["contexts"])
                 for context in conf["contexts"]:
-                    regex_str = self.expander.expand_var(fom_contexts[context]["regex"])
-                    format_str = fom_contexts[context]["output_format"]
+                    regex_str = self.expander.expand_var(template.contexts[context]["regex"])
+                    format_str = template.contexts[context]["output_format"]
                     contexts[context] = {
-                        "regex": re.compile(r"%s" % regex_str),
+                        "regex": template.compile(regex_str),
                         "format": format_str,
                     }
 
-        return files, contexts, foms
+        return plan
+
+    def _experiment_index_key(self, workspace):
+        """Key of this experiment in the workspace's experiment index"""
+        exp_dir = self.expander.expand_var_name(self.keywords.experiment_run_dir)
+        return os.path.relpath(exp_dir, workspace.root)
 
-    def read_status(self):
+    def read_status(self, workspace=None):
         """Read status from an experiment's status file, if possible.
 
-        Set this experiment's status based on the status file in the experiment
-        run directory, if it exists. If it doesn't exist, set its status to
-        experiment_status.UNKNOWN
+        Set this experiment's status based on the workspace's experiment index,
+        or the status file in the experiment run directory if the index does
+        not contain it. The index is only used while the run directory exists.
+        If neither exists, set its status to experiment_status.UNKNOWN
         """
-        status_path = os.path.join(
-            self.expander.expand_var_name(self.keywords.experiment_run_dir), self._status_file_name
-        )
+        experiment_run_dir = self.expander.expand_var_name(self.keywords.experiment_run_dir)
+
+        if workspace is not None and os.path.isdir(experiment_run_dir):
+            status_data = workspace.experiment_index.get(
+                self._experiment_index_key(workspace), "status"
+            )
+            if status_data is not None:
+                self.variables[self.keywords.experiment_status] = status_data[
+                    self.keywords.experiment_status
+                ]
+                return
+
+        status_path = os.path.join(experiment_run_dir, self._status_file_name)
 
         if os.path.isfile(status_path):
             exp_lock = self.experiment_lock()
@@ -2119,6 +2426,10 @@ class ApplicationBase(metaclass=ApplicationMeta):
                 with open(status_path, "w+") as f:
                     spack.util.spack_json.dump(status_data, f)
 
+            workspace.experiment_index.update(
+                self._experiment_index_key(workspace), "status", status_data
+            )
+
     register_phase("deploy_artifacts", pipeline="pushdeployment")
 
     def _deploy_artifacts(self, workspace, app_inst=None):
@@ -0,0 +1,564 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Writing of workspace archives
+
+The archive pipeline (and the archive_experiments phase of each experiment)
+adds the files that should be archived to an Archiver, which writes them once
+all of them are known. Files are written into the archive directory, and / or
+streamed straight from the workspace into a compressed tar file, without
+copying them first.
+
+Files with identical contents (such as templates shared by experiments) are
+only stored once. Later copies are hard links to the first, both in the
+archive directory and within the tar file.
+
+Each archive has a manifest, which records the archive each file is stored in
+and a fingerprint of it. Incremental archives only store the experiments (and
+other files) which changed since the previous archive, and refer to the
+previous archives for the rest. restore() reassembles the complete contents of
+an archive from the archives it refers to.
+"""
+
+import glob
+import io
+import multiprocessing.pool
+import os
+import shutil
+import subprocess
+import tarfile
+
+import llnl.util.filesystem as fs
+import spack.util.spack_json as sjson
+from spack.util.executable import which
+
+import ramble.error
+import ramble.util.hashing
+from ramble.util.logger import logger
+
+#: Compression formats of tar archives, mapped to their file extension
+compression_extensions = {"gzip": ".tar.gz", "zstd": ".tar.zst"}
+
+default_compression = "gzip"
+
+#: Name of the manifest within an archive
+manifest_file_name = "archive_manifest.json"
+
+#: Suffix of the copy of each manifest stored next to its archive
+manifest_suffix = ".manifest.json"
+
+
+def fingerprint(path):
+    """Identity of a version of a file, from its size and modification time"""
+    stat_info = os.stat(path)
+    return [stat_info.st_size, stat_info.st_mtime_ns]
+
+
+def manifest_path(archive_dir, archive_name):
+    """Path to the manifest stored next to an archive"""
+    return os.path.join(archive_dir, archive_name + manifest_suffix)
+
+
+def read_manifest(archive_dir, archive_name):
+    """Read the manifest of an archive
+
+    Returns:
+        (dict | None): The manifest, or None if the archive has no manifest
+    """
+    for path in [
+        manifest_path(archive_dir, archive_name),
+        os.path.join(archive_dir, archive_name, manifest_file_name),
+    ]:
+        if os.path.isfile(path):
+            with open(path) as f:
+                return sjson.load(f)
+    return None
+
+
+def latest_manifest(archive_dir):
+    """Read the manifest of the most recent archive in archive_dir
+
+    Returns:
+        (dict | None): The manifest, or None if no archive has a manifest
+    """
+    paths = glob.glob(os.path.join(archive_dir, "*" + manifest_suffix))
+    if not paths:
+        return None
+    latest = max(paths, key=os.path.getmtime)
+    with open(latest) as f:
+        return sjson.load(f)
+
+
+class Archiver:
+    """Collect files, and write them into an archive
+
+    Files are identified by their path within the archive. Reading and
+    hashing of files is performed by a pool of worker threads, and external
+    compressors (pigz or zstd) use multiple threads when they are available.
+    """
+
+    def __init__(
+        self,
+        archive_dir,
+        archive_name,
+        create_dir=True,
+        create_tar=False,
+        compression=default_compression,
+        jobs=1,
+        base_manifest=None,
+    ):
+        """Create an archiver
+
+        Args:
+            archive_dir (str): Directory the archive is written into
+            archive_name (str): Name of the archive directory, and of the top
+                                level directory within the tar file
+            create_dir (bool): Whether to write the archive directory
+            create_tar (bool): Whether to write a compressed tar file
+            compression (str): Compression of the tar file. One of
+                               compression_extensions
+            jobs (int): Number of worker threads
+            base_manifest (dict): Manifest of a previous archive. Files and
+                                  experiments which did not change since it was
+                                  written are not stored again.
+        """
+        if compression not in compression_extensions:
+            raise ArchiverError(
+                f"Unknown archive compression {compression}. "
+                f"Supported compressions are: {', '.join(compression_extensions)}"
+            )
+
+        self.archive_dir = archive_dir
+        self.archive_name = archive_name
+        self.create_dir = create_dir
+        self.create_tar = create_tar
+        self.compression = compression
+        self.jobs = jobs
+        self.base_manifest = base_manifest
+        self.files = {}
+        self.experiments = {}
+        self.manifest = None
+
+    @property
+    def archive_path(self):
+        """Path to the archive directory"""
+        return os.path.join(self.archive_dir, self.archive_name)
+
+    @property
+    def tar_path(self):
+        """Path to the tar file"""
+        return self.archive_path + compression_extensions[self.compression]
+
+    def add_experiment(self, name, experiment_hash):
+        """Add an experiment, whose files are added with add_file
+
+        Args:
+            name (str): Namespace of the experiment
+            experiment_hash (str): Hash of the experiment's definition
+        """
+        self.experiments[name] = {"hash": experiment_hash, "files": []}
+
+    def add_file(self, src, dest, experiment=None):
+        """Add a file to the archive
+
+        Args:
+            src (str): Path to the file
+            dest (str): Path of the file, relative to the root of the archive
+            experiment (str): Namespace of the experiment the file belongs to
+        """
+        dest = os.path.normpath(dest)
+        self.files[dest] = src
+        if experiment is not None:
+            self.experiments[experiment]["files"].append(dest)
+
+    def add_tree(self, src_dir, dest_dir, exclude=None, skip_links=False):
+        """Add all files within a directory to the archive
+
+        Args:
+            src_dir (str): Directory to add
+            dest_dir (str): Path of the directory, relative to the root of the
+                            archive
+            exclude (set): Names of files which should not be added
+            skip_links (bool): Whether symbolic links (to files, or to
+                               directories) are skipped
+        """
+        for root, dirs, files in os.walk(src_dir):
+            if skip_links:
+                dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+
+            rel_root = os.path.relpath(root, src_dir)
+            for name in files:
+                if exclude and name in exclude:
+                    continue
+                src = os.path.join(root, name)
+                if skip_links and os.path.islink(src):
+                    continue
+                if os.path.isfile(src):
+                    self.add_file(src, os.path.join(dest_dir, rel_root, name))
+
+    def write(self):
+        """Write all added files into the archive
+
+        Returns:
+            (int): Number of files stored, not counting duplicates, or files
+            stored in previous archives
+        """
+        fingerprints = {}
+        for dest, src in self.files.items():
+            try:
+                fingerprints[dest] = fingerprint(src)
+            except OSError:
+                continue
+
+        unchanged = self._unchanged_files(fingerprints)
+        entries = sorted(
+            (dest, src)
+            for dest, src in self.files.items()
+            if dest in fingerprints and dest not in unchanged
+        )
+        originals = self._find_duplicates(entries)
+
+        self.manifest = {
+            "archive": self.archive_name,
+            "base": self.base_manifest["archive"] if self.base_manifest else None,
+            "files": {},
+            "experiments": {},
+        }
+        for dest, _ in entries:
+            entry = {"archive": self.archive_name, "fingerprint": fingerprints[dest]}
+            if dest in originals:
+                entry["link"] = originals[dest]
+            self.manifest["files"][dest] = entry
+        for dest in unchanged:
+            self.manifest["files"][dest] = self.base_manifest["files"][dest]
+        for name, experiment in self.experiments.items():
+            self.manifest["experiments"][name] = {
+                "hash": experiment["hash"],
+                "files": sorted(dest for dest in experiment["files"] if dest in fingerprints),
+            }
+
+        if unchanged:
+            logger.msg(f"{len(unchanged)} unchanged files are stored in previous archives")
+
+        if self.create_dir:
+            self._write_dir(entries, originals)
+            self._link_unchanged(unchanged)
+
+        if self.create_tar:
+            self._write_tar(entries, originals)
+
+        with open(manifest_path(self.archive_dir, self.archive_name), "w") as f:
+            sjson.dump(self.manifest, f)
+
+        return len(entries) - len(originals)
+
+    def _unchanged_files(self, fingerprints):
+        """Find files which are stored in a previous archive
+
+        An experiment is unchanged if its hash, and the names and fingerprints
+        of all of its files (i.e. its status file and logs) match the base
+        manifest. Other files are unchanged if their fingerprint matches.
+
+        Returns:
+            (set): Archive paths of unchanged files
+        """
+        if not self.base_manifest:
+            return set()
+
+        base_files = self.base_manifest["files"]
+        base_experiments = self.base_manifest["experiments"]
+
+        def _same(dest):
+            return dest in base_files and base_files[dest]["fingerprint"] == fingerprints[dest]
+
+        unchanged = set()
+        experiment_files = set()
+        for name, experiment in self.experiments.items():
+            files = sorted(dest for dest in experiment["files"] if dest in fingerprints)
+            experiment_files.update(files)
+
+            base = base_experiments.get(name)
+            if (
+                base
+                and base["hash"] == experiment["hash"]
+                and base["files"] == files
+                and all(_same(dest) for dest in files)
+            ):
+                unchanged.update(files)
+
+        for dest in fingerprints:
+            if dest not in experiment_files and _same(dest):
+                unchanged.add(dest)
+
+        return unchanged
+
+    def _map(self, func, items):
+        """Apply func to each item using the pool of worker threads"""
+        if self.jobs <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        tp = multiprocessing.pool.ThreadPool(processes=min(self.jobs, len(items)))
+        try:
+            return tp.map(func, items)
+        finally:
+            tp.terminate()
+            tp.join()
+
+    def _find_duplicates(self, entries):
+        """Find files with the same contents as a previous file
+
+        Only files which have the same size as another file are hashed.
+
+        Returns:
+            (dict): Archive path of each duplicate file, mapped to the archive
+            path of the first file with the same contents
+        """
+        by_size = {}
+        for dest, src in entries:
+            try:
+                size = os.path.getsize(src)
+            except OSError:
+                continue
+            by_size.setdefault(size, []).append((dest, src))
+
+        candidates = [entry for group in by_size.values() if len(group) > 1 for entry in group]
+
+        def _digest(entry):
+            try:
+                return ramble.util.hashing.hash_file_contents(entry[1])
+            except OSError:
+                return None
+
+        first = {}
+        originals = {}
+        for (dest, _), digest in zip(candidates, self._map(_digest, candidates)):
+            if digest is None:
+                continue
+            if digest in first:
+                originals[dest] = first[digest]
+            else:
+                first[digest] = dest
+
+        if originals:
+            logger.debug(f"{len(originals)} archived files are duplicates of other files")
+        return originals
+
+    def _write_dir(self, entries, originals):
+        """Write files into the archive directory"""
+
+        def _copy(entry):
+            dest, src = entry
+            dest_path = os.path.join(self.archive_path, dest)
+            fs.mkdirp(os.path.dirname(dest_path))
+            if dest in originals:
+                try:
+                    os.link(os.path.join(self.archive_path, originals[dest]), dest_path)
+                    return
+                except OSError:
+                    pass
+            shutil.copy(src, dest_path)
+
+        fs.mkdirp(self.archive_path)
+        # Originals are written before the duplicates linking to them
+        self._map(_copy, [entry for entry in entries if entry[0] not in originals])
+        self._map(_copy, [entry for entry in entries if entry[0] in originals])
+
+        with open(os.path.join(self.archive_path, manifest_file_name), "w") as f:
+            sjson.dump(self.manifest, f)
+
+    def _link_unchanged(self, unchanged):
+        """Link unchanged files from the archive directories they are stored in
+
+        This keeps each archive directory complete, without copying any data.
+        Files stored in tar files are left to restore().
+        """
+        for dest in unchanged:
+            entry = self.manifest["files"][dest]
+            src_path = os.path.join(self.archive_dir, entry["archive"], dest)
+            dest_path = os.path.join(self.archive_path, dest)
+            if os.path.isfile(src_path) and not os.path.exists(dest_path):
+                fs.mkdirp(os.path.dirname(dest_path))
+                try:
+                    os.link(src_path, dest_path)
+                except OSError:
+                    shutil.copyfile(src_path, dest_path)
+
+    def _write_tar(self, entries, originals):
+        """Stream files into a compressed tar file"""
+        partial_path = self.tar_path + ".part"
+        compressor = self._compressor()
+
+        fs.mkdirp(self.archive_dir)
+
+        with open(partial_path, "wb") as out:
+            if compressor is None:
+                tar = tarfile.open(fileobj=out, mode="w|gz")
+                proc = None
+            else:
+                proc = subprocess.Popen(compressor, stdin=subprocess.PIPE, stdout=out)
+                tar = tarfile.open(fileobj=proc.stdin, mode="w|")
+
+            try:
+                with tar:
+                    for dest, src in entries:
+                        name = os.path.join(self.archive_name, dest)
+                        try:
+                            info = tar.gettarinfo(src, arcname=name)
+                        except OSError:
+                            continue
+                        if dest in originals:
+                            info.type = tarfile.LNKTYPE
+                            info.linkname = os.path.join(self.archive_name, originals[dest])
+                            info.size = 0
+                            tar.addfile(info)
+                        else:
+                            with open(src, "rb") as f:
+                                tar.addfile(info, f)
+
+                    manifest_data = sjson.dump(self.manifest).encode("utf-8")
+                    info = tarfile.TarInfo(os.path.join(self.archive_name, manifest_file_name))
+                    info.size = len(manifest_data)
+                    tar.addfile(info, io.BytesIO(manifest_data))
+            finally:
+                if proc is not None:
+                    proc.stdin.close()
+                    if proc.wait() != 0:
+                        os.remove(partial_path)
+                        raise ArchiverError(f"{compressor[0]} failed to compress the archive")
+
+        os.replace(partial_path, self.tar_path)
+
+    def _compressor(self):
+        """Command to compress the tar stream with, or None to use python's gzip
+
+        Returns:
+            (list | None): Command line of the compressor
+        """
+        threads = str(max(self.jobs, 1))
+        if self.compression == "zstd":
+            zstd = which("zstd", required=True)
+            return [zstd.path, "-q", "-c", f"-T{threads}"]
+
+        pigz = which("pigz")
+        if pigz and self.jobs > 1:
+            return [pigz.path, "-c", "-p", threads]
+        return None
+
+
+def _tar_reader(tar_path):
+    """Open a compressed tar file for streaming reads
+
+    Returns:
+        (tuple): The tarfile, and the decompressor process (or None)
+    """
+    if tar_path.endswith(compression_extensions["zstd"]):
+        zstd = which("zstd", required=True)
+        proc = subprocess.Popen([zstd.path, "-q", "-d", "-c", tar_path], stdout=subprocess.PIPE)
+        return tarfile.open(fileobj=proc.stdout, mode="r|"), proc
+    return tarfile.open(tar_path, mode="r|*"), None
+
+
+def restore(archive_dir, archive_name):
+    """Reassemble the complete contents of an archive as a directory
+
+    Files of incremental archives which are stored in previous archives are
+    linked from their archive directories, or extracted from their tar files.
+
+    Args:
+        archive_dir (str): Directory containing the archives
+        archive_name (str): Name of the archive to restore
+
+    Returns:
+        (str): Path to the restored archive directory
+    """
+    manifest = read_manifest(archive_dir, archive_name)
+    if manifest is None:
+        raise ArchiverError(f"Archive {archive_name} in {archive_dir} has no manifest")
+
+    restore_path = os.path.join(archive_dir, archive_name)
+
+    # Archives are read from their directory if they have one, and from their
+    # tar file otherwise
+    source_dirs = {
+        entry["archive"]
+        for entry in manifest["files"].values()
+        if os.path.isdir(os.path.join(archive_dir, entry["archive"]))
+    }
+
+    # Group missing files by the archive they are stored in. Duplicates are
+    # extracted from the file they link to.
+    missing = {}
+    for dest, entry in manifest["files"].items():
+        dest_path = os.path.join(restore_path, dest)
+        if os.path.exists(dest_path):
+            continue
+        source = entry.get("link", dest)
+        missing.setdefault(entry["archive"], {}).setdefault(source, []).append(dest_path)
+
+    for source_archive, files in missing.items():
+        source_path = os.path.join(archive_dir, source_archive)
+        if source_archive in source_dirs:
+            for source, dest_paths in files.items():
+                _restore_file(os.path.join(source_path, source), dest_paths)
+            continue
+
+        tar_paths = [
+            source_path + ext
+            for ext in compression_extensions.values()
+            if os.path.isfile(source_path + ext)
+        ]
+        if not tar_paths:
+            raise ArchiverError(f"Archive {source_archive} was not found in {archive_dir}")
+
+        prefix = source_archive + os.sep
+        tar, proc = _tar_reader(tar_paths[0])
+        try:
+            with tar:
+                for member in tar:
+                    name = member.name[len(prefix) :]
+                    if member.isfile() and name in files:
+                        _restore_file(tar.extractfile(member), files.pop(name))
+        finally:
+            if proc is not None:
+                proc.stdout.close()
+                proc.wait()
+
+        if files:
+            raise ArchiverError(
+                f"Archive {source_archive} is missing files: {', '.join(sorted(files))}"
+            )
+
+    with open(os.path.join(restore_path, manifest_file_name), "w") as f:
+        sjson.dump(manifest, f)
+
+    return restore_path
+
+
+def _restore_file(src, dest_paths):
+    """Write the contents of src (a path, or file object) to each of dest_paths"""
+    first = dest_paths[0]
+    fs.mkdirp(os.path.dirname(first))
+    if isinstance(src, str):
+        try:
+            os.link(src, first)
+        except OSError:
+            shutil.copyfile(src, first)
+    else:
+        with open(first, "wb") as f:
+            shutil.copyfileobj(src, f)
+
+    for dest_path in dest_paths[1:]:
+        fs.mkdirp(os.path.dirname(dest_path))
+        try:
+            os.link(first, dest_path)
+        except OSError:
+            shutil.copyfile(first, dest_path)
+
+
+class ArchiverError(ramble.error.RambleError):
+    """Class for errors while writing archives"""
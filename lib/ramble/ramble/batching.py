@@ -0,0 +1,348 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Batching of experiment submissions
+
+By default, the execute pipeline (``ramble on``) runs the executor of every
+experiment, which costs one scheduler call per experiment when the executor
+submits a batch script (such as ``sbatch {execute_experiment}``). The Batcher
+groups compatible experiments, and replaces their submissions with one
+submission of a generated script per group.
+
+Experiments are compatible when they use the same number of nodes, their
+executors only differ in the experiment's run directory, and the scheduler
+directives (such as ``#SBATCH`` lines) of their submitted scripts only differ
+in the experiment's run directory, and in the job name set by the options in
+``job_name_options``. A group is submitted in one of two modes:
+
+- ``wrapper``: a script which runs the script of each experiment in turn,
+  within a single scheduler job. As the job keeps the time limit of a single
+  experiment, groups whose directives set a time limit are only wrapped when
+  the size of batches is limited.
+- ``array``: a job array, where each array task runs the script of one
+  experiment. This requires a scheduler listed in ``array_schedulers``.
+"""
+
+import os
+import re
+import stat
+
+import llnl.util.filesystem as fs
+import spack.util.spack_json as sjson
+
+import ramble.error
+from ramble.util.logger import logger
+
+batch_modes = ["wrapper", "array"]
+
+#: Arguments to submit a job array, and the environment variable holding the
+#: index of an array task, for each known submission command
+array_schedulers = {
+    "sbatch": (["--array=0-{last_index}"], "SLURM_ARRAY_TASK_ID"),
+    "qsub": (["-J", "0-{last_index}"], "PBS_ARRAY_INDEX"),
+}
+
+#: Options of scheduler directives which set the name of a job, for each
+#: directive prefix
+job_name_options = {
+    "#SBATCH": ["-J", "--job-name"],
+    "#PBS": ["-N"],
+    "#BSUB": ["-J"],
+    "#$": ["-N"],
+}
+
+#: Patterns matching scheduler directives which set the time limit of a job,
+#: for each directive prefix
+time_limit_patterns = {
+    "#SBATCH": re.compile(r"\s(-t|--time)(\s|=)"),
+    "#PBS": re.compile(r"\s-l\s+\S*walltime="),
+    "#BSUB": re.compile(r"\s-W\s"),
+    "#$": re.compile(r"\s-l\s+\S*h_rt="),
+}
+
+batch_record_file_name = "ramble_batch.json"
+
+_script_placeholder = "{batch_script}"
+_run_dir_placeholder = "{experiment_run_dir}"
+_name_placeholder = "{experiment_name}"
+
+# Scheduler directives are comments directly followed by a keyword, such as
+# "#SBATCH" or "#PBS", unlike regular comments ("# text")
+_directive_regex = re.compile(r"#[^\s!#]")
+
+
+class BatchError(ramble.error.RambleError):
+    """Raised when experiments cannot be batched"""
+
+
+class Submission:
+    """The executor command of a single experiment
+
+    Attributes:
+        name (str): Namespace of the experiment
+        command (list(str)): Executable and arguments of the executor
+        run_dir (str): Run directory of the experiment
+        short_name (str | None): Name of the experiment
+        n_nodes (str | None): Number of nodes the experiment uses
+        script (str | None): Script within the run directory which the
+            executor submits, or None if it does not submit one
+    """
+
+    def __init__(self, name, command, run_dir, short_name=None, n_nodes=None):
+        self.name = name
+        self.command = command
+        self.run_dir = run_dir
+        self.short_name = short_name
+        self.n_nodes = n_nodes
+        self.script = self._find_script()
+
+    def _find_script(self):
+        run_dir = os.path.join(os.path.realpath(self.run_dir), "")
+        for arg in self.command[1:]:
+            if os.path.isfile(arg) and os.path.realpath(arg).startswith(run_dir):
+                return arg
+        return None
+
+    def _normalize(self, text):
+        """Replace the run directory of this experiment in text"""
+        return text.replace(self.run_dir, _run_dir_placeholder)
+
+    def _normalize_job_name(self, directive):
+        """Replace the name of this experiment, when a directive sets the job name
+
+        Other occurrences of the name are kept, as short names (such as ``4``)
+        also appear in unrelated values, like ``--ntasks=4``.
+        """
+        args = directive.split(" ")
+        options = job_name_options.get(args[0], [])
+        if not self.short_name or not options:
+            return directive
+
+        for idx, arg in enumerate(args):
+            if arg in options and idx + 1 < len(args) and args[idx + 1] == self.short_name:
+                args[idx + 1] = _name_placeholder
+            for option in options:
+                if option.startswith("--") and arg == f"{option}={self.short_name}":
+                    args[idx] = f"{option}={_name_placeholder}"
+        return " ".join(args)
+
+    def directives(self):
+        """Interpreter line and scheduler directives of the submitted script"""
+        lines = []
+        with open(self.script) as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.startswith("#"):
+                    break
+                if line.startswith("#!") or _directive_regex.match(line):
+                    lines.append(self._normalize_job_name(self._normalize(line)))
+        return lines
+
+    def sets_time_limit(self):
+        """Whether a directive of the submitted script sets a time limit"""
+        for directive in self.directives():
+            pattern = time_limit_patterns.get(directive.split(" ")[0])
+            if pattern is not None and pattern.search(directive):
+                return True
+        return False
+
+    def compatibility_key(self):
+        """Key which is equal for experiments that can be batched together
+
+        Returns:
+            (tuple | None): The key, or None if the experiment cannot be batched
+        """
+        if self.script is None:
+            return None
+
+        command = tuple(
+            _script_placeholder if arg == self.script else self._normalize(arg)
+            for arg in self.command
+        )
+        return (self.n_nodes, command, tuple(self.directives()))
+
+
+class Batch:
+    """A group of compatible submissions, and the script which runs them
+
+    Attributes:
+        name (str): Name of the batch
+        submissions (list(Submission)): Submissions in the batch
+        mode (str): Mode used to submit the batch, one of batch_modes
+        script (str): Path of the generated script
+        command (list(str)): Command which submits the batch
+    """
+
+    def __init__(self, name, submissions, mode, script):
+        self.name = name
+        self.submissions = submissions
+        self.mode = mode
+        self.script = script
+        self.command = None
+
+    def write(self):
+        """Write the batch script, and build the command submitting it"""
+        first = self.submissions[0]
+        batch_dir = os.path.dirname(self.script)
+
+        directives = first.directives()
+        if not directives or not directives[0].startswith("#!"):
+            directives.insert(0, "#!/bin/sh")
+        lines = [
+            line.replace(_run_dir_placeholder, batch_dir).replace(_name_placeholder, self.name)
+            for line in directives
+        ]
+        lines.append(f"# Batch of {len(self.submissions)} experiments generated by ramble on")
+        lines.append("")
+
+        command = [
+            self.script if arg == first.script else arg.replace(first.run_dir, batch_dir)
+            for arg in first.command
+        ]
+
+        if self.mode == "array":
+            array_args, index_var = array_schedulers[os.path.basename(command[0])]
+            last_index = len(self.submissions) - 1
+            command[1:1] = [arg.format(last_index=last_index) for arg in array_args]
+
+            lines.append(f'case "${{{index_var}}}" in')
+            for idx, submission in enumerate(self.submissions):
+                lines.append(f'    {idx}) exec "{submission.script}" ;;')
+            lines.append("esac")
+            lines.append(f'echo "Unknown array index ${{{index_var}}}" >&2')
+            lines.append("exit 1")
+        else:
+            lines.append("status=0")
+            for submission in self.submissions:
+                lines.append(f'"{submission.script}" || status=1')
+            lines.append("exit $status")
+
+        with open(self.script, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.chmod(self.script, stat.S_IRWXU | stat.S_IRWXG | stat.S_IROTH | stat.S_IXOTH)
+
+        self.command = command
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "script": self.script,
+            "command": self.command,
+            "experiments": [
+                {"name": submission.name, "run_dir": submission.run_dir, "index": idx}
+                for idx, submission in enumerate(self.submissions)
+            ],
+        }
+
+
+class Batcher:
+    """Group experiment submissions into batches of compatible experiments"""
+
+    def __init__(self, batch_dir, mode="wrapper", max_size=None):
+        """Create a batcher
+
+        Args:
+            batch_dir (str): Directory batch scripts are written into
+            mode (str): How batches are submitted, one of batch_modes
+            max_size (int | None): Maximum number of experiments in a batch.
+                Batches are not limited when this is None.
+        """
+        if mode not in batch_modes:
+            raise BatchError(f"Unknown batch mode {mode}, expected one of {batch_modes}")
+
+        self.batch_dir = batch_dir
+        self.mode = mode
+        self.max_size = max_size
+        self.submissions = []
+        self.batches = []
+
+    def add(self, submission):
+        """Add the submission of an experiment"""
+        self.submissions.append(submission)
+
+    def _mode(self, submission):
+        """Mode used to submit a batch, falling back to wrapper scripts"""
+        if self.mode == "array":
+            exec_name = os.path.basename(submission.command[0])
+            if exec_name in array_schedulers:
+                return "array"
+            logger.warn(
+                f"Job arrays are not supported with {exec_name}. "
+                "Using a wrapper script instead."
+            )
+        return "wrapper"
+
+    def write(self):
+        """Write the scripts of all batches
+
+        Returns:
+            (list(tuple(str, list(str)))): Name and command of each submission
+                to run, in the order experiments were added. Experiments which
+                could not be batched with others keep their own command.
+        """
+        groups = {}
+        for submission in self.submissions:
+            key = submission.compatibility_key()
+            if key is None:
+                groups[id(submission)] = [submission]
+            else:
+                groups.setdefault(key, []).append(submission)
+
+        batch_of = {}
+        for group in groups.values():
+            size = self.max_size or len(group)
+            for start in range(0, len(group), size):
+                chunk = group[start : start + size]
+                if len(chunk) < 2:
+                    continue
+
+                mode = self._mode(chunk[0])
+                if mode == "wrapper" and self.max_size is None and chunk[0].sets_time_limit():
+                    # A single job would run every experiment within the
+                    # time limit of one of them
+                    logger.warn(
+                        f"Not wrapping {len(chunk)} experiments, as their scheduler "
+                        "directives set a time limit. Use --batch-size to "
+                        "limit the number of experiments in a wrapper script."
+                    )
+                    continue
+
+                name = f"batch_{len(self.batches)}"
+                script = os.path.join(self.batch_dir, name, "execute_batch")
+                batch = Batch(name, chunk, mode, script)
+                self.batches.append(batch)
+                for submission in chunk:
+                    batch_of[id(submission)] = batch
+
+        commands = []
+        for batch in self.batches:
+            fs.mkdirp(os.path.dirname(batch.script))
+            batch.write()
+            for idx, submission in enumerate(batch.submissions):
+                self._write_batch_record(batch, submission, idx)
+
+        for submission in self.submissions:
+            batch = batch_of.get(id(submission))
+            if batch is None:
+                # Remove the record of a previous batched execution
+                fs.force_remove(os.path.join(submission.run_dir, batch_record_file_name))
+                commands.append((submission.name, submission.command))
+            elif batch.submissions[0] is submission:
+                commands.append((batch.name, batch.command))
+        return commands
+
+    def _write_batch_record(self, batch, submission, idx):
+        """Record the batch of an experiment in its run directory"""
+        record = {"batch": batch.name, "mode": batch.mode, "script": batch.script, "index": idx}
+        with open(os.path.join(submission.run_dir, batch_record_file_name), "w") as f:
+            sjson.dump(record, f)
+
+    def write_mapping(self, path):
+        """Write the experiments and submission command of each batch as JSON"""
+        with open(path, "w") as f:
+            sjson.dump({"batches": {batch.name: batch.to_dict() for batch in self.batches}}, f)
@@ -17,6 +17,7 @@ import ramble.error
 import ramble.paths
 import ramble.config
 import ramble.util.file_cache
+import ramble.util.hashing
 import ramble.util.path
 
 
@@ -38,6 +39,19 @@ def _misc_cache():
 misc_cache = llnl.util.lang.Singleton(_misc_cache)
 
 
+def _file_hash_cache():
+    """The ``file_hash_cache`` stores digests of files within ``misc_cache``.
+
+    Files are only hashed again when their size, modification time, or inode
+    changes.
+    """
+    return ramble.util.hashing.FileHashCache(misc_cache)
+
+
+#: Ramble's cache of file digests
+file_hash_cache = llnl.util.lang.Singleton(_file_hash_cache)
+
+
 def fetch_cache_location():
     """Filesystem cache of downloaded archives.
 
@@ -92,8 +92,8 @@ def objects_to_attributes(
 
     app_to_users = defaultdict(set)
     for name in object_names:
-        cls = ramble.repository.paths[object_type].get_obj_class(name)
-        for user in getattr(cls, attr_name):
+        metadata = ramble.repository.paths[object_type].get_obj_metadata(name)
+        for user in getattr(metadata, attr_name, []):
             app_to_users[name].add(user)
 
     return app_to_users
@@ -105,11 +105,11 @@ def attributes_to_objects(
     user_to_apps = defaultdict(list)
     object_names = ramble.repository.paths[object_type].all_object_names()
     for name in object_names:
-        cls = ramble.repository.paths[object_type].get_obj_class(name)
-        for user in getattr(cls, attr_name):
+        metadata = ramble.repository.paths[object_type].get_obj_metadata(name)
+        for user in getattr(metadata, attr_name, []):
             lower_users = [u.lower() for u in users]
             if not users or user.lower() in lower_users:
-                user_to_apps[user].append(cls.name)
+                user_to_apps[user].append(metadata.name)
 
     return user_to_apps
 
@@ -119,8 +119,8 @@ def defined_objects(attr_name=default_attr, object_type=ramble.repository.defaul
     undefined = []
     object_names = ramble.repository.paths[object_type].all_object_names()
     for name in object_names:
-        cls = ramble.repository.paths[object_type].get_obj_class(name)
-        if hasattr(cls, attr_name) and getattr(cls, attr_name):
+        metadata = ramble.repository.paths[object_type].get_obj_metadata(name)
+        if getattr(metadata, attr_name, None):
             defined.append(name)
         else:
             undefined.append(name)
@@ -8,6 +8,7 @@
 
 
 import argparse
+import os
 
 from spack.util.pattern import Args
 
@@ -169,3 +170,38 @@ def no_checksum():
         default=False,
         help="do not use checksums to verify downloaded files (unsafe)",
     )
+
+
+def _positive_int(value):
+    ivalue = int(value)
+    if ivalue < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return ivalue
+
+
+@arg
+def jobs():
+    return Args(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=_positive_int,
+        default=1,
+        help="number of experiments to process in parallel",
+        required=False,
+    )
+
+
+@arg
+def cores():
+    return Args(
+        "--cores",
+        dest="cores",
+        nargs="?",
+        const=os.cpu_count(),
+        type=_positive_int,
+        default=None,
+        help="limit the sum of n_ranks of running experiments to this many cores "
+        "(all cores of this machine if no value is given)",
+        required=False,
+    )
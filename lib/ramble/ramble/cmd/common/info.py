@@ -299,7 +299,7 @@ def print_info(args):
 
     object_type = ramble.repository.ObjectTypes[args.type]
     obj_name = args.object
-    obj = ramble.repository.get(obj_name, object_type=object_type)
+    obj = ramble.repository.get_metadata(obj_name, object_type=object_type)
 
     print_object_header(object_type, obj)
 
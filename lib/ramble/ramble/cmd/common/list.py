@@ -60,7 +60,7 @@ def filter_by_name(objs, args, object_type):
                 if f.match(p):
                     return True
 
-                obj = ramble.repository.get(p, object_type=object_type)
+                obj = ramble.repository.get_metadata(p, object_type=object_type)
                 if obj.__doc__:
                     return f.match(obj.__doc__)
                 return False
@@ -110,7 +110,7 @@ def rows_for_ncols(elts, ncols):
 @formatter
 def version_json(obj_names, out, object_type):
     """Print all objects with their latest versions."""
-    objs = [ramble.repository.get(name, object_type=object_type) for name in obj_names]
+    objs = [ramble.repository.get_metadata(name, object_type=object_type) for name in obj_names]
 
     out.write("[\n")
 
@@ -142,7 +142,7 @@ def html(obj_names, out, object_type):
     obj_def = ramble.repository.type_definitions[object_type]
 
     # Read in all objects
-    objs = [ramble.repository.get(name, object_type=object_type) for name in obj_names]
+    objs = [ramble.repository.get_metadata(name, object_type=object_type) for name in obj_names]
 
     # Start at 2 because the title of the page from Sphinx is id1.
     span_id = 2
@@ -6,6 +6,7 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import ramble.batching
 import ramble.config
 import ramble.workspace
 import ramble.expander
@@ -13,7 +14,7 @@ import ramble.pipeline
 import ramble.filters
 
 import ramble.cmd.common.arguments as arguments
-
+from ramble.util.logger import logger
 
 description = '"And now\'s the time, the time is now" (execute workspace experiments)'
 section = "workspaces"
@@ -43,7 +44,26 @@ def setup_parser(subparser):
         help="Disable the logger header.",
     )
 
-    arguments.add_common_arguments(subparser, ["where", "exclude_where", "filter_tags"])
+    subparser.add_argument(
+        "--batch",
+        choices=ramble.batching.batch_modes,
+        dest="batch",
+        default=None,
+        help="submit compatible experiments together, either as a wrapper script "
+        "running each experiment in turn, or as a job array",
+    )
+
+    subparser.add_argument(
+        "--batch-size",
+        type=int,
+        dest="batch_size",
+        default=None,
+        help="maximum number of experiments in a batch",
+    )
+
+    arguments.add_common_arguments(
+        subparser, ["where", "exclude_where", "filter_tags", "jobs", "cores"]
+    )
 
 
 def ramble_on(args):
@@ -59,6 +79,9 @@ def ramble_on(args):
         tags=args.filter_tags,
     )
 
+    if args.batch_size is not None and args.batch_size < 1:
+        logger.die("--batch-size must be a positive integer")
+
     debug = ramble.config.get("config:debug")
     suppress_per_experiment_prints = not debug and not args.per_experiment_prints_on
     suppress_run_header = not debug and args.run_header_off
@@ -70,6 +93,10 @@ def ramble_on(args):
         executor=executor,
         suppress_per_experiment_prints=suppress_per_experiment_prints,
         suppress_run_header=suppress_run_header,
+        jobs=args.jobs,
+        cores=args.cores,
+        batch=args.batch,
+        batch_size=args.batch_size,
     )
 
     with ws.write_transaction():
@@ -7,11 +7,14 @@
 # except according to those terms.
 
 import json
+import os
 
+import ramble.cmd
 import ramble.experimental.uploader
+import ramble.results_store
 from ramble.util.logger import logger
 
-description = "import experiment results from file"
+description = "import or query experiment results"
 section = "results"
 level = "short"
 
@@ -25,6 +28,60 @@ def setup_parser(subparser):
     )
     upload_parser.add_argument("filename", help="path of file to upload")
 
+    # Query
+    query_parser = sp.add_parser(
+        "query", help=results_query.__doc__, description=results_query.__doc__
+    )
+    query_parser.add_argument(
+        "--fom",
+        dest="foms",
+        action="append",
+        metavar="NAME",
+        help="only include figures of merit with this name (can be repeated)",
+    )
+    query_parser.add_argument(
+        "--where",
+        dest="where",
+        action="append",
+        metavar="NAME=VALUE",
+        help="only include results where a variable (or one of "
+        f"{', '.join(ramble.results_store.builtin_columns)}) has this value "
+        "(can be repeated)",
+    )
+    query_parser.add_argument(
+        "--group-by",
+        dest="group_by",
+        nargs="+",
+        metavar="NAME",
+        help="variables (or builtin columns) to aggregate figures of merit by",
+    )
+    query_parser.add_argument(
+        "--aggregate",
+        dest="aggregate",
+        choices=list(ramble.results_store.aggregations),
+        help="aggregation of the numeric figures of merit of each group "
+        "(defaults to mean when grouping)",
+    )
+    query_parser.add_argument(
+        "--last",
+        dest="last",
+        type=int,
+        metavar="N",
+        help="only include the last N analyses",
+    )
+    query_parser.add_argument(
+        "--format",
+        dest="format",
+        choices=["text", "json"],
+        default="text",
+        help="output format",
+    )
+    query_parser.add_argument(
+        "--store",
+        dest="store",
+        help="path of a results store to query, instead of the active workspace's",
+    )
+
 
 def results_upload(args):
     """Imports Ramble experiment results from JSON file and uploads them as
@@ -34,6 +91,56 @@ def results_upload(args):
     ramble.experimental.uploader.upload_results(imported_results)
 
 
+def results_query(args):
+    """Query the figures of merit of past analyses of a workspace, stored in
+    the workspace's results store."""
+    if args.store:
+        if not os.path.isfile(args.store):
+            logger.die(f"Results store {args.store} does not exist")
+        store = ramble.results_store.ResultsStore(args.store)
+    else:
+        ws = ramble.cmd.require_active_workspace(cmd_name="results query")
+        store = ws.results_store
+
+    where = {}
+    for condition in args.where or []:
+        name, sep, value = condition.partition("=")
+        if not sep:
+            logger.die(f"Invalid filter {condition}, expected NAME=VALUE")
+        where[name] = value
+
+    if args.last is not None and args.last < 1:
+        logger.die("--last must be a positive integer")
+
+    aggregate = args.aggregate
+    if aggregate is None and args.group_by:
+        aggregate = "mean"
+
+    try:
+        columns, rows = store.query(
+            foms=args.foms,
+            where=where,
+            group_by=args.group_by,
+            aggregate=aggregate,
+            last=args.last,
+        )
+    except ramble.results_store.ResultsStoreError as e:
+        logger.die(str(e))
+
+    if args.format == "json":
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=2))
+        return
+
+    if not rows:
+        logger.msg("No results found")
+        return
+
+    table = [columns] + [["" if val is None else str(val) for val in row] for row in rows]
+    widths = [max(len(row[idx]) for row in table) for idx in range(len(columns))]
+    for row in table:
+        print("  ".join(val.ljust(width) for val, width in zip(row, widths)).rstrip())
+
+
 def import_results_file(filename):
     """
     Import Ramble experiment results from a JSON file.
@@ -56,5 +163,5 @@ def import_results_file(filename):
 
 
 def results(parser, args):
-    action = {"upload": results_upload}
+    action = {"upload": results_upload, "query": results_query}
     action[args.results_command](args)
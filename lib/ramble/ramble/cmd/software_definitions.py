@@ -63,7 +63,8 @@ def collect_definitions():
 
     for object_type in types_to_print:
         obj_path = ramble.repository.paths[object_type]
-        for obj_inst in obj_path.all_objects():
+        for obj_name in obj_path.all_object_names():
+            obj_inst = obj_path.get_obj_metadata(obj_name)
             obj_repo = obj_path.repo_for_obj(obj_inst.name)
 
             obj_namespace = f"{obj_repo.full_namespace}.{obj_inst.name}"
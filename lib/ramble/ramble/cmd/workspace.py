@@ -18,6 +18,7 @@ import spack.util.string as string
 from spack.util.editor import editor
 import spack.util.environment
 
+import ramble.archiver
 import ramble.cmd
 import ramble.cmd.common.arguments
 import ramble.cmd.common.arguments as arguments
@@ -29,6 +30,7 @@ import ramble.experiment_set
 import ramble.context
 import ramble.pipeline
 import ramble.filters
+import ramble.results_writer
 import ramble.experimental.uploader
 import ramble.software_environments
 import ramble.util.colors as rucolor
@@ -460,7 +462,7 @@ def workspace_setup_setup_parser(subparser):
 
     arguments.add_common_arguments(
         subparser,
-        ["phases", "include_phase_dependencies", "where", "exclude_where", "filter_tags"],
+        ["phases", "include_phase_dependencies", "where", "exclude_where", "filter_tags", "jobs"],
     )
 
 
@@ -481,7 +483,7 @@ def workspace_setup(args):
     pipeline_cls = ramble.pipeline.pipeline_class(current_pipeline)
 
     logger.debug("Setting up workspace")
-    pipeline = pipeline_cls(ws, filters)
+    pipeline = pipeline_cls(ws, filters, jobs=args.jobs)
 
     with ws.write_transaction():
         workspace_run_pipeline(args, pipeline)
@@ -495,7 +497,8 @@ def workspace_analyze_setup_parser(subparser):
         dest="output_formats",
         nargs="+",
         default=["text"],
-        help="list of output formats to write." + "Supported formats are json, yaml, or text",
+        help="list of output formats to write. "
+        + "Supported formats are json, jsonl (JSON Lines), yaml, or text",
         required=False,
     )
 
@@ -524,9 +527,26 @@ def workspace_analyze_setup_parser(subparser):
         help="print out only the summary stats for repeated experiments",
     )
 
+    subparser.add_argument(
+        "--reanalyze",
+        dest="reanalyze",
+        action="store_true",
+        help="analyze every experiment, instead of reusing results of unchanged experiments",
+    )
+
+    subparser.add_argument(
+        "--raw-variables",
+        dest="raw_variables",
+        choices=ramble.results_writer.raw_variables_modes,
+        default="keep",
+        help="how raw variables are written into results files. "
+        + "keep writes every raw variable of every experiment, drop omits them, "
+        + "and dedupe writes variables shared by all experiments only once",
+    )
+
     arguments.add_common_arguments(
         subparser,
-        ["phases", "include_phase_dependencies", "where", "exclude_where", "filter_tags"],
+        ["phases", "include_phase_dependencies", "where", "exclude_where", "filter_tags", "jobs"],
     )
 
 
@@ -534,6 +554,8 @@ def workspace_analyze(args):
     current_pipeline = ramble.pipeline.pipelines.analyze
     ws = ramble.cmd.require_active_workspace(cmd_name="workspace analyze")
     ws.repeat_success_strict = ramble.config.get("config:repeat_success_strict")
+    ws.incremental_analysis = not args.reanalyze
+    ws.results_raw_variables = args.raw_variables
 
     filters = ramble.filters.Filters(
         phase_filters=args.phases,
@@ -552,6 +574,7 @@ def workspace_analyze(args):
         upload=args.upload,
         print_results=args.print_results,
         summary_only=args.summary_only,
+        jobs=args.jobs,
     )
 
     with ws.write_transaction():
@@ -897,6 +920,41 @@ def workspace_archive_setup_parser(subparser):
         help="create a tar.gz of the archive directory for backing up.",
     )
 
+    subparser.add_argument(
+        "--tar-only",
+        action="store_true",
+        dest="tar_only",
+        help="only create the tar file of the archive, without an archive directory. "
+        "Implies `-t`.",
+    )
+
+    subparser.add_argument(
+        "--compression",
+        dest="compression",
+        choices=list(ramble.archiver.compression_extensions.keys()),
+        default=ramble.archiver.default_compression,
+        help="compression of the tar file. gzip uses pigz when it is available "
+        "and more than one job is requested.",
+    )
+
+    subparser.add_argument(
+        "--incremental",
+        "-i",
+        action="store_true",
+        dest="incremental",
+        help="only archive experiments and files which changed since the previous archive. "
+        "Unchanged files are linked from (or referred to in) the previous archives.",
+    )
+
+    subparser.add_argument(
+        "--restore",
+        dest="restore",
+        default=None,
+        metavar="ARCHIVE",
+        help="reassemble the complete contents of an archive (i.e. an incremental archive) "
+        "as a directory in the workspace archive directory, instead of creating an archive.",
+    )
+
     subparser.add_argument(
         "--prefix",
         "-p",
@@ -920,7 +978,7 @@ def workspace_archive_setup_parser(subparser):
     )
 
     arguments.add_common_arguments(
-        subparser, ["phases", "include_phase_dependencies", "where", "exclude_where"]
+        subparser, ["phases", "include_phase_dependencies", "where", "exclude_where", "jobs"]
     )
 
 
@@ -928,6 +986,11 @@ def workspace_archive(args):
     current_pipeline = ramble.pipeline.pipelines.archive
     ws = ramble.cmd.require_active_workspace(cmd_name="workspace archive")
 
+    if args.restore:
+        restore_path = ramble.archiver.restore(ws.archive_dir, args.restore)
+        logger.msg(f"Restored archive {args.restore} into {restore_path}")
+        return
+
     filters = ramble.filters.Filters(
         phase_filters=args.phases,
         include_where_filters=args.where,
@@ -942,6 +1005,10 @@ def workspace_archive(args):
         archive_prefix=args.archive_prefix,
         upload_url=args.upload_url,
         include_secrets=args.include_secrets,
+        tar_only=args.tar_only,
+        compression=args.compression,
+        jobs=args.jobs,
+        incremental=args.incremental,
     )
 
     workspace_run_pipeline(args, pipeline)
@@ -135,6 +135,7 @@ config_defaults = {
         "connect_timeout": 10,
         "n_repeats": "0",
         "repeat_success_strict": True,
+        "render_jobs": 1,
         "verify_ssl": True,
         "checksum": True,
         "dirty": False,
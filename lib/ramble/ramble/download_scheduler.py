@@ -0,0 +1,264 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Concurrent downloads of experiment inputs into the fetch cache
+
+The get_inputs phase of each experiment fetches its inputs one at a time.
+Before experiments are set up, the DownloadScheduler collects the inputs all
+of them use, and downloads each distinct checksum once into
+ramble.caches.fetch_cache using a pool of worker threads. As in
+ramble.stage.InputStage.fetch, the configured mirrors are tried before the
+upstream URLs of an input. The get_inputs phase then links the cached archives
+instead of downloading them.
+"""
+
+import multiprocessing.pool
+import os
+import shutil
+
+import llnl.util.filesystem as fs
+import spack.util.crypto as crypto
+import spack.util.url as url_util
+
+import ramble.caches
+import ramble.fetch_strategy
+import ramble.mirror
+import ramble.util.web
+from ramble.util.logger import logger
+
+#: URL schemes which are downloaded by the scheduler. Inputs using other
+#: schemes are fetched by the experiments using them.
+supported_schemes = ("http", "https", "file")
+
+#: Number of bytes read from a response at a time
+chunk_size = 2**20
+
+
+def schedulable(fetcher, urls):
+    """Whether the scheduler is able to download a fetcher's archive
+
+    Only plain URL fetchers with a checksum are downloaded, as the checksum
+    identifies their archive within the fetch cache.
+
+    Args:
+        fetcher (URLFetchStrategy): Fetcher of the archive
+        urls (list(str)): URLs the archive would be downloaded from
+    """
+    if type(fetcher) is not ramble.fetch_strategy.URLFetchStrategy:
+        return False
+    if not fetcher.cachable or fetcher.extra_options:
+        return False
+    return all(url_util.parse(url).scheme in supported_schemes for url in urls)
+
+
+def mirror_urls(mirrors, mirror_paths):
+    """URLs of an archive within each mirror, in the order InputStage tries them
+
+    Args:
+        mirrors (MirrorCollection): Mirrors to fetch from
+        mirror_paths (MirrorReference | None): Paths of the archive within a mirror
+    """
+    if not mirror_paths:
+        return []
+    return [
+        url_util.join(mirror.fetch_url, rel_path)
+        for mirror in mirrors.values()
+        for rel_path in mirror_paths
+    ]
+
+
+class Download:
+    """An archive to download, and the fetch cache paths to store it in
+
+    Attributes:
+        mirror_urls (list(str)): URLs of the archive within mirrors
+        upstream_urls (list(str)): URLs of the archive's source
+        digest (str): Checksum of the archive
+        storage_paths (list(str)): Paths within the fetch cache
+        error (str | None): Reason the download failed, if it did
+    """
+
+    def __init__(self, upstream_urls, digest):
+        self.mirror_urls = []
+        self.upstream_urls = upstream_urls
+        self.digest = digest
+        self.storage_paths = []
+        self.error = None
+
+    @property
+    def urls(self):
+        """URLs to try, in order"""
+        return self.mirror_urls + self.upstream_urls
+
+
+class DownloadScheduler:
+    """Download archives into the fetch cache using a pool of worker threads
+
+    Downloads are identified by their checksum, so an archive used by many
+    experiments (or by inputs with different names) is only downloaded once.
+    Archives are written to a ``.part`` file next to their cache path, and
+    interrupted downloads are resumed from it when the server supports range
+    requests.
+    """
+
+    def __init__(self, jobs=1, cache=None, mirrors=None, mirror_only=False):
+        """Create a scheduler
+
+        Args:
+            jobs (int): Maximum number of concurrent downloads
+            cache (FsCache): Cache to download into. Defaults to the fetch cache.
+            mirrors (MirrorCollection): Mirrors tried before upstream URLs.
+                Defaults to the configured mirrors.
+            mirror_only (bool): Whether inputs may only be fetched from a
+                mirror. No downloads are scheduled in this case, and inputs
+                are fetched by their experiments.
+        """
+        self.jobs = jobs
+        self.cache = cache if cache is not None else ramble.caches.fetch_cache
+        self.mirrors = mirrors if mirrors is not None else ramble.mirror.MirrorCollection()
+        self.mirror_only = mirror_only
+        self.downloads = {}
+
+    def add(self, fetcher, storage_path, mirror_paths=None):
+        """Schedule the download of a fetcher's archive
+
+        Args:
+            fetcher (URLFetchStrategy): Fetcher of the archive
+            storage_path (str): Path of the archive within the cache
+            mirror_paths (MirrorReference | None): Paths of the archive
+                within a mirror
+
+        Returns:
+            (bool): True if the download was scheduled, False if the fetcher
+            cannot be downloaded by the scheduler
+        """
+        if self.mirror_only:
+            return False
+
+        mirrored = mirror_urls(self.mirrors, mirror_paths)
+        if not schedulable(fetcher, mirrored + fetcher.candidate_urls):
+            return False
+
+        download = self.downloads.get(fetcher.digest)
+        if download is None:
+            download = Download(fetcher.candidate_urls, fetcher.digest)
+            self.downloads[fetcher.digest] = download
+
+        for url in mirrored:
+            if url not in download.mirror_urls:
+                download.mirror_urls.append(url)
+
+        if storage_path not in download.storage_paths:
+            download.storage_paths.append(storage_path)
+        return True
+
+    def run(self):
+        """Perform all scheduled downloads
+
+        Returns:
+            (list(Download)): Downloads which failed. Experiments fetch these
+            inputs themselves, and report any errors.
+        """
+        downloads = list(self.downloads.values())
+        if not downloads:
+            return []
+
+        tp = multiprocessing.pool.ThreadPool(processes=min(self.jobs, len(downloads)))
+        try:
+            tp.map(self._download, downloads)
+        finally:
+            tp.terminate()
+            tp.join()
+
+        return [download for download in downloads if download.error is not None]
+
+    def _download(self, download):
+        """Download an archive, and store it in each of its cache paths"""
+        paths = [os.path.join(self.cache.root, path) for path in download.storage_paths]
+
+        cached = None
+        for path in paths:
+            if os.path.isfile(path):
+                cached = path
+                break
+
+        if cached is None:
+            cached = paths[0]
+            try:
+                self._fetch(download, cached)
+            except (ramble.fetch_strategy.FetchError, OSError) as e:
+                download.error = str(e)
+                logger.debug(f"Download of {download.urls[0]} failed: {e}")
+                return
+
+        for path in paths:
+            if not os.path.exists(path):
+                fs.mkdirp(os.path.dirname(path))
+                try:
+                    os.link(cached, path)
+                except OSError:
+                    shutil.copyfile(cached, path)
+
+    def _fetch(self, download, dest):
+        """Fetch an archive from the first of its URLs which succeeds"""
+        fs.mkdirp(os.path.dirname(dest))
+        partial_file = dest + ".part"
+
+        errors = []
+        for url in download.urls:
+            try:
+                _fetch_url(url, partial_file, download.digest)
+            except (ramble.fetch_strategy.ChecksumError, ramble.util.web.SpackWebError) as e:
+                errors.append(str(e))
+                continue
+            os.replace(partial_file, dest)
+            logger.debug(f"Downloaded {url} to {dest}")
+            return
+
+        raise ramble.fetch_strategy.FailedDownloadError(download.urls[0], "\n".join(errors))
+
+
+def _fetch_url(url, partial_file, digest):
+    """Download a URL into a partial file, and verify its checksum
+
+    The checksum is computed while the archive is written, so it is not read
+    again afterwards. Existing partial files are resumed with a range
+    request, and restarted if the server does not support them.
+    """
+    hasher = crypto.hash_fun_for_digest(digest)()
+    offset = 0
+    if os.path.isfile(partial_file):
+        with open(partial_file, "rb") as f:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(block)
+                offset += len(block)
+
+    response = None
+    if offset:
+        try:
+            _, _, response = ramble.util.web.read_from_url(
+                url, headers={"Range": f"bytes={offset}-"}
+            )
+        except ramble.util.web.SpackWebError:
+            response = None
+        if response is None or response.getcode() != 206:
+            # The range was ignored (and the whole archive is sent) or rejected
+            hasher = crypto.hash_fun_for_digest(digest)()
+            offset = 0
+
+    if response is None:
+        _, _, response = ramble.util.web.read_from_url(url)
+
+    with response, open(partial_file, "ab" if offset else "wb") as f:
+        ramble.fetch_strategy.stream_to_file(response, f, hasher, block_size=chunk_size)
+
+    if hasher.hexdigest() != digest:
+        os.remove(partial_file)
+        raise ramble.fetch_strategy.ChecksumError(
+            f"Checksum failed for {url}", f"Expected {digest} but got {hasher.hexdigest()}"
+        )
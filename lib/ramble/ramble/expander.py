@@ -8,10 +8,12 @@
 
 import string
 import ast
+import functools
 import operator
 import math
 import random
 
+from collections import ChainMap
 from typing import Dict
 
 import ramble.error
@@ -79,6 +81,9 @@ supported_list_function_pointers = {
     "range": range,
 }
 
+# Functions whose results should never be cached
+nondeterministic_functions = {"randrange", "randint"}
+
 
 formatter = string.Formatter()
 
@@ -98,6 +103,129 @@ class VformatDelimiter:
     right = "}"
 
 
+def evaluate_node_contents(
+    contents,
+    is_root,
+    child_indices,
+    child_values,
+    expansion_dict,
+    allow_passthrough=True,
+    expansion_func=str,
+    evaluation_func=eval,
+    no_expand_vars=set(),
+    used_vars=set(),
+    dynamic_names=None,
+):
+    """Compute the value of a single expansion node
+
+    Builds up a string representation of the node, replacing each child's
+    span with the child's value, and performs evaluation and formatting of
+    the resulting string.
+
+    Args:
+        contents (str): raw contents of the node (including delimiters for non-root nodes)
+        is_root (bool): whether the node is the root of its expansion graph
+        child_indices (list): (left, right) indices of each child, relative to contents
+        child_values (list): already computed values of each child
+        expansion_dict (dict): variable definitions to use for expanding
+        detected matches
+        allow_passthrough (bool): if true, expansion is allowed to fail. if
+        false, failed expansion raises an error.
+        expansion_func (func): function to use for expansion of nested
+        variable definitions
+        evaluation_func (func): function to use for evaluating math of strings
+        no_expand_vars (set): set of variable names that should never be expanded
+        used_vars (set): set to add the names of referenced variables into
+        dynamic_names (set): if set, names which are built from the values of
+        other variables (i.e. '{var_{n}}') are added into this set
+
+    Returns:
+        The value of the node
+    """
+    parts = []
+    last_idx = 0
+    for indices, child_value in zip(child_indices, child_values):
+        parts.append(contents[last_idx : indices[0]])
+        parts.append(str(child_value))
+        last_idx = indices[1] + 1
+
+    if last_idx != len(contents):
+        parts.append(contents[last_idx:])
+
+    replaced_contents = "".join(parts)
+
+    if is_root:
+        try:
+            value = evaluation_func(replaced_contents)
+        except SyntaxError:
+            value = replaced_contents
+
+        # Replace escaped curly braces with curly braces
+        if isinstance(value, str):
+            value = value.replace("\\{", "{").replace("\\}", "}")
+        return value
+
+    # Special case '{}'
+    if len(replaced_contents) == 2:
+        return "{}"
+
+    format_kw = replaced_contents[1:-1]
+    kw_parts = format_kw.split(":")
+    required_passthrough = False
+
+    if kw_parts[0] in expansion_dict:
+        used_vars.add(kw_parts[0])
+        # Exit expansion for variables defined as no_expand
+        if kw_parts[0] in no_expand_vars:
+            return expansion_dict[kw_parts[0]]
+        value = expansion_func(
+            expansion_dict,
+            expansion_dict[kw_parts[0]],
+            allow_passthrough=allow_passthrough,
+        )
+    else:
+        value = kw_parts[0]
+        required_passthrough = True
+
+    # Evaluation should go here
+    try:
+        old_value = value
+        value = evaluation_func(value)
+        if old_value != value:
+            required_passthrough = False
+    except SyntaxError:
+        pass
+
+    # If we had a format spec, add it
+    if len(kw_parts) > 1:
+        kw_dict = {"value": value}
+        format_str = f"value:{kw_parts[1]}"
+        try:
+            value = formatter.vformat(
+                VformatDelimiter.left + format_str + VformatDelimiter.right,
+                [],
+                kw_dict,
+            )
+            required_passthrough = False
+        except ValueError:
+            value += f":{kw_parts[1]}"
+        except KeyError:
+            value += f":{kw_parts[1]}"
+
+    # A nested name which did not evaluate as math is looked up from the
+    # values of other variables.
+    if dynamic_names is not None and child_values:
+        if kw_parts[0] in expansion_dict or required_passthrough:
+            dynamic_names.add(kw_parts[0])
+
+    if required_passthrough:
+        value = f"{{{value}}}"
+        if not allow_passthrough:
+            raise_passthrough_error(contents, value)
+
+    return value
+
+
 class ExpansionNode:
     """Class representing a node in a ramble expansion graph"""
 
@@ -171,84 +299,18 @@ class ExpansionNode:
             no_expand_vars (set): set of variable names that should never be expanded
         """
         if self.contents is not None:
-            parts = []
-            last_idx = 0
-            for child in self.children:
-                child_indices = child.relative_indices(self)
-                parts.append(self.contents[last_idx : child_indices[0]])
-                parts.append(str(child.value))
-                last_idx = child_indices[1] + 1
-
-            if last_idx != len(self.contents):
-                parts.append(self.contents[last_idx:])
-
-            if self != self.root:
-                replaced_contents = "".join(parts)
-
-                # Special case '{}'
-                if len(replaced_contents) == 2:
-                    self.value = "{}"
-                    return
-
-                format_kw = replaced_contents[1:-1]
-                kw_parts = format_kw.split(":")
-                required_passthrough = False
-
-                if kw_parts[0] in expansion_dict:
-                    used_vars.add(kw_parts[0])
-                    # Exit expansion for variables defined as no_expand
-                    if kw_parts[0] in no_expand_vars:
-                        self.value = expansion_dict[kw_parts[0]]
-                        return
-                    else:
-                        self.value = expansion_func(
-                            expansion_dict,
-                            expansion_dict[kw_parts[0]],
-                            allow_passthrough=allow_passthrough,
-                        )
-                else:
-                    self.value = kw_parts[0]
-                    required_passthrough = True
-
-                # Evaluation should go here
-                try:
-                    old_value = self.value
-                    self.value = evaluation_func(self.value)
-                    if old_value != self.value:
-                        required_passthrough = False
-                except SyntaxError:
-                    pass
-
-                # If we had a format spec, add it
-                if len(kw_parts) > 1:
-                    kw_dict = {"value": self.value}
-                    format_str = f"value:{kw_parts[1]}"
-                    try:
-                        self.value = formatter.vformat(
-                            VformatDelimiter.left + format_str + VformatDelimiter.right,
-                            [],
-                            kw_dict,
-                        )
-                        required_passthrough = False
-                    except ValueError:
-                        self.value += f":{kw_parts[1]}"
-                    except KeyError:
-                        self.value += f":{kw_parts[1]}"
-
-                if required_passthrough:
-                    self.value = f"{{{self.value}}}"
-                    if not allow_passthrough:
-                        raise_passthrough_error(self.contents, self.value)
-            else:
-                replaced_contents = "".join(parts)
-                try:
-                    self.value = evaluation_func(replaced_contents)
-                except SyntaxError:
-                    self.value = replaced_contents
-
-                # Replace escaped curly braces with curly braces
-                if isinstance(self.value, str):
-                    self.value = self.value.replace("\\{", "{").replace("\\}", "}")
+            self.value = evaluate_node_contents(
+                self.contents,
+                self is self.root,
+                [child.relative_indices(self) for child in self.children],
+                [child.value for child in self.children],
+                expansion_dict,
+                allow_passthrough=allow_passthrough,
+                expansion_func=expansion_func,
+                evaluation_func=evaluation_func,
+                no_expand_vars=no_expand_vars,
+                used_vars=used_vars,
+            )
 
 
 class ExpansionGraph:
@@ -317,11 +379,134 @@ class ExpansionGraph:
         return "\n".join(lines)
 
 
+class CompiledTemplate:
+    """Class representing a pre-parsed expansion string
+
+    The nodes of the underlying ExpansionGraph are flattened into a tuple,
+    ordered by a DFS walk (children before their parents). Each node
+    references its children by position, so the same template can be
+    evaluated any number of times (including re-entrantly) without scanning
+    the input string again.
+    """
+
+    __slots__ = ("str", "nodes")
+
+    def __init__(self, in_str):
+        self.str = in_str
+
+        graph = ExpansionGraph(in_str)
+        positions = {}
+        nodes = []
+        for node in graph.walk():
+            child_indices = tuple(child.relative_indices(node) for child in node.children)
+            child_positions = tuple(positions[id(child)] for child in node.children)
+            positions[id(node)] = len(nodes)
+            nodes.append((node.contents, node is node.root, child_indices, child_positions))
+        self.nodes = tuple(nodes)
+
+    def evaluate(self, expansion_dict, **kwargs):
+        """Evaluate the template against a set of variable definitions
+
+        Args:
+            expansion_dict (dict): variable definitions to use for expanding
+            kwargs: forwarded to evaluate_node_contents
+
+        Returns:
+            The value of the root node
+        """
+        values = []
+        for contents, is_root, child_indices, child_positions in self.nodes:
+            values.append(
+                evaluate_node_contents(
+                    contents,
+                    is_root,
+                    child_indices,
+                    [values[pos] for pos in child_positions],
+                    expansion_dict,
+                    **kwargs,
+                )
+            )
+        return values[-1]
+
+    def variable_references(self):
+        """Statically extract the variable names referenced by this template
+
+        Returns:
+            (tuple): (set of referenced names, whether any name is nested inside
+                     of another expansion, and cannot be determined statically)
+        """
+        names = set()
+        nested = False
+        for contents, is_root, _, child_positions in self.nodes:
+            if is_root:
+                continue
+            if child_positions:
+                nested = True
+            elif len(contents) > 2:
+                names.add(contents[1:-1].split(":")[0])
+        return names, nested
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(in_str):
+    """Parse an expansion string into a (cached) CompiledTemplate"""
+    return CompiledTemplate(in_str)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_math(in_str):
+    """Parse a math string into an AST body, or None if it is not valid python"""
+    try:
+        return ast.parse(in_str, mode="eval").body
+    except SyntaxError:
+        return None
+
+
+def parse_math(in_str):
+    """Parse (with caching) a math string into an AST body
+
+    Raises:
+        SyntaxError: if in_str cannot be parsed
+    """
+    body = _parse_math(in_str)
+    if body is None:
+        raise SyntaxError(f'Unable to parse "{in_str}" as math')
+    return body
+
+
 class ExpansionDict(dict):
     def __missing__(self, key):
         return "{" + key + "}"
 
 
+class VariableScope(ChainMap):
+    """Layered, copy-on-write variable definitions
+
+    Lookups search each layer in order, so the first layer (the local
+    overrides) takes precedence over its parents. Writes and deletions only
+    affect the first layer, and copy() only copies the first layer.
+
+    This allows many scopes (e.g. one per experiment) to share the same
+    parent definitions, which must not be modified after they are shared.
+    """
+
+    def snapshot(self):
+        """Capture the state of this scope, for use with matches_snapshot"""
+        return (self.maps[0].copy(), tuple(self.maps[1:]))
+
+    def matches_snapshot(self, snapshot):
+        """Test if this scope holds the same definitions as a snapshot
+
+        Parent layers are compared by identity, as they are never modified.
+        """
+        local, parents = snapshot
+        return (
+            len(parents) == len(self.maps) - 1
+            and all(a is b for a, b in zip(parents, self.maps[1:]))
+            and self.maps[0] == local
+        )
+
+
 class Expander:
     """A class that will track and expand keyword arguments
 
@@ -343,6 +528,16 @@ class Expander:
         self._used_variables = set()
         self._used_variable_stage = set()
 
+        # Variable names constructed from the values of other variables
+        self._dynamic_names = set()
+
+        # Cache of top-level expansion results. Entries are only valid while
+        # the variable definitions (and no expand set) match the snapshot
+        # taken when the cache was (re)initialized.
+        self._expansion_cache = {}
+        self._expansion_cache_vars = None
+        self._cacheable = True
+
         self._experiment_set = experiment_set
 
         self._application_name = None
@@ -383,6 +578,53 @@ class Expander:
     def copy(self):
         return Expander(self._variables.copy(), self._experiment_set)
 
+    def variables_snapshot(self):
+        """Capture the variable definitions, for use with variables_match
+
+        The variable dictionary is owned by the caller and can be modified in
+        place at any time, so a (shallow) snapshot is compared against it. For
+        a VariableScope, only its local overrides are copied into the snapshot.
+        """
+        if isinstance(self._variables, VariableScope):
+            variables = self._variables.snapshot()
+        else:
+            variables = self._variables.copy()
+        return (variables, set(self._no_expand_vars))
+
+    def variables_match(self, snapshot):
+        """Test if the variable definitions are the same as in a snapshot"""
+        if snapshot is None:
+            return False
+
+        variables, no_expand_vars = snapshot
+        if isinstance(self._variables, VariableScope):
+            same_variables = self._variables.matches_snapshot(variables)
+        else:
+            same_variables = self._variables == variables
+        return same_variables and self._no_expand_vars == no_expand_vars
+
+    def _expansion_cache_is_valid(self):
+        """Check whether cached expansions are valid, resetting the cache if not"""
+        if self.variables_match(self._expansion_cache_vars):
+            return True
+
+        self._expansion_cache = {}
+        self._expansion_cache_vars = self.variables_snapshot()
+        return False
+
+    def _cached_expansion(self, cache_key):
+        """Look up a previous expansion result
+
+        Args:
+            cache_key (tuple): key of the expansion, or None if it cannot be cached
+
+        Returns:
+            (tuple or None): (value, used variables) if cached, otherwise None
+        """
+        if cache_key is None or not self._expansion_cache_is_valid():
+            return None
+        return self._expansion_cache.get(cache_key)
+
     @property
     def application_name(self):
         if not self._application_name:
@@ -493,8 +735,7 @@ class Expander:
         pulling a list from a different experiment.
         """
         try:
-            math_ast = ast.parse(str(var), mode="eval")
-            value = self.eval_math(math_ast.body)
+            value = self.eval_math(parse_math(str(var)))
             if isinstance(value, list):
                 return value
             return var
@@ -567,23 +808,54 @@ class Expander:
         if ramble.config.get("config:disable_passthrough"):
             passthrough_setting = False
 
-        logger.debug(f"BEGINNING OF EXPAND_VAR STACK ON {var}")
-        expansions = self._variables
-        if extra_vars:
-            expansions = self._variables.copy()
-            expansions.update(extra_vars)
+        # Only expansions that do not depend on extra_vars are cached
+        cache_key = None if extra_vars else (str(var), passthrough_setting)
+        cached = self._cached_expansion(cache_key)
 
-        try:
-            value = self._partial_expand(
-                expansions, str(var), allow_passthrough=passthrough_setting
-            ).lstrip()
-        except RamblePassthroughError as e:
-            if not passthrough_setting:
-                raise RambleSyntaxError(
-                    f"Encountered a passthrough error while expanding {var}\n" f"{e}"
+        if cached is not None:
+            value, used_vars, dynamic_names = cached
+            self._used_variable_stage.update(used_vars)
+            self._dynamic_names.update(dynamic_names)
+            logger.debug(f"CACHED EXPAND_VAR OF {var}: {value}")
+        else:
+            logger.debug(f"BEGINNING OF EXPAND_VAR STACK ON {var}")
+            expansions = self._variables
+            if extra_vars:
+                expansions = VariableScope(extra_vars, self._variables)
+
+            # Track the variables used by this expansion on their own, so they
+            # can be stored alongside the cached value
+            stage = self._used_variable_stage
+            all_dynamic_names = self._dynamic_names
+            self._used_variable_stage = set()
+            self._dynamic_names = set()
+            self._cacheable = True
+            try:
+                value = self._partial_expand(
+                    expansions, str(var), allow_passthrough=passthrough_setting
+                ).lstrip()
+            except RamblePassthroughError as e:
+                if not passthrough_setting:
+                    raise RambleSyntaxError(
+                        f"Encountered a passthrough error while expanding {var}\n" f"{e}"
+                    )
+            finally:
+                used_vars = self._used_variable_stage
+                dynamic_names = self._dynamic_names
+                stage.update(used_vars)
+                all_dynamic_names.update(dynamic_names)
+                self._used_variable_stage = stage
+                self._dynamic_names = all_dynamic_names
+
+            if cache_key is not None and self._cacheable:
+                self._expansion_cache[cache_key] = (
+                    value,
+                    frozenset(used_vars),
+                    frozenset(dynamic_names),
                 )
 
-        logger.debug(f"END OF EXPAND_VAR STACK {value}")
+            logger.debug(f"END OF EXPAND_VAR STACK {value}")
+
         if typed:
             logger.debug(f"BEGINNING OF TYPING ON {value}")
             try:
@@ -648,18 +920,18 @@ class Expander:
         """
 
         if isinstance(in_str, str):
-            str_graph = ExpansionGraph(in_str)
-            for node in str_graph.walk():
-                node.define_value(
-                    expansion_vars,
-                    allow_passthrough=allow_passthrough,
-                    expansion_func=self._partial_expand,
-                    evaluation_func=self.perform_math_eval,
-                    no_expand_vars=self._no_expand_vars,
-                    used_vars=self._used_variable_stage,
-                )
+            template = compile_template(in_str)
+            value = template.evaluate(
+                expansion_vars,
+                allow_passthrough=allow_passthrough,
+                expansion_func=self._partial_expand,
+                evaluation_func=self.perform_math_eval,
+                no_expand_vars=self._no_expand_vars,
+                used_vars=self._used_variable_stage,
+                dynamic_names=self._dynamic_names,
+            )
 
-            return str(str_graph.root.value)
+            return str(value)
 
         return str(in_str)
 
@@ -675,8 +947,7 @@ class Expander:
 
         """
         try:
-            math_ast = ast.parse(in_str, mode="eval")
-            out_str = self.eval_math(math_ast.body)
+            out_str = self.eval_math(parse_math(in_str))
             return out_str
         except MathEvaluationError as e:
             logger.debug(f'   Math input is: "{in_str}"')
@@ -765,6 +1036,9 @@ class Expander:
         for kw in node.keywords:
             kwargs[self.eval_math(kw.arg)] = self.eval_math(kw.value)
 
+        if node.func.id in nondeterministic_functions:
+            self._cacheable = False
+
         if node.func.id in supported_scalar_function_pointers.keys():
             func = supported_scalar_function_pointers[node.func.id]
             return func(*args, **kwargs)
@@ -841,6 +1115,8 @@ class Expander:
             var_name = self._ast_name(node.left)
             if isinstance(node.comparators[0], ast.Attribute):
                 namespace = self.eval_math(node.comparators[0])
+                # Values from other experiments can change independently of this expander
+                self._cacheable = False
                 val = self._experiment_set.get_var_from_experiment(
                     namespace, self.expansion_str(var_name)
                 )
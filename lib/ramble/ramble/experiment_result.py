@@ -51,22 +51,16 @@ class ExperimentResult:
         """Generate a dict for encoders (json, yaml) and uploaders.
 
         The generated dict preserves the existing serialized format
-        so that previous result files work as expected.
+        so that previous result files work as expected. It refers to the
+        attributes of this result instead of copying them, so results of
+        large workspaces are not duplicated in memory.
         """
-        import copy
-
         output = {}
-        obj_keys = {}
-
-        obj_dict = copy.deepcopy(self.__dict__)
-
-        if "keys" in obj_dict:
-            obj_keys = obj_dict["keys"]
 
         for lookup_key, output_val in _OUTPUT_MAPPING.items():
             if lookup_key == "keys":
-                output.update(obj_keys)
+                output.update(self.keys)
             else:
-                output[output_val] = obj_dict[lookup_key]
+                output[output_val] = getattr(self, lookup_key)
 
         return output
@@ -10,6 +10,9 @@ from enum import Enum
 import os
 import math
 import fnmatch
+import itertools
+import multiprocessing
+import sys
 
 import ramble.expander
 from ramble.expander import Expander
@@ -25,6 +28,36 @@ import ramble.context
 
 import spack.util.naming
 
+#: Number of rendered objects handed to a worker at a time in parallel rendering
+render_chunk_size = 64
+
+#: State shared with forked rendering workers. Set by the parent before the
+#: worker pool is created, so it never needs to be pickled.
+_tracking_state = None
+
+
+def _track_used_variables_chunk(chunk):
+    """Worker entry point to collect used variables for a chunk of objects
+
+    Args:
+        chunk (list): list of (variables, repeats) tuples from the renderer
+
+    Returns:
+        (set or None): Union of the used variables of each object in the
+                       chunk, or None if any of them failed to render.
+    """
+    exp_set, exp_template_name, context = _tracking_state
+    try:
+        return exp_set._track_used_variables(exp_template_name, context, chunk)
+    except (Exception, SystemExit):
+        # Errors are re-raised by the parent, when it renders the chunk serially
+        return None
+
+
+def _parallel_render_supported():
+    """Parallel rendering relies on forking the current process"""
+    return sys.platform not in ("darwin", "win32")
+
 
 class ExperimentSet:
     """Class to represent a full set of experiments
@@ -52,6 +85,7 @@ class ExperimentSet:
         self.chained_order = []
         self._workspace = workspace
         self._context = {}
+        self._tag_index = None
 
         for context in self._contexts:
             self._context[context] = ramble.context.Context()
@@ -339,7 +373,7 @@ class ExperimentSet:
             ),
         )
 
-        app_inst.read_status()
+        app_inst.read_status(self._workspace)
 
         try:
             app_inst.validate_experiment()
@@ -451,18 +485,12 @@ class ExperimentSet:
         tracking_group.n_repeats = final_context.n_repeats
         tracking_group.used_variables = set()
 
-        used_variables = set()
-        for tracking_vars, repeats in renderer.render_objects(
+        tracking_objects = renderer.render_objects(
             tracking_group, exclude_where=exclude_where, ignore_used=False, fatal=False
-        ):
-            app_inst = self._prepare_experiment(
-                experiment_template_name, tracking_vars, final_context, repeats
-            )
-
-            final_exp_name = app_inst.expander.expand_var_name(self.keywords.experiment_namespace)
-
-            exp_used_variables = app_inst.build_used_variables(self._workspace)
-            used_variables = used_variables.union(exp_used_variables)
+        )
+        used_variables = self._analyze_used_variables(
+            experiment_template_name, final_context, tracking_objects
+        )
         render_group.used_variables = used_variables.copy()
 
         rendered_experiments = set()
@@ -495,6 +523,176 @@ class ExperimentSet:
                 rendered_experiments.add(final_exp_namespace)
                 self.experiments[final_exp_namespace] = app_inst
                 self.experiment_order.append(final_exp_namespace)
+                self._tag_index = None
+
+    def _track_used_variables(self, exp_template_name, context, objects):
+        """Collect the variables used by a set of rendered objects
+
+        Args:
+            exp_template_name (str): Template name for experiments
+            context (Context): Context object for these experiments
+            objects (iterable): (variables, repeats) tuples from the renderer
+
+        Returns:
+            (set): Union of all variables used by the objects
+        """
+        used_variables = set()
+        for tracking_vars, repeats in objects:
+            app_inst = self._prepare_experiment(exp_template_name, tracking_vars, context, repeats)
+            used_variables.update(app_inst.build_used_variables(self._workspace))
+        return used_variables
+
+    def _analyze_used_variables(self, exp_template_name, context, objects):
+        """Determine the variables used by all tracking objects
+
+        All tracking objects share the same application, workload, and
+        modifiers, and only differ in the values of their vector variables.
+        Rather than preparing every object, a single representative object is
+        prepared and tracked. Its used variables are then extended by
+        statically analyzing the references within every possible value of
+        the used vector variables (and of any variable they reference).
+
+        If the result cannot be determined statically, because variable names
+        are built from the values of other variables (i.e. '{var_{n}}'), the
+        remaining objects are tracked individually.
+
+        Args:
+            exp_template_name (str): Template name for experiments
+            context (Context): Context object for these experiments
+            objects (iterable): (variables, repeats) tuples from the renderer
+
+        Returns:
+            (set): Union of all variables used by the objects
+        """
+        objects = iter(objects)
+        first_object = next(objects, None)
+        if first_object is None:
+            return set()
+
+        tracking_vars, repeats = first_object
+        app_inst = self._prepare_experiment(exp_template_name, tracking_vars, context, repeats)
+        used_variables = set(app_inst.build_used_variables(self._workspace))
+
+        if not app_inst.expander._dynamic_names:
+            static_used = self._static_used_variables(app_inst, context, used_variables)
+            if static_used is not None:
+                return static_used
+
+        logger.debug(
+            f"Used variables in {self.experiment_namespace} cannot be determined "
+            "statically. Tracking all experiments."
+        )
+        used_variables.update(self._collect_used_variables(exp_template_name, context, objects))
+        return used_variables
+
+    def _static_used_variables(self, app_inst, context, used_variables):
+        """Extend a representative set of used variables to all vector values
+
+        Args:
+            app_inst (ApplicationBase): Representative (tracked) experiment
+            context (Context): Context object for these experiments
+            used_variables (set): Variables used by the representative experiment
+
+        Returns:
+            (set or None): All variables used by experiments rendered from
+                           context, or None if they cannot be determined statically
+        """
+        # Collect all possible values of the vector variables
+        vectors = {}
+        list_expander = ramble.expander.Expander(context.variables, None)
+        for name, unexpanded in context.variables.items():
+            value = list_expander.expand_lists(unexpanded)
+            if isinstance(value, list):
+                vectors[name] = value
+
+        # The experiment definition itself changes across objects
+        if self.keywords.application_name in vectors or self.keywords.workload_name in vectors:
+            return None
+
+        defined = set(app_inst.variables.keys()).union(vectors.keys())
+        no_expand_vars = app_inst.expander._no_expand_vars
+
+        all_used = set(used_variables)
+        pending = [name for name in used_variables if name in vectors]
+        visited = set()
+        while pending:
+            name = pending.pop()
+            if name in visited or name in no_expand_vars:
+                continue
+            visited.add(name)
+
+            values = vectors[name] if name in vectors else [app_inst.variables.get(name)]
+            for value in values:
+                if not isinstance(value, str):
+                    continue
+
+                references, nested = ramble.expander.compile_template(value).variable_references()
+                if nested:
+                    return None
+
+                for ref in references:
+                    if ref in defined and ref not in visited:
+                        all_used.add(ref)
+                        pending.append(ref)
+
+        return all_used
+
+    def _collect_used_variables(self, exp_template_name, context, objects):
+        """Collect the variables used by all tracking objects
+
+        When ``config:render_jobs`` is larger than 1, the rendered objects are
+        split into chunks which are processed by a pool of forked worker
+        processes. Only the sets of used variable names are sent back to this
+        process, so the result is identical to a serial pass.
+
+        Args:
+            exp_template_name (str): Template name for experiments
+            context (Context): Context object for these experiments
+            objects (iterable): (variables, repeats) tuples from the renderer
+
+        Returns:
+            (set): Union of all variables used by the objects
+        """
+        global _tracking_state
+
+        render_jobs = ramble.config.get("config:render_jobs") or 1
+
+        objects = iter(objects)
+        chunks = iter(lambda: list(itertools.islice(objects, render_chunk_size)), [])
+        first_chunk = next(chunks, [])
+
+        used_variables = self._track_used_variables(exp_template_name, context, first_chunk)
+
+        # Everything fit in a single chunk, there is no work left to distribute
+        if len(first_chunk) < render_chunk_size:
+            return used_variables
+
+        if render_jobs <= 1 or not _parallel_render_supported():
+            for chunk in chunks:
+                used_variables.update(
+                    self._track_used_variables(exp_template_name, context, chunk)
+                )
+            return used_variables
+
+        logger.debug(f"Rendering {self.experiment_namespace} with {render_jobs} jobs")
+
+        _tracking_state = (self, exp_template_name, context)
+        mp_context = multiprocessing.get_context("fork")
+        try:
+            with mp_context.Pool(processes=render_jobs) as pool:
+                # Keep the chunks, in case one of them needs to be re-rendered
+                # serially to report an error.
+                pending = list(chunks)
+                results = pool.map(_track_used_variables_chunk, pending)
+        finally:
+            _tracking_state = None
+
+        for chunk, chunk_used in zip(pending, results):
+            if chunk_used is None:
+                chunk_used = self._track_used_variables(exp_template_name, context, chunk)
+            used_variables.update(chunk_used)
+
+        return used_variables
 
     def build_experiment_chains(self):
         base_experiments = self.experiment_order.copy()
@@ -560,6 +758,10 @@ class ExperimentSet:
         provided which both include, and exclude the same experiment, the
         experiment will be excluded.
 
+        Tags are looked up in an index of the experiments which have them, and
+        each expression is only evaluated for experiments which have not
+        already been filtered out.
+
         Args:
             expression: A logical expression to evaluate, with each experiment
         Yields:
@@ -567,26 +769,83 @@ class ExperimentSet:
             inst: An application instance representing the experiment
         """
 
-        for exp, inst, idx in self.all_experiments():
-            active = True
+        experiments = list(self.all_experiments())
+        selected = {exp for exp, _, _ in experiments}
 
-            if filters.include_where:
-                for expression in filters.include_where:
-                    if not inst.expander.evaluate_predicate(expression):
-                        active = False
+        if filters.tags:
+            tag_index = self._experiment_tag_index()
+            for tag in filters.tags:
+                selected &= tag_index.get(tag, set())
 
-            if filters.exclude_where:
-                for expression in filters.exclude_where:
-                    if inst.expander.evaluate_predicate(expression):
-                        active = False
+        values = {}
+        if filters.include_where:
+            for expression in filters.include_where:
+                candidates = [exp for exp in experiments if exp[0] in selected]
+                selected = self._matching_experiments(expression, candidates, values)
 
-            if filters.tags:
-                if not inst.has_tags(filters.tags):
-                    active = False
+        if filters.exclude_where:
+            for expression in filters.exclude_where:
+                candidates = [exp for exp in experiments if exp[0] in selected]
+                selected -= self._matching_experiments(expression, candidates, values)
 
-            if active and inst.is_actionable():
+        for exp, inst, idx in experiments:
+            if exp in selected:
                 yield exp, inst, idx
 
+    def _experiment_tag_index(self):
+        """Map each tag to the names of the experiments which have it
+
+        Returns:
+            (dict): Tag names, mapped to sets of experiment names
+        """
+        if self._tag_index is None:
+            self._tag_index = {}
+            for exp, inst, _ in self.all_experiments():
+                for tag in inst.experiment_tags or []:
+                    self._tag_index.setdefault(tag, set()).add(exp)
+        return self._tag_index
+
+    def _matching_experiments(self, expression, experiments, values):
+        """Evaluate a logical expression for a list of experiments
+
+        The result of an expression only depends on the values of the
+        variables it references, so experiments are grouped by those values
+        and the expression is evaluated once per group. Expressions with
+        nested references (i.e. '{var_{n}}') are evaluated for every
+        experiment.
+
+        Args:
+            expression (str): Logical expression to evaluate
+            experiments (list): (name, instance, index) tuples of experiments
+            values (dict): Expanded variable values, keyed by experiment name
+                           and variable name. Shared between expressions.
+
+        Returns:
+            (set): Names of experiments the expression is True for
+        """
+        template = ramble.expander.compile_template(expression)
+        var_names, nested = template.variable_references()
+        var_names = sorted(var_names)
+
+        results = {}
+        matching = set()
+        for exp, inst, _ in experiments:
+            if nested:
+                key = exp
+            else:
+                key = []
+                for var_name in var_names:
+                    if (exp, var_name) not in values:
+                        values[exp, var_name] = inst.expander.expand_var_name(var_name)
+                    key.append(values[exp, var_name])
+                key = tuple(key)
+
+            if key not in results:
+                results[key] = inst.expander.evaluate_predicate(expression)
+            if results[key]:
+                matching.add(exp)
+        return matching
+
     def add_chained_experiment(self, name, instance):
         if name in self.chained_experiments.keys():
             raise RambleExperimentSetError(
@@ -595,6 +854,7 @@ class ExperimentSet:
             )
         self.chained_experiments[name] = instance
         self.chained_order.append(name)
+        self._tag_index = None
 
     def search_primary_experiments(self, pattern):
         """Search primary experiments using a glob syntax.
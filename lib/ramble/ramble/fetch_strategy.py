@@ -31,6 +31,7 @@ import os.path
 import re
 import shutil
 import sys
+import time
 
 
 import llnl.util.tty as tty
@@ -54,11 +55,15 @@ from spack.util.string import comma_and, quote
 from spack.version import Version, ver
 
 import ramble.config
+import ramble.util.hashing
 from ramble.util.logger import logger
 
 #: List of all fetch strategies, created by FetchStrategy metaclass.
 all_strategies = []
 
+#: Number of bytes copied at a time when an archive is written to disk
+stream_block_size = 4 * 2**20
+
 CONTENT_TYPE_MISMATCH_WARNING_TEMPLATE = (
     "The contents of {subject} look like {content_type}.  Either the URL"
     " you are trying to use does not exist or you have an internet gateway"
@@ -73,6 +78,44 @@ def warn_content_type_mismatch(subject, content_type="HTML"):
     )
 
 
+def stream_to_file(source, dest, hasher=None, block_size=stream_block_size):
+    """Copy a readable binary stream into a file, hashing it along the way
+
+    Args:
+        source: Stream to read from (i.e. a URL response)
+        dest: File object to write to
+        hasher: hashlib object to update with the copied bytes, if any
+        block_size (int): Number of bytes to copy at a time
+
+    Returns:
+        (int): The number of bytes copied
+    """
+    copied = 0
+    for block in iter(lambda: source.read(block_size), b""):
+        if hasher is not None:
+            hasher.update(block)
+        dest.write(block)
+        copied += len(block)
+    return copied
+
+
+def _format_bytes(num_bytes):
+    """Format a number of bytes for log messages"""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TiB"
+
+
+def _local_path(url):
+    """Return the path a file:// URL refers to, or None for other URLs"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme != "file" or sys.platform == "win32":
+        return None
+    return urllib.parse.unquote(parsed.path)
+
+
 def _needs_stage(fun):
     """Many methods on fetch strategies require a stage to be set
     using set_stage().  This decorator adds a check for self.stage."""
@@ -277,6 +320,9 @@ class URLFetchStrategy(FetchStrategy):
 
         self.extension = kwargs.get("extension", None)
 
+        # Archive path and digest computed while the archive was fetched
+        self._fetched_digest = None
+
         if not self.url:
             raise ValueError("URLFetchStrategy requires a url for fetching.")
 
@@ -320,6 +366,8 @@ class URLFetchStrategy(FetchStrategy):
             logger.debug(f"Already downloaded {self.archive_file}")
             return
 
+        self._fetched_digest = None
+
         url = None
         errors = []
         for url in self.candidate_urls:
@@ -383,6 +431,7 @@ class URLFetchStrategy(FetchStrategy):
         save_file = None
         if self.stage.save_filename:
             save_file = self.stage.save_filename
+        partial_file = save_file + ".part"
         logger.msg(f"Fetching {url}")
 
         # Check if we're about to try and open a broken simlink, and if so
@@ -391,23 +440,46 @@ class URLFetchStrategy(FetchStrategy):
         if os.path.islink(save_file) and not os.path.exists(save_file):
             os.unlink(save_file)
 
-        # Run urllib but grab the mime type from the http headers
+        # Compute the digest while the archive is written, so check() does
+        # not need to read it again
+        hasher = crypto.hash_fun_for_digest(self.digest)() if self.digest else None
+
+        start_time = time.time()
+        headers = ""
+        local_path = _local_path(url)
         try:
-            url, headers, response = ramble.util.web.read_from_url(url)
-        except ramble.util.web.SpackWebError as e:
+            if local_path is not None:
+                if hasher is None:
+                    # Lets the OS copy the file (i.e. using sendfile)
+                    shutil.copyfile(local_path, partial_file)
+                    num_bytes = os.path.getsize(partial_file)
+                else:
+                    with open(local_path, "rb") as source, open(partial_file, "wb") as dest:
+                        num_bytes = stream_to_file(source, dest, hasher)
+            else:
+                url, headers, response = ramble.util.web.read_from_url(url)
+                with response, open(partial_file, "wb") as dest:
+                    num_bytes = stream_to_file(response, dest, hasher)
+        except (ramble.util.web.SpackWebError, OSError) as e:
             # clean up archive on failure.
             if self.archive_file:
                 os.remove(self.archive_file)
-            if save_file and os.path.exists(save_file):
-                os.remove(save_file)
+            if os.path.exists(partial_file):
+                os.remove(partial_file)
             msg = f"urllib failed to fetch with error {e}"
             raise FailedDownloadError(url, msg)
 
-        with open(save_file, "wb") as _open_file:
-            shutil.copyfileobj(response, _open_file)
+        elapsed = time.time() - start_time
+        logger.msg(
+            f"Fetched {_format_bytes(num_bytes)} in {elapsed:.2f} s "
+            f"({_format_bytes(num_bytes / elapsed if elapsed else 0)}/s)"
+        )
+
+        if hasher is not None:
+            self._fetched_digest = (save_file, hasher.hexdigest())
 
         self._check_headers(str(headers))
-        return None, save_file
+        return partial_file, save_file
 
     @_needs_stage
     def _fetch_curl(self, url):
@@ -598,7 +670,18 @@ class URLFetchStrategy(FetchStrategy):
             raise NoDigestError("Attempt to check URLFetchStrategy with no digest.")
 
         checker = crypto.Checker(self.digest)
-        if not checker.check(self.archive_file):
+        if self._fetched_digest is not None and self._fetched_digest[0] == self.archive_file:
+            # Computed while the archive was fetched
+            checker.sum = self._fetched_digest[1]
+            valid = checker.sum == checker.hexdigest
+        elif checker.hash_name == "sha256":
+            # Avoid re-reading archives which were already verified
+            checker.sum = ramble.util.hashing.hash_file(self.archive_file)
+            valid = checker.sum == checker.hexdigest
+        else:
+            valid = checker.check(self.archive_file)
+
+        if not valid:
             raise ChecksumError(
                 f"{checker.hash_name} checksum failed for {self.archive_file}",
                 f"Expected {self.digest} but got {checker.sum}",
@@ -164,6 +164,11 @@ class PhaseGraph(AttributeGraph):
 
         super().__init__(obj_inst)
 
+        # Phase nodes are shared by all instances of an object, so their
+        # attribute refers to the instance which most recently built a graph.
+        # Each graph records the functions of its own instance.
+        self._phase_functions = {}
+
         # Define all graph nodes
         for phase_node in phase_definitions.values():
             if phase_node.obj_inst is None:
@@ -195,9 +200,21 @@ class PhaseGraph(AttributeGraph):
 
         phase_func = getattr(func_obj, f"_{node.key}")
         node.set_attribute(phase_func)
+        self._phase_functions[node.key] = phase_func
 
         super().add_node(node)
 
+    def phase_function(self, phase_name):
+        """Return the function this graph's instance runs for a phase
+
+        Args:
+            phase_name (str): Name of the phase
+
+        Returns:
+            (func): The phase function, bound to the object that owns the phase
+        """
+        return self._phase_functions[phase_name]
+
     def update_graph(self, phase_name, dependencies=[], internal_order=False, obj_inst=None):
         """Update the graph with a new phase and / or new dependencies.
 
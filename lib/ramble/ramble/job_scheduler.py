@@ -0,0 +1,166 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Concurrent execution of experiment executors
+
+The execute pipeline (``ramble on``) runs the executor of each experiment one
+after another. The JobScheduler runs them using a bounded number of worker
+threads instead. Each job can also occupy a number of slots (such as the
+cores its experiment uses), in which case jobs are only started while the
+slots of all running jobs fit within the available slots.
+"""
+
+import threading
+import time
+
+import spack.util.spack_json as sjson
+from spack.util.executable import Executable, ProcessError
+
+
+class Job:
+    """An experiment's executor command, and the record of running it
+
+    Attributes:
+        name (str): Name of the experiment
+        command (list(str)): Executable and arguments to run
+        slots (int): Number of slots the job occupies while it runs
+        log_path (str | None): File the output of the command is appended to
+        start_time (float | None): Time the command started
+        end_time (float | None): Time the command completed
+        returncode (int | None): Exit status of the command
+        error (str | None): Reason the command could not be run, if it could not
+    """
+
+    def __init__(self, name, command, slots=1, log_path=None):
+        self.name = name
+        self.command = command
+        self.slots = slots
+        self.log_path = log_path
+        self.start_time = None
+        self.end_time = None
+        self.returncode = None
+        self.error = None
+
+    @property
+    def succeeded(self):
+        return self.error is None and self.returncode == 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "command": self.command,
+            "slots": self.slots,
+            "log_file": self.log_path,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "returncode": self.returncode,
+            "error": self.error,
+        }
+
+
+class JobScheduler:
+    """Run jobs concurrently, throttled by a number of workers and slots
+
+    Jobs are started in the order they were added. When the next job does not
+    fit within the free slots, later jobs which fit are started instead. A job
+    which needs more slots than are available runs on its own.
+    """
+
+    def __init__(self, jobs=1, slots=None):
+        """Create a scheduler
+
+        Args:
+            jobs (int): Maximum number of concurrently running jobs
+            slots (int | None): Total slots available to running jobs.
+                Slots are not limited when this is None.
+        """
+        self.jobs = jobs
+        self.slots = slots
+        self.scheduled = []
+
+    def add(self, job):
+        """Schedule a job to run"""
+        self.scheduled.append(job)
+
+    def run(self, progress=None):
+        """Run all scheduled jobs, and wait for them to complete
+
+        Args:
+            progress (func): Called with each job as it completes, and the
+                number of jobs which completed so far
+
+        Returns:
+            (list(Job)): Jobs which failed
+        """
+        pending = list(self.scheduled)
+        completed = []
+        num_running = 0
+        used_slots = 0
+        num_completed = 0
+        condition = threading.Condition()
+
+        def _worker(job):
+            try:
+                self._run_job(job)
+            finally:
+                with condition:
+                    completed.append(job)
+                    condition.notify()
+
+        while pending or num_running:
+            with condition:
+                idx = 0
+                while idx < len(pending) and num_running < self.jobs:
+                    job = pending[idx]
+                    if num_running and not self._fits(job, used_slots):
+                        idx += 1
+                        continue
+
+                    pending.pop(idx)
+                    num_running += 1
+                    used_slots += job.slots
+                    threading.Thread(target=_worker, args=(job,), daemon=True).start()
+
+                while not completed:
+                    condition.wait()
+                finished = list(completed)
+                completed.clear()
+
+            for job in finished:
+                num_running -= 1
+                used_slots -= job.slots
+                num_completed += 1
+                if progress is not None:
+                    progress(job, num_completed)
+
+        return [job for job in self.scheduled if not job.succeeded]
+
+    def _fits(self, job, used_slots):
+        """Whether a job fits within the free slots"""
+        return self.slots is None or used_slots + job.slots <= self.slots
+
+    def _run_job(self, job):
+        """Run the command of a job, and record its exit status"""
+        job.start_time = time.time()
+        try:
+            executable = Executable(job.command[0])
+            if job.log_path:
+                with open(job.log_path, "a") as f:
+                    executable(*job.command[1:], output=f, error=f, fail_on_error=False)
+            else:
+                executable(*job.command[1:], fail_on_error=False)
+            job.returncode = executable.returncode
+        except (ProcessError, OSError) as e:
+            job.error = str(e)
+        finally:
+            job.end_time = time.time()
+
+    def write_record(self, path):
+        """Write the start and end times, and exit status of each job as JSON"""
+        with open(path, "w") as f:
+            sjson.dump({"jobs": [job.to_dict() for job in self.scheduled]}, f)
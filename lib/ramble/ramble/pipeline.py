@@ -6,20 +6,28 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import contextlib
 from enum import Enum
+import multiprocessing
 import stat
 import os
 import shutil
 import py.path
 import shlex
+import sys
 
 import llnl.util.filesystem as fs
 import llnl.util.tty as tty
 from llnl.util.tty.color import cprint
 
 import ramble.application
+import ramble.archiver
+import ramble.batching
+import ramble.caches
 import ramble.config
+import ramble.download_scheduler
 import ramble.experiment_set
+import ramble.job_scheduler
 import ramble.repository
 import ramble.software_environments
 import ramble.util.hashing
@@ -45,11 +53,95 @@ if not ramble.config.get("config:disable_progress_bar", False):
         logger.die("Module `tqdm` is not found. Ensure requirements.txt are installed.")
 
 
+#: State shared with forked analysis workers. Set by the parent before the
+#: worker pool is created, so it never needs to be pickled.
+_analysis_state = None
+
+
+def _analyze_experiment_worker(exp_idx):
+    """Worker entry point to analyze a single experiment
+
+    Args:
+        exp_idx (int): Index of the experiment within the analyzed experiments
+
+    Returns:
+        (tuple | None): The number of phases run, the results the experiment
+        added to the workspace, its status, and its ExperimentResult. None if
+        analysis raised an error, in which case the parent analyzes the
+        experiment again itself.
+    """
+    pipeline, experiments = _analysis_state
+    exp, app_inst, idx = experiments[exp_idx]
+    workspace = pipeline.workspace
+
+    # Per experiment output from concurrent workers would be interleaved
+    pipeline.suppress_per_experiment_prints = True
+
+    num_results = len(workspace.results["experiments"]) if workspace.results else 0
+    try:
+        phase_count = pipeline._execute_experiment(
+            exp, app_inst, idx, exp_idx + 1, len(experiments)
+        )
+    except (Exception, SystemExit):
+        return None
+    finally:
+        # Records buffered in this worker are lost when it exits
+        workspace.experiment_index.flush()
+        ramble.caches.file_hash_cache.flush()
+
+    new_results = workspace.results["experiments"][num_results:] if workspace.results else []
+    return phase_count, new_results, app_inst.get_status(), app_inst.result
+
+
+#: State shared with forked software environment workers, like _analysis_state
+_setup_state = None
+
+
+def _setup_environment_worker(env_idx):
+    """Worker entry point to set up a single software environment
+
+    Args:
+        env_idx (int): Index of the environment within the prepared environments
+
+    Returns:
+        (set | None): Install cache entries the environment's phases added. None
+        if a phase raised an error, in which case the environment is set up
+        again by the first experiment using it.
+    """
+    pipeline, environments = _setup_state
+    app_inst, phases, log_path = environments[env_idx]
+    workspace = pipeline.workspace
+
+    known_entries = set(workspace.install_cache.store)
+
+    logger.add_log(log_path)
+    try:
+        for phase in phases:
+            app_inst.run_phase(pipeline.name, phase, workspace)
+    except (Exception, SystemExit):
+        return None
+    finally:
+        workspace.experiment_index.flush()
+        ramble.caches.file_hash_cache.flush()
+        logger.remove_log()
+
+    return workspace.install_cache.store - known_entries
+
+
+def _parallel_pipeline_supported():
+    """Parallel pipelines rely on forking the current process"""
+    return sys.platform not in ("darwin", "win32")
+
+
 class Pipeline:
     """Base Class for all pipeline objects"""
 
     name = "base"
 
+    #: Whether experiment index records are written together, when the
+    #: pipeline completes, rather than as each experiment updates them
+    buffer_experiment_index = False
+
     def __init__(self, workspace, filters):
         """Create a new pipeline instance"""
         self.filters = filters
@@ -70,6 +162,22 @@ class Pipeline:
         self._software_environments = ramble.software_environments.SoftwareEnvironments(workspace)
         self.workspace.software_environments = self._software_environments
         self._experiment_set = workspace.build_experiment_set()
+        self._filtered_experiments = None
+
+    def filtered_experiments(self):
+        """Experiments this pipeline operates on
+
+        Filters are evaluated the first time this is called, and the same
+        experiments are used for the remainder of the pipeline.
+
+        Returns:
+            (list): (name, application instance, index) of each experiment
+        """
+        if self._filtered_experiments is None:
+            self._filtered_experiments = list(
+                self._experiment_set.filtered_experiments(self.filters)
+            )
+        return self._filtered_experiments
 
     def _construct_experiment_hashes(self):
         """Hash all of the experiments.
@@ -133,7 +241,7 @@ class Pipeline:
     def _execute(self):
         """Hook for executing the pipeline"""
 
-        num_exps = self._experiment_set.num_filtered_experiments(self.filters)
+        num_exps = len(self.filtered_experiments())
 
         if logger.enabled:
             fs.mkdirp(self.log_dir)
@@ -146,59 +254,69 @@ class Pipeline:
         count = 1
         phase_total = 0
 
-        for exp, app_inst, idx in self._experiment_set.filtered_experiments(self.filters):
-            exp_log_path = app_inst.experiment_log_file(self.log_dir)
+        for exp, app_inst, idx in self.filtered_experiments():
+            phase_total += self._execute_experiment(exp, app_inst, idx, count, num_exps)
+            count += 1
 
-            experiment_index_value = app_inst.expander.expand_var_name(
-                app_inst.keywords.experiment_index
-            )
+        if phase_total == 0 and self.filters.phases != ramble.filters.ALL_PHASES:
+            logger.warn("No valid phases were selected, please verify requested phases")
+
+    def _execute_experiment(self, exp, app_inst, idx, count, num_exps):
+        """Run the pipeline phases of a single experiment
+
+        Returns:
+            (int): The number of phases which were run
+        """
+        exp_log_path = app_inst.experiment_log_file(self.log_dir)
 
-            if not self.suppress_per_experiment_prints:
-                logger.all_msg(f"Experiment #{idx} ({count}/{num_exps}):")
-                logger.all_msg(f"    name: {exp}")
-                logger.all_msg(f"    root experiment_index: {experiment_index_value}")
-                logger.all_msg(f"    log file: {exp_log_path}")
+        experiment_index_value = app_inst.expander.expand_var_name(
+            app_inst.keywords.experiment_index
+        )
 
-            logger.add_log(exp_log_path)
+        if not self.suppress_per_experiment_prints:
+            logger.all_msg(f"Experiment #{idx} ({count}/{num_exps}):")
+            logger.all_msg(f"    name: {exp}")
+            logger.all_msg(f"    root experiment_index: {experiment_index_value}")
+            logger.all_msg(f"    log file: {exp_log_path}")
 
-            phase_list = app_inst.get_pipeline_phases(self.name, self.filters.phases)
+        logger.add_log(exp_log_path)
 
-            disable_progress = (
-                ramble.config.get("config:disable_progress_bar", False)
-                or self.suppress_per_experiment_prints
-            )
+        phase_list = app_inst.get_pipeline_phases(self.name, self.filters.phases)
+
+        disable_progress = (
+            ramble.config.get("config:disable_progress_bar", False)
+            or self.suppress_per_experiment_prints
+        )
+        if not disable_progress:
+            try:
+                progress = tqdm.tqdm(
+                    total=len(phase_list),
+                    leave=True,
+                    ascii=" >=",
+                    bar_format="{l_bar}{bar}| Elapsed (s): {elapsed_s:.2f}",
+                )
+            except AttributeError:
+                logger.die("tdqm.tdqm is not found. Ensure requirements.txt are installed.")
+        phase_count = 0
+        for phase_idx, phase in enumerate(phase_list):
             if not disable_progress:
-                try:
-                    progress = tqdm.tqdm(
-                        total=len(phase_list),
-                        leave=True,
-                        ascii=" >=",
-                        bar_format="{l_bar}{bar}| Elapsed (s): {elapsed_s:.2f}",
-                    )
-                except AttributeError:
-                    logger.die("tdqm.tdqm is not found. Ensure requirements.txt are installed.")
-            for phase_idx, phase in enumerate(phase_list):
-                if not disable_progress:
-                    progress.set_description(
-                        f"Processing phase {phase} ({phase_idx}/{len(phase_list)})"
-                    )
-                app_inst.run_phase(self.name, phase, self.workspace)
-                phase_total += 1
-                if not disable_progress:
-                    progress.update()
-            app_inst.print_phase_times(self.name, self.filters.phases)
+                progress.set_description(
+                    f"Processing phase {phase} ({phase_idx}/{len(phase_list)})"
+                )
+            app_inst.run_phase(self.name, phase, self.workspace)
+            phase_count += 1
             if not disable_progress:
-                progress.set_description("Experiment complete")
-                progress.close()
+                progress.update()
+        app_inst.print_phase_times(self.name, self.filters.phases)
+        if not disable_progress:
+            progress.set_description("Experiment complete")
+            progress.close()
 
-            logger.remove_log()
-            if not self.suppress_per_experiment_prints:
-                logger.all_msg(f"  Returning to log file: {logger.active_log()}")
+        logger.remove_log()
+        if not self.suppress_per_experiment_prints:
+            logger.all_msg(f"  Returning to log file: {logger.active_log()}")
 
-            count += 1
-
-        if phase_total == 0 and self.filters.phases != ramble.filters.ALL_PHASES:
-            logger.warn("No valid phases were selected, please verify requested phases")
+        return phase_count
 
     def _complete(self):
         """Hook for performing pipeline actions after execution is complete"""
@@ -212,7 +330,7 @@ class Pipeline:
             if self.workspace.dry_run:
                 cprint("@*g{      -- DRY-RUN -- DRY-RUN -- DRY-RUN -- DRY-RUN -- DRY-RUN --}")
 
-            experiment_count = self._experiment_set.num_filtered_experiments(self.filters)
+            experiment_count = len(self.filtered_experiments())
             experiment_total = self._experiment_set.num_experiments()
             logger.all_msg(
                 f"  {self.action_string} {experiment_count} out of "
@@ -223,9 +341,16 @@ class Pipeline:
         if logger.enabled:
             self.create_simlink(self.log_path, self.log_path_latest)
 
-        self._prepare()
-        self._execute()
-        self._complete()
+        if self.buffer_experiment_index:
+            index_buffer = self.workspace.experiment_index.buffered()
+        else:
+            index_buffer = contextlib.nullcontext()
+
+        # Digests of files hashed by any experiment are written once
+        with index_buffer, ramble.caches.file_hash_cache.buffered():
+            self._prepare()
+            self._execute()
+            self._complete()
         logger.remove_log()
 
     def create_simlink(self, base, link):
@@ -242,6 +367,7 @@ class AnalyzePipeline(Pipeline):
     """Class for the analyze pipeline"""
 
     name = "analyze"
+    buffer_experiment_index = True
 
     def __init__(
         self,
@@ -251,6 +377,7 @@ class AnalyzePipeline(Pipeline):
         upload=False,
         print_results=False,
         summary_only=False,
+        jobs=1,
     ):
         workspace_success = {namespace.success: ramble.config.config.get_config(namespace.success)}
 
@@ -263,6 +390,7 @@ class AnalyzePipeline(Pipeline):
         self.upload_results = upload
         self.print_results = print_results
         self.summary_only = summary_only
+        self.jobs = jobs
 
     def _prepare(self):
 
@@ -272,7 +400,7 @@ class AnalyzePipeline(Pipeline):
         found_valid_experiment = False
         # Record how many non-analyzable experiments are encountered
         no_analyze_cnt = 0
-        for _, app_inst, _ in self._experiment_set.filtered_experiments(self.filters):
+        for _, app_inst, _ in self.filtered_experiments():
             if not (app_inst.is_template or app_inst.repeats.is_repeat_base):
                 if app_inst.get_status() != ramble.application.experiment_status.UNKNOWN.name:
                     found_valid_experiment = True
@@ -280,7 +408,7 @@ class AnalyzePipeline(Pipeline):
                 no_analyze_cnt += 1
 
         num_total_exps = self._experiment_set.num_experiments()
-        num_filtered_exps = self._experiment_set.num_filtered_experiments(self.filters)
+        num_filtered_exps = len(self.filtered_experiments())
         if not found_valid_experiment and num_total_exps:
             if not num_filtered_exps:
                 logger.die("No experiment left for analysis after filtering.")
@@ -299,9 +427,67 @@ class AnalyzePipeline(Pipeline):
         super()._construct_workspace_hash()
         super()._prepare()
 
+    def _execute(self):
+        """Analyze experiments, using worker processes when jobs is larger than 1
+
+        Workers extract FOMs from each experiment's logs. Their results are
+        merged back in experiment order, so the results are identical to
+        those of a serial analysis.
+        """
+        global _analysis_state
+
+        if self.jobs <= 1 or not _parallel_pipeline_supported():
+            super()._execute()
+            return
+
+        experiments = self.filtered_experiments()
+        num_exps = len(experiments)
+
+        if logger.enabled:
+            fs.mkdirp(self.log_dir)
+            # Also create simlink to give known paths
+            self.create_simlink(self.log_dir, self.log_dir_latest)
+
+        if not self.suppress_run_header:
+            logger.all_msg(f"  Analyzing experiments using {self.jobs} jobs")
+            logger.all_msg(f"  Log files for experiments are stored in: {self.log_dir}")
+
+        # Workers would otherwise inherit, and write again, pending records
+        self.workspace.experiment_index.flush()
+        ramble.caches.file_hash_cache.flush()
+
+        _analysis_state = (self, experiments)
+        mp_context = multiprocessing.get_context("fork")
+        try:
+            with mp_context.Pool(processes=self.jobs) as pool:
+                outputs = pool.map(_analyze_experiment_worker, range(num_exps))
+        finally:
+            _analysis_state = None
+
+        phase_total = 0
+        for exp_idx, ((exp, app_inst, idx), output) in enumerate(zip(experiments, outputs)):
+            if output is None:
+                # Analyze again in this process, to report the error
+                phase_total += self._execute_experiment(exp, app_inst, idx, exp_idx + 1, num_exps)
+                continue
+
+            phase_count, new_results, status, result = output
+            phase_total += phase_count
+            if phase_count:
+                # Running phases defines the experiment's variables, which
+                # statistics for repeats rely on.
+                app_inst.add_expand_vars(self.workspace)
+            for new_result in new_results:
+                self.workspace.append_result(new_result)
+            app_inst.set_status(status=ramble.application.experiment_status[status])
+            app_inst.result = result
+
+        if phase_total == 0 and self.filters.phases != ramble.filters.ALL_PHASES:
+            logger.warn("No valid phases were selected, please verify requested phases")
+
     def _complete(self):
         # Calculate statistics for repeats and inject into base experiment results
-        for _, app_inst, _ in self._experiment_set.filtered_experiments(self.filters):
+        for _, app_inst, _ in self.filtered_experiments():
 
             if app_inst.repeats.n_repeats > 0:
                 app_inst.calculate_statistics(self.workspace)
@@ -311,6 +497,9 @@ class AnalyzePipeline(Pipeline):
             summary_only=self.summary_only,
         )
 
+        if self.workspace.results:
+            self.workspace.results_store.add_analysis(self.workspace.results)
+
         if self.upload_results:
             ramble.experimental.uploader.upload_results(self.workspace.results)
 
@@ -328,14 +517,23 @@ class ArchivePipeline(Pipeline):
         archive_prefix=None,
         upload_url=None,
         include_secrets=False,
+        tar_only=False,
+        compression=ramble.archiver.default_compression,
+        jobs=1,
+        incremental=False,
     ):
         super().__init__(workspace, filters)
         self.action_string = "Archiving"
-        self.create_tar = create_tar
+        self.create_tar = create_tar or tar_only
+        self.tar_only = tar_only
+        self.incremental = incremental
+        self.compression = compression
+        self.jobs = jobs
         self.upload_url = upload_url
         self.include_secrets = include_secrets
         self.archive_prefix = archive_prefix
         self.archive_name = None
+        self.archiver = None
 
         if self.upload_url and not self.create_tar:
             logger.warn("Upload URL is currently only supported when using tar format (-t)")
@@ -357,8 +555,25 @@ class ArchivePipeline(Pipeline):
 
         self.archive_name = f"{self.archive_prefix}-archive-{date_str}"
 
-        archive_path = os.path.join(self.workspace.archive_dir, self.archive_name)
-        fs.mkdirp(archive_path)
+        base_manifest = None
+        if self.incremental:
+            base_manifest = ramble.archiver.latest_manifest(self.workspace.archive_dir)
+            if base_manifest:
+                logger.all_msg(f"  Archiving changes since {base_manifest['archive']}")
+            else:
+                logger.all_msg("  No previous archive was found. Creating a full archive.")
+
+        self.archiver = ramble.archiver.Archiver(
+            self.workspace.archive_dir,
+            self.archive_name,
+            create_dir=not self.tar_only,
+            create_tar=self.create_tar,
+            compression=self.compression,
+            jobs=self.jobs,
+            base_manifest=base_manifest,
+        )
+        self.workspace.archiver = self.archiver
+        self.workspace.set_latest_archive(self.archive_name)
 
         for filename in [
             ramble.workspace.Workspace.inventory_file_name,
@@ -366,58 +581,38 @@ class ArchivePipeline(Pipeline):
         ]:
             src = os.path.join(self.workspace.root, filename)
             if os.path.exists(src):
-                dest = src.replace(self.workspace.root, archive_path)
-                shutil.copyfile(src, dest)
+                self.archiver.add_file(src, filename)
 
-        # Copy current configs
-        archive_configs = os.path.join(
-            self.workspace.latest_archive_path, ramble.workspace.workspace_config_path
-        )
-        _copy_tree(self.workspace.config_dir, archive_configs)
-
-        # Copy shared files
-        archive_shared = os.path.join(
-            self.workspace.latest_archive_path, ramble.workspace.workspace_shared_path
-        )
+        # Archive current configs
+        self.archiver.add_tree(self.workspace.config_dir, ramble.workspace.workspace_config_path)
 
+        # Archive shared files
         excluded_secrets = set()
         if not self.include_secrets:
             excluded_secrets.add(ramble.application.ApplicationBase.license_inc_name)
 
-        fs.mkdirp(archive_shared)
-        for root, dirs, files in os.walk(self.workspace.shared_dir):
-            for name in files:
-                if name not in excluded_secrets:
-                    src_dir = os.path.join(self.workspace.shared_dir, root)
-                    src = os.path.join(src_dir, name)
-                    dest = src.replace(self.workspace.shared_dir, archive_shared)
-                    fs.mkdirp(os.path.dirname(dest))
-                    shutil.copy(src, dest)
-
-        # Copy logs, but omit all symlinks (i.e. "latest")
-        archive_logs = os.path.join(
-            self.workspace.latest_archive_path, ramble.workspace.workspace_log_path
+        self.archiver.add_tree(
+            self.workspace.shared_dir,
+            ramble.workspace.workspace_shared_path,
+            exclude=excluded_secrets,
         )
-        fs.mkdirp(archive_logs)
-        for root, dirs, files in os.walk(self.workspace.log_dir):
-            for name in files:
-                src_dir = os.path.join(self.workspace.log_dir, root)
-                src = os.path.join(src_dir, name)
-                if not (os.path.islink(src_dir) or os.path.islink(src)) and os.path.isfile(src):
-                    dest = src.replace(self.workspace.log_dir, archive_logs)
-                    fs.mkdirp(os.path.dirname(dest))
-                    shutil.copyfile(src, dest)
 
-        archive_path_latest = os.path.join(self.workspace.archive_dir, "archive.latest")
-        self.create_simlink(archive_path, archive_path_latest)
+        # Archive logs, but omit all symlinks (i.e. "latest")
+        self.archiver.add_tree(
+            self.workspace.log_dir, ramble.workspace.workspace_log_path, skip_links=True
+        )
 
     def _complete(self):
+        num_files = self.archiver.write()
+        logger.msg(f"Archived {num_files} files")
+
+        if not self.tar_only:
+            archive_path_latest = os.path.join(self.workspace.archive_dir, "archive.latest")
+            self.create_simlink(self.archiver.archive_path, archive_path_latest)
+
         if self.create_tar:
-            tar_extension = ".tar.gz"
-            tar = which("tar", required=True)
-            tar_path = self.archive_name + tar_extension
-            with py.path.local(self.workspace.archive_dir).as_cwd():
-                tar("-czf", tar_path, self.archive_name)
+            tar_extension = ramble.archiver.compression_extensions[self.compression]
+            tar_path = self.archiver.tar_path
 
             archive_url = (
                 self.upload_url if self.upload_url else ramble.config.get("config:archive_url")
@@ -434,8 +629,7 @@ class ArchivePipeline(Pipeline):
 
             if archive_url:
                 # Perform Upload
-                tar_path = self.workspace.latest_archive_path + tar_extension
-                remote_tar_path = archive_url + "/" + self.workspace.latest_archive + tar_extension
+                remote_tar_path = archive_url + "/" + self.archive_name + tar_extension
                 _upload_file(tar_path, remote_tar_path)
                 logger.all_msg(f"Archive Uploaded to {remote_tar_path}")
 
@@ -489,12 +683,24 @@ class SetupPipeline(Pipeline):
     """Class for the setup pipeline"""
 
     name = "setup"
-
-    def __init__(self, workspace, filters):
+    buffer_experiment_index = True
+
+    #: Phases which create and install a software environment. Every
+    #: experiment using an environment runs them, but only the first one to do
+    #: so performs any work.
+    environment_phases = [
+        "software_create_env",
+        "software_install_requested_compilers",
+        "software_configure",
+        "software_install",
+    ]
+
+    def __init__(self, workspace, filters, jobs=1):
         super().__init__(workspace, filters)
         self.force_inventory = True
         self.require_inventory = False
         self.action_string = "Setting up"
+        self.jobs = jobs
 
     def _prepare(self):
         # Check if the selected phases require the inventory is successful
@@ -510,6 +716,110 @@ class SetupPipeline(Pipeline):
 
         super()._construct_experiment_hashes()
 
+        if self.jobs > 1 and not self.workspace.dry_run:
+            self._download_inputs()
+
+    def _download_inputs(self):
+        """Download the inputs of all experiments concurrently
+
+        Inputs are downloaded into the fetch cache, so each experiment's
+        get_inputs phase only needs to link (and expand) them.
+        """
+        scheduler = ramble.download_scheduler.DownloadScheduler(jobs=self.jobs)
+        for _, app_inst, _ in self.filtered_experiments():
+            if app_inst.repeats.is_repeat_base:
+                continue
+            if "get_inputs" not in app_inst.get_pipeline_phases(self.name, self.filters.phases):
+                continue
+            for fetcher, mirror_paths in app_inst.input_downloads(self.workspace):
+                scheduler.add(fetcher, mirror_paths.storage_path, mirror_paths)
+
+        if not scheduler.downloads:
+            return
+
+        logger.all_msg(f"  Downloading {len(scheduler.downloads)} inputs using {self.jobs} jobs")
+        failed = scheduler.run()
+        if failed:
+            logger.all_msg(
+                f"  {len(failed)} inputs could not be downloaded, "
+                "and will be fetched by their experiments"
+            )
+
+    def _distinct_software_environments(self):
+        """Find the distinct software environments the experiments use
+
+        Returns:
+            (list): A tuple for each environment, of the first experiment's
+            application instance, the environment phases it runs, and a log
+            file for the environment
+        """
+        env_log_dir = os.path.join(self.log_dir, "software")
+        environments = {}
+        for _, app_inst, _ in self.filtered_experiments():
+            pkg_man = app_inst.package_manager
+            if pkg_man is None:
+                continue
+
+            env_path = app_inst.expander.env_path
+            if not env_path or (pkg_man.name, env_path) in environments:
+                continue
+
+            phases = [
+                phase
+                for phase in app_inst.get_pipeline_phases(self.name, self.filters.phases)
+                if phase in self.environment_phases
+            ]
+            if phases:
+                env_name = app_inst.expander.expand_var_name(app_inst.keywords.env_name)
+                log_path = os.path.join(env_log_dir, f"{pkg_man.name}.{env_name}.out")
+                environments[(pkg_man.name, env_path)] = (app_inst, phases, log_path)
+        return list(environments.values())
+
+    def _execute(self):
+        """Set up software environments concurrently, then set up experiments
+
+        When jobs is larger than 1, the environment phases of each distinct
+        software environment run in a pool of worker processes first. The
+        install cache entries the workers add are merged back, so the
+        experiments then run their remaining phases serially against the
+        prepared environments.
+        """
+        global _setup_state
+
+        if self.jobs > 1 and _parallel_pipeline_supported():
+            environments = self._distinct_software_environments()
+            if len(environments) > 1:
+                if logger.enabled:
+                    fs.mkdirp(os.path.join(self.log_dir, "software"))
+
+                logger.all_msg(
+                    f"  Setting up {len(environments)} software environments "
+                    f"using {self.jobs} jobs"
+                )
+                logger.all_msg(
+                    "  Log files for software environments are stored in: "
+                    f"{os.path.join(self.log_dir, 'software')}"
+                )
+
+                self.workspace.experiment_index.flush()
+                ramble.caches.file_hash_cache.flush()
+
+                _setup_state = (self, environments)
+                mp_context = multiprocessing.get_context("fork")
+                try:
+                    with mp_context.Pool(processes=min(self.jobs, len(environments))) as pool:
+                        outputs = pool.map(_setup_environment_worker, range(len(environments)))
+                finally:
+                    _setup_state = None
+
+                for output in outputs:
+                    # Failed environments are set up again serially, to report the error
+                    if output is not None:
+                        for entry in output:
+                            self.workspace.add_to_cache(entry)
+
+        super()._execute()
+
     def _complete(self):
         try:
             super()._construct_workspace_hash()
@@ -554,6 +864,10 @@ class ExecutePipeline(Pipeline):
         executor="{batch_submit}",
         suppress_per_experiment_prints=True,
         suppress_run_header=False,
+        jobs=1,
+        cores=None,
+        batch=None,
+        batch_size=None,
     ):
         super().__init__(workspace, filters)
         self.action_string = "Executing"
@@ -561,6 +875,13 @@ class ExecutePipeline(Pipeline):
         self.executor = executor
         self.suppress_per_experiment_prints = suppress_per_experiment_prints
         self.suppress_run_header = suppress_run_header
+        self.jobs = jobs
+        self.cores = cores
+        self.batch = batch
+        self.batch_size = batch_size
+        self.job_record_path = os.path.join(self.log_dir, "jobs.json")
+        self.batch_dir = os.path.join(self.log_dir, "batches")
+        self.batch_mapping_path = os.path.join(self.log_dir, "batches.json")
 
     def _execute(self):
         super()._execute()
@@ -568,7 +889,18 @@ class ExecutePipeline(Pipeline):
         if not self.suppress_run_header:
             logger.all_msg("Running executors...")
 
-        for exp, app_inst, idx in self._experiment_set.filtered_experiments(self.filters):
+        use_scheduler = self.jobs > 1 or self.cores
+
+        # Name, executor command, slots, and log path of each submission. These
+        # are only collected when submissions are batched or scheduled.
+        submissions = []
+        batcher = None
+        if self.batch:
+            batcher = ramble.batching.Batcher(
+                self.batch_dir, mode=self.batch, max_size=self.batch_size
+            )
+
+        for exp, app_inst, idx in self.filtered_experiments():
             if app_inst.is_template:
                 logger.debug(f"{app_inst.name} is a template. Skipping execution.")
                 continue
@@ -579,11 +911,115 @@ class ExecutePipeline(Pipeline):
             app_inst.add_expand_vars(self.workspace)
             exec_str = app_inst.expander.expand_var(self.executor)
             exec_parts = shlex.split(exec_str)
-            exec_name = exec_parts[0]
-            exec_args = exec_parts[1:]
 
-            executor = Executable(exec_name)
-            executor(*exec_args)
+            if batcher is None and not use_scheduler:
+                self._run_executor(exec_parts)
+                continue
+
+            submissions.append(
+                (
+                    exp,
+                    exec_parts,
+                    self._experiment_slots(app_inst),
+                    app_inst.experiment_log_file(self.log_dir),
+                )
+            )
+
+            if batcher is not None:
+                batcher.add(
+                    ramble.batching.Submission(
+                        exp,
+                        exec_parts,
+                        app_inst.expander.experiment_run_dir,
+                        short_name=app_inst.expander.experiment_name,
+                        n_nodes=app_inst.expander.expand_var_name(app_inst.keywords.n_nodes),
+                    )
+                )
+
+        if batcher is not None:
+            submissions = self._batch_submissions(batcher, submissions)
+
+        if use_scheduler:
+            # Without a number of jobs, as many experiments as fit in the cores run
+            jobs = self.jobs if self.jobs > 1 else self.cores
+            scheduler = ramble.job_scheduler.JobScheduler(jobs=jobs, slots=self.cores)
+            for name, exec_parts, slots, log_path in submissions:
+                job = ramble.job_scheduler.Job(name, exec_parts, slots=slots, log_path=log_path)
+                scheduler.add(job)
+            self._run_jobs(scheduler)
+            return
+
+        for _, exec_parts, _, _ in submissions:
+            self._run_executor(exec_parts)
+
+    def _run_executor(self, exec_parts):
+        """Run the executor command of an experiment (or batch)"""
+        exec_name = exec_parts[0]
+        exec_args = exec_parts[1:]
+
+        executor = Executable(exec_name)
+        executor(*exec_args)
+
+    def _batch_submissions(self, batcher, submissions):
+        """Replace the submissions of compatible experiments with batches"""
+        fs.mkdirp(self.log_dir)
+        commands = batcher.write()
+        batcher.write_mapping(self.batch_mapping_path)
+
+        num_batched = sum(len(batch.submissions) for batch in batcher.batches)
+        logger.all_msg(
+            f"  Batched {num_batched} out of {len(submissions)} experiments "
+            f"into {len(batcher.batches)} submissions"
+        )
+        logger.all_msg(f"  Batch mapping written to: {self.batch_mapping_path}")
+
+        details = {name: (slots, log_path) for name, _, slots, log_path in submissions}
+        for batch in batcher.batches:
+            slots = max(details[submission.name][0] for submission in batch.submissions)
+            details[batch.name] = (slots, os.path.join(self.log_dir, f"{batch.name}.out"))
+        return [(name, command) + details[name] for name, command in commands]
+
+    def _experiment_slots(self, app_inst):
+        """Number of cores an experiment occupies while it runs"""
+        if not self.cores:
+            return 1
+
+        n_ranks = app_inst.expander.expand_var_name(app_inst.keywords.n_ranks)
+        try:
+            return max(int(n_ranks), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def _run_jobs(self, scheduler):
+        """Run the executors of experiments concurrently"""
+        num_jobs = len(scheduler.scheduled)
+        if not num_jobs:
+            return
+
+        # Output of each executor is appended to the experiment's log file
+        fs.mkdirp(self.log_dir)
+
+        logger.all_msg(f"  Executing {num_jobs} experiments using {scheduler.jobs} jobs")
+        if scheduler.slots:
+            logger.all_msg(f"  Running experiments are limited to {scheduler.slots} cores")
+
+        def _progress(job, num_completed):
+            if job.succeeded:
+                status = "done"
+            elif job.error is not None:
+                status = f"error: {job.error}"
+            else:
+                status = f"exit status {job.returncode}"
+            elapsed = job.end_time - job.start_time
+            logger.all_msg(f"  [{num_completed}/{num_jobs}] {job.name}: {status} ({elapsed:.2f}s)")
+
+        failed = scheduler.run(progress=_progress)
+
+        scheduler.write_record(self.job_record_path)
+        logger.all_msg(f"  Execution record written to: {self.job_record_path}")
+
+        if failed:
+            logger.die(f"{len(failed)} out of {num_jobs} experiments failed to execute.")
 
 
 class PushDeploymentPipeline(Pipeline):
@@ -6,8 +6,6 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
-import itertools
-
 import ramble.error
 import ramble.expander
 import ramble.repeats
@@ -113,6 +111,74 @@ class RenderGroup:
         return extracted
 
 
+def _matrix_object(dimensions, index):
+    """Construct the variables for one element of a matrix
+
+    Elements are numbered the same way as itertools.product would order them,
+    with the last dimension varying the fastest.
+
+    Args:
+        dimensions (list): (length, {var: vector}) tuple for each dimension
+        index (int): Index of the matrix element
+
+    Returns:
+        (dict): Variable definitions for the element
+    """
+    obj_vars = {}
+    for length, vectors in reversed(dimensions):
+        index, dim_index = divmod(index, length)
+        for var, vector in vectors.items():
+            obj_vars[var] = vector[dim_index]
+    return obj_vars
+
+
+def _generate_objects(vector_vars, vector_size, matrix_dimensions, matrix_size):
+    """Lazily generate the variables which differ between rendered objects
+
+    Objects are constructed from their indices when they are requested, so
+    the full design space is never held in memory.
+
+    Args:
+        vector_vars (dict): Vector variables, which are zipped together
+        vector_size (int): Length of the longest vector variable
+        matrix_dimensions (list): Dimensions of each matrix (see _matrix_object)
+        matrix_size (int): Number of elements of each matrix
+
+    Yields:
+        (dict): Variable definitions for a single object
+    """
+
+    def matrix_object(index):
+        obj_vars = {}
+        for dimensions in matrix_dimensions:
+            obj_vars.update(_matrix_object(dimensions, index))
+        return obj_vars
+
+    if vector_vars:
+        # Iterate over the vector length, and set the value in the
+        # object dict to the index value. Each vector index is crossed with
+        # all matrix elements.
+        for i in range(0, vector_size):
+            obj_vars = {}
+            for var, val in vector_vars.items():
+                if len(val) > i:
+                    obj_vars[var] = val[i]
+
+            if matrix_size:
+                for matrix_index in range(matrix_size):
+                    new_obj = obj_vars.copy()
+                    new_obj.update(matrix_object(matrix_index))
+                    yield new_obj
+            else:
+                yield obj_vars
+    elif matrix_size:
+        for matrix_index in range(matrix_size):
+            yield matrix_object(matrix_index)
+    else:
+        # Ensure at least one object is rendered, if everything was a scalar
+        yield {}
+
+
 class Renderer:
     def render_objects(self, render_group, exclude_where=None, ignore_used=True, fatal=True):
         """Render objects based on the input variables and matrices
@@ -136,16 +202,18 @@ class Renderer:
         together. All vectors are required to be of the same size.
 
         The resulting zip of vectors is then crossed with all of the matrices
-        to build a final list of objects.
+        to build the final set of objects.
 
         After processing the expansion logic, this function yields a dictionary
         of variable definitions, one for each object that would be rendered.
+        Objects are generated from their matrix and vector indices on demand,
+        so memory use does not grow with the number of objects.
 
         If n_repeats is defined in input variables, this function yields one base
         and n copies of the rendered variable dictionary.
 
         Yields:
-            - a dictionary of variables for single object definition
+            - a VariableScope of variables for single object definition
             - a Repeats object indicating if rendered object is a repeat and its index
 
         """
@@ -181,10 +249,10 @@ class Renderer:
                 for i, unexpanded_var in enumerate(group_def):
                     group_def[i] = expander.expand_var(unexpanded_var)
 
-        new_objects = []
         defined_zips = {}
         consumed_zips = set()
-        matrix_objects = []
+        matrix_dimensions = []
+        matrix_size = 0
 
         if ignore_used:
             # Add variables / zips in matrices to used variables
@@ -305,13 +373,9 @@ class Renderer:
             # Perform some error checking
             last_size = -1
             matrix_vars = set()
-            matrix_vectors = []
-            matrix_variables = []
             for matrix in matrices:
                 matrix_size = 1
-                vectors = []
-                zips = []
-                variable_names = []
+                dimensions = []
                 for var in matrix:
                     if var in matrix_vars:
                         logger.die(
@@ -329,19 +393,20 @@ class Renderer:
                             )
 
                         matrix_size = matrix_size * len(object_variables[var])
-                        vectors.append(object_variables[var])
-                        variable_names.append(var)
+                        dimensions.append(
+                            (len(object_variables[var]), {var: object_variables[var]})
+                        )
 
                         # Remove the variable, so it's not processed as a vector anymore.
                         del object_variables[var]
 
                     elif var in defined_zips:
+                        # A zip is a single dimension, which sets all of its variables
                         zip_len = defined_zips[var]["length"]
-                        idx_vector = [i for i in range(0, zip_len)]
 
                         matrix_size = matrix_size * zip_len
-                        vectors.append(idx_vector)
-                        variable_names.append(var)
+                        dimensions.append((zip_len, defined_zips[var]["vars"]))
+                        consumed_zips.add(var)
                     else:
                         err_context = object_variables[render_group.context]
                         logger.die(
@@ -359,29 +424,11 @@ class Renderer:
                         + " do not result in the same number of elements."
                     )
 
-                matrix_vectors.append(vectors)
-                matrix_variables.append(variable_names)
-
-            # Create the empty initial dictionairies
-            matrix_objects = []
-            for _ in range(matrix_size):
-                matrix_objects.append({})
-
-            # Generate all of the obj var dicts
-            for names, vectors in zip(matrix_variables, matrix_vectors):
-                for obj_idx, entry in enumerate(itertools.product(*vectors)):
-                    for name_idx, name in enumerate(names):
-                        if name in defined_zips.keys():
-                            # Replace the zip name with the constituent variables
-                            for zip_var in defined_zips[name]["vars"]:
-                                matrix_objects[obj_idx][zip_var] = defined_zips[name]["vars"][
-                                    zip_var
-                                ][entry[name_idx]]
-
-                            # Consume the defined zip
-                            consumed_zips.add(name)
-                        else:
-                            matrix_objects[obj_idx][name] = entry[name_idx]
+                matrix_dimensions.append(dimensions)
+
+            # Empty matrices produce no objects, and do not consume their zips
+            if matrix_size == 0:
+                consumed_zips = set()
 
         # Remove all consumed zips and return all remaining zipped variables
         # back to real vector definitions
@@ -402,7 +449,7 @@ class Renderer:
         max_vector_size = 0
         for var, val in object_variables.items():
             if isinstance(val, list) and (var in used_variables or not ignore_used):
-                vector_vars[var] = val.copy()
+                vector_vars[var] = val
                 max_vector_size = max(len(val), max_vector_size)
 
         if vector_vars:
@@ -422,35 +469,19 @@ class Renderer:
                     err_str += f"\tVariable {var} has length {len(val)}\n"
                 logger.die(err_str)
 
-            # Iterate over the vector length, and set the value in the
-            # object dict to the index value.
-            for i in range(0, max_vector_size):
-                obj_vars = {}
-                for var, val in vector_vars.items():
-                    if len(val) > i:
-                        obj_vars[var] = val[i]
-
-                if matrix_objects:
-                    for matrix_object in matrix_objects:
-                        for var, val in matrix_object.items():
-                            obj_vars[var] = val
-
-                        new_objects.append(obj_vars.copy())
-                else:
-                    new_objects.append(obj_vars.copy())
-
-        elif matrix_objects:
-            new_objects = matrix_objects
-        else:
-            # Ensure at least one object is rendered, if everything was a scalar
-            new_objects.append({})
+        new_objects = _generate_objects(
+            vector_vars, max_vector_size, matrix_dimensions, matrix_size
+        )
 
-        where_expander = ramble.expander.Expander(object_variables, None)
+        # All rendered objects share object_variables as their base layer,
+        # and only materialize the variables that differ between objects.
+        object_scope = ramble.expander.VariableScope({}, object_variables)
+        where_expander = ramble.expander.Expander(object_scope, None)
 
         for obj in new_objects:
             logger.debug(f"Rendering {render_group.object}:")
             for var, val in obj.items():
-                object_variables[var] = val
+                object_scope[var] = val
 
             keep_object = True
             if exclude_where:
@@ -470,7 +501,7 @@ class Renderer:
                     elif n_repeats > 0 and n > 0:  # this is a repeat with index n
                         repeats.set_repeat_index(n)
                     # maybe yield a tuple of vars and repeat info
-                    yield object_variables.copy(), repeats
+                    yield object_scope.copy(), repeats
 
 
 class RambleRendererError(ramble.error.RambleError):
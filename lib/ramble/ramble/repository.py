@@ -22,6 +22,7 @@ import inspect
 import stat
 import shutil
 import errno
+import textwrap
 
 try:
     from collections.abc import Mapping  # novm
@@ -228,6 +229,11 @@ def get(spec, object_type=default_type):
     return paths[object_type].get(spec)
 
 
+def get_metadata(obj_name, object_type=default_type):
+    """Convenience wrapper around ``ramble.repository.get_obj_metadata()``."""
+    return paths[object_type].get_obj_metadata(obj_name)
+
+
 def set_path(repo, object_type=default_type):
     """Set the path singleton to a specific value.
 
@@ -524,6 +530,228 @@ class TagIndexer(Indexer):
         self.index.to_json(stream)
 
 
+#: Attributes defined by directives, which are stored in the metadata index
+metadata_attributes = [
+    "maintainers",
+    "tags",
+    "_pipelines",
+    "figure_of_merit_contexts",
+    "figures_of_merit",
+    "builtins",
+    "package_manager_configs",
+    "required_packages",
+    "compilers",
+    "software_specs",
+    "archive_patterns",
+    "success_criteria",
+    "shell_support_pattern",
+    # Application specific:
+    "workloads",
+    "workload_groups",
+    "executables",
+    "inputs",
+    "workload_variables",
+    "phase_definitions",
+    # Modifier specific:
+    "modes",
+    "_default_usage_mode",
+    "variable_modifications",
+    "executable_modifiers",
+    "env_var_modifications",
+    "required_vars",
+    "modifier_variables",
+    "package_manager_requirements",
+    # Package manager specific:
+    "package_manager_variables",
+]
+
+
+def _metadata_value(value):
+    """Convert a directive attribute into a value which can be stored as JSON
+
+    Dictionaries and lists are converted recursively, and any other value
+    which JSON cannot represent is stored as its string representation.
+    """
+    if isinstance(value, dict):
+        return {str(key): _metadata_value(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_metadata_value(val) for val in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class ObjectMetadata:
+    """Directive data of an object, read from the metadata index
+
+    Provides the attributes of an object which are set by its directives,
+    without importing the object's definition. Only attributes which are
+    defined (and not empty) on the object are present.
+    """
+
+    def __init__(self, name, description, attributes):
+        self.name = name
+        self.__doc__ = description
+        for attr, value in attributes.items():
+            setattr(self, attr, value)
+
+    def format_doc(self, **kwargs):
+        """Wrap doc string at 72 characters and format nicely"""
+        indent = kwargs.get("indent", 0)
+
+        if not self.__doc__:
+            return ""
+
+        doc = re.sub(r"\s+", " ", self.__doc__)
+        lines = textwrap.wrap(doc, 72)
+        return "".join((" " * indent) + line + "\n" for line in lines)
+
+
+class MetadataIndex(Mapping):
+    """Maps object names to the directive data of the objects."""
+
+    #: Version of the index format. Indexes using other versions are rebuilt.
+    version = 1
+
+    def __init__(self, object_type=default_type):
+        self.object_type = object_type
+        self._metadata = {}
+
+    def to_json(self, stream):
+        sjson.dump({"version": self.version, "objects": self._metadata}, stream)
+
+    @staticmethod
+    def from_json(stream, object_type):
+        d = sjson.load(stream)
+
+        r = MetadataIndex(object_type=object_type)
+        if d.get("version") == r.version:
+            r._metadata.update(d["objects"])
+
+        return r
+
+    def __getitem__(self, item):
+        return self._metadata[item]
+
+    def __iter__(self):
+        return iter(self._metadata)
+
+    def __len__(self):
+        return len(self._metadata)
+
+    def update_object(self, obj_name):
+        """Updates an object in the metadata index.
+
+        Args:
+            obj_name (str): name of the object to be updated in the index
+        """
+        # Objects are indexed by the name of their directory
+        name = obj_name.rpartition(".")[2]
+        self._metadata.pop(name, None)
+
+        obj_path = paths[self.object_type]
+        try:
+            obj = obj_path.get(obj_name)
+        except RepoError as e:
+            # Objects which fail to load are recorded with the error, so they
+            # are only loaded again once the files defining them change
+            logger.debug(f"Unable to index {obj_name}: {e}")
+            try:
+                obj_cls = obj_path.get_obj_class(obj_name)
+            except Exception:
+                obj_cls = None
+            self._metadata[name] = {
+                "name": name,
+                "error": str(e),
+                "sources": self._source_mtimes(
+                    obj_path.filename_for_object_name(obj_name), obj_cls
+                ),
+            }
+            return
+
+        self._metadata[name] = self.object_metadata(obj)
+
+    @staticmethod
+    def _source_mtimes(file_path, obj_cls):
+        """Modification times of the files defining an object
+
+        Directives of base classes are inherited, so their files are tracked.
+
+        Args:
+            file_path (str): File defining the object
+            obj_cls (type | None): Class of the object, if it could be loaded
+        """
+        source_files = [file_path]
+        for cls in obj_cls.__mro__ if obj_cls is not None else []:
+            try:
+                spec = importlib.util.find_spec(cls.__module__)
+            except (ImportError, ValueError):
+                continue
+            source_files.append(spec.origin if spec else None)
+
+        sources = {}
+        for path in source_files:
+            if path and path not in sources and os.path.isfile(path):
+                sources[path] = os.stat(path).st_mtime
+        return sources
+
+    @staticmethod
+    def object_metadata(obj):
+        """Extract the index entry of an object
+
+        Args:
+            obj: Instance of the object
+
+        Returns:
+            (dict): The object's name, description, directive data, and the
+            modification times of the files defining it
+        """
+        attributes = {}
+        for attr in metadata_attributes:
+            value = getattr(obj, attr, None)
+            if value:
+                attributes[attr] = _metadata_value(value)
+
+        return {
+            "name": obj.name,
+            "description": obj.__doc__,
+            "attributes": attributes,
+            "sources": MetadataIndex._source_mtimes(getattr(obj, "_file_path", None), type(obj)),
+        }
+
+    def needs_update(self, obj_name):
+        """Whether any of the files defining an object changed since it was indexed"""
+        if obj_name not in self._metadata:
+            return True
+
+        for path, mtime in self._metadata[obj_name]["sources"].items():
+            try:
+                if os.stat(path).st_mtime > mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+
+class MetadataIndexer(Indexer):
+    """Lifecycle methods for a MetadataIndex on a Repo."""
+
+    def _create(self):
+        return MetadataIndex(object_type=self.object_type)
+
+    def read(self, stream):
+        self.index = MetadataIndex.from_json(stream, self.object_type)
+
+    def needs_update(self, obj_name):
+        return self.index.needs_update(obj_name)
+
+    def update(self, obj_fullname):
+        self.index.update_object(obj_fullname)
+
+    def write(self, stream):
+        self.index.to_json(stream)
+
+
 class RepoIndex:
     """Container class that manages a set of Indexers for a Repo.
 
@@ -588,7 +816,8 @@ class RepoIndex:
         """Determine which objects need an update, and update indexes."""
 
         # Filename of the provider index cache (we assume they're all json)
-        cache_filename = f"{name}/{self.namespace}-index.json"
+        # Repositories of different object types can share a namespace
+        cache_filename = f"{name}/{self.object_type.name}/{self.namespace}-index.json"
 
         # Compute which objects needs to be updated in the cache
         misc_cache = ramble.caches.misc_cache
@@ -602,14 +831,16 @@ class RepoIndex:
             with misc_cache.read_transaction(cache_filename) as f:
                 indexer.read(f)
 
-        else:
-            # Otherwise update it and rewrite the cache file
+            # Objects can depend on files other than their object file
+            needs_update = [x for x in self.checker if indexer.needs_update(x)]
+
+        if needs_update or not index_existed:
+            # Update the objects which changed, and rewrite the cache file
             with misc_cache.write_transaction(cache_filename) as (old, new):
                 indexer.read(old) if old else indexer.create()
 
                 for obj_name in needs_update:
-                    namespaced_name = f"{self.namespace}.{obj_name}"
-                    indexer.update(namespaced_name)
+                    indexer.update(f"{self.namespace}.{obj_name}")
 
                 indexer.write(new)
 
@@ -821,6 +1052,10 @@ class RepoPath:
         """Find a class for the spec's object and return the class object."""  # noqa: E501
         return self.repo_for_obj(obj_name).get_obj_class(obj_name)
 
+    def get_obj_metadata(self, obj_name):
+        """Find the directive data of an object, without importing it."""
+        return self.repo_for_obj(obj_name).get_obj_metadata(obj_name)
+
     @autospec
     def dump_provenance(self, spec, path):
         """Dump provenance information for a spec to a particular path.
@@ -1140,6 +1375,7 @@ class Repo:
         if self._repo_index is None:
             self._repo_index = RepoIndex(self._obj_checker, self.namespace, self.object_type)
             self._repo_index.add_indexer("tags", TagIndexer(self.object_type))
+            self._repo_index.add_indexer("metadata", MetadataIndexer(self.object_type))
         return self._repo_index
 
     @property
@@ -1147,6 +1383,11 @@ class Repo:
         """Index of tags and which objects they're defined on."""
         return self.index["tags"]
 
+    @property
+    def metadata_index(self):
+        """Index of the directive data defined on each object."""
+        return self.index["metadata"]
+
     def dirname_for_object_name(self, obj_name):
         """Get the directory name for a particular object.  This is the
         directory that contains its object.py file."""
@@ -1291,6 +1532,27 @@ class Repo:
 
         return cls
 
+    def get_obj_metadata(self, obj_name):
+        """Get the directive data of an object from the metadata index.
+
+        The index is only regenerated for objects whose files changed, so
+        this does not import the object's module when the index is current.
+        """
+        namespace, _, obj_name = obj_name.rpartition(".")
+        if namespace and (namespace != self.namespace):
+            raise InvalidNamespaceError(
+                f"Invalid namespace for {self.namespace} repo: {namespace}"
+            )
+
+        if not self.exists(obj_name):
+            raise UnknownObjectError(obj_name, self)
+
+        metadata = self.metadata_index.get(obj_name)
+        if metadata is None or "error" in metadata:
+            # Loading objects which failed to load reports why
+            metadata = MetadataIndex.object_metadata(self.get(obj_name))
+        return ObjectMetadata(metadata["name"], metadata["description"], metadata["attributes"])
+
     def __str__(self):
         return f"[Repo '{self.namespace}' at '{self.root}']"
 
@@ -0,0 +1,313 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Local store of the results of every workspace analysis
+
+Each analysis writes the complete results of a workspace into a new results
+file. Comparing figures of merit across analyses would require reading all
+of these files. The ResultsStore appends the results of each analysis into
+an SQLite database instead, with analyses, experiments, their variables,
+contexts, and figures of merit in separate (indexed) tables, so results can
+be queried across analyses.
+"""
+
+import contextlib
+import datetime
+import os
+import pathlib
+import sqlite3
+
+import ramble.error
+
+_schema = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    workspace_name TEXT,
+    workspace_hash TEXT,
+    timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS experiments (
+    id INTEGER PRIMARY KEY,
+    analysis_id INTEGER REFERENCES analyses(id),
+    name TEXT,
+    status TEXT,
+    n_repeats INTEGER
+);
+CREATE TABLE IF NOT EXISTS variables (
+    experiment_id INTEGER REFERENCES experiments(id),
+    name TEXT,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS contexts (
+    id INTEGER PRIMARY KEY,
+    experiment_id INTEGER REFERENCES experiments(id),
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS foms (
+    context_id INTEGER REFERENCES contexts(id),
+    name TEXT,
+    value TEXT,
+    numeric_value REAL,
+    units TEXT,
+    origin TEXT,
+    origin_type TEXT
+);
+CREATE INDEX IF NOT EXISTS experiments_analysis ON experiments(analysis_id);
+CREATE INDEX IF NOT EXISTS variables_name ON variables(name, value, experiment_id);
+CREATE INDEX IF NOT EXISTS variables_experiment ON variables(experiment_id, name);
+CREATE INDEX IF NOT EXISTS contexts_experiment ON contexts(experiment_id);
+CREATE INDEX IF NOT EXISTS foms_name ON foms(name, context_id);
+"""
+
+#: Aggregations supported by queries, and the SQL function computing each
+aggregations = {
+    "mean": "AVG",
+    "min": "MIN",
+    "max": "MAX",
+    "sum": "SUM",
+    "count": "COUNT",
+}
+
+#: Columns which can be grouped or filtered on, other than experiment variables
+builtin_columns = {
+    "analysis": "analyses.id",
+    "timestamp": "analyses.timestamp",
+    "workspace_hash": "analyses.workspace_hash",
+    "experiment": "experiments.name",
+    "status": "experiments.status",
+    "context": "contexts.name",
+    "fom": "foms.name",
+}
+
+# Result keys which are not variables of the experiment
+_result_fields = [
+    "name",
+    "RAMBLE_STATUS",
+    "N_REPEATS",
+    "CONTEXTS",
+    "RAMBLE_VARIABLES",
+    "RAMBLE_RAW_VARIABLES",
+    "TAGS",
+    "EXPERIMENT_CHAIN",
+]
+
+
+def _numeric(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsStoreError(ramble.error.RambleError):
+    """Raised when the results store cannot be queried"""
+
+
+class ResultsStore:
+    """SQLite database of the results of workspace analyses"""
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextlib.contextmanager
+    def _connect(self, read_only=False):
+        """Connect to the store, creating it unless it is opened read-only"""
+        if read_only:
+            uri = pathlib.Path(os.path.abspath(self.path)).as_uri() + "?mode=ro"
+            connection = sqlite3.connect(uri, uri=True)
+        else:
+            connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                if not read_only:
+                    connection.executescript(_schema)
+                yield connection
+        finally:
+            connection.close()
+
+    def add_analysis(self, results, timestamp=None):
+        """Append the results of an analysis
+
+        Args:
+            results (dict): Results of a workspace, as in its results files
+            timestamp (str | None): Time of the analysis. Defaults to now.
+
+        Returns:
+            (int): ID of the analysis in the store
+        """
+        if timestamp is None:
+            timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO analyses (workspace_name, workspace_hash, timestamp) "
+                "VALUES (?, ?, ?)",
+                (results.get("workspace_name"), results.get("workspace_hash"), timestamp),
+            )
+            analysis_id = cursor.lastrowid
+
+            for exp in results.get("experiments", []):
+                cursor = db.execute(
+                    "INSERT INTO experiments (analysis_id, name, status, n_repeats) "
+                    "VALUES (?, ?, ?, ?)",
+                    (analysis_id, exp["name"], exp.get("RAMBLE_STATUS"), exp.get("N_REPEATS")),
+                )
+                exp_id = cursor.lastrowid
+
+                # Keys are stored as top level fields of each result
+                exp_vars = dict(exp.get("RAMBLE_VARIABLES", {}))
+                for key, value in exp.items():
+                    if key not in _result_fields:
+                        exp_vars[key] = value
+                db.executemany(
+                    "INSERT INTO variables (experiment_id, name, value) VALUES (?, ?, ?)",
+                    [(exp_id, name, str(value)) for name, value in exp_vars.items()],
+                )
+
+                for context in exp.get("CONTEXTS", []):
+                    cursor = db.execute(
+                        "INSERT INTO contexts (experiment_id, name) VALUES (?, ?)",
+                        (exp_id, context["name"]),
+                    )
+                    context_id = cursor.lastrowid
+                    db.executemany(
+                        "INSERT INTO foms (context_id, name, value, numeric_value, units, "
+                        "origin, origin_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                context_id,
+                                fom["name"],
+                                str(fom["value"]),
+                                _numeric(fom["value"]),
+                                fom.get("units"),
+                                fom.get("origin"),
+                                fom.get("origin_type"),
+                            )
+                            for fom in context["foms"]
+                        ],
+                    )
+
+        return analysis_id
+
+    def query(
+        self,
+        foms=None,
+        where=None,
+        group_by=None,
+        aggregate=None,
+        last=None,
+        workspace_name=None,
+    ):
+        """Query figures of merit across analyses
+
+        Args:
+            foms (list(str) | None): Names of figures of merit to include.
+                All are included when this is None.
+            where (dict | None): Required values of columns, keyed by the
+                name of a builtin column or an experiment variable
+            group_by (list(str) | None): Builtin columns or experiment variables
+                to group figures of merit by, when aggregating
+            aggregate (str | None): Aggregation (one of aggregations) of the
+                numeric values of each figure of merit within a group. Values
+                are not aggregated when this is None.
+            last (int | None): Only include the most recent analyses
+            workspace_name (str | None): Only include analyses of this workspace
+
+        Returns:
+            (tuple(list(str), list(tuple))): Column names, and rows of the result
+        """
+        if aggregate is not None and aggregate not in aggregations:
+            raise ResultsStoreError(
+                f"Unknown aggregation {aggregate}, expected one of {list(aggregations)}"
+            )
+
+        joins = []
+        join_params = []
+        conditions = []
+        params = []
+        var_columns = {}
+
+        def column(name):
+            """SQL expression of a builtin column or experiment variable"""
+            if name in builtin_columns:
+                return builtin_columns[name]
+            if name not in var_columns:
+                alias = f"var{len(var_columns)}"
+                joins.append(
+                    f"LEFT JOIN variables AS {alias} ON {alias}.experiment_id = experiments.id "
+                    f"AND {alias}.name = ?"
+                )
+                join_params.append(name)
+                var_columns[name] = f"{alias}.value"
+            return var_columns[name]
+
+        group_by = list(group_by or [])
+        if aggregate is None:
+            columns = ["analysis", "timestamp", "experiment", "context", "fom"]
+            selects = [column(name) for name in columns] + ["foms.value", "foms.units"]
+            columns += ["value", "units"]
+        else:
+            columns = group_by + ([] if "fom" in group_by else ["fom"])
+            selects = [column(name) for name in columns]
+            selects += [f"{aggregations[aggregate]}(foms.numeric_value)", "foms.units"]
+            columns += [aggregate, "units"]
+
+        for name, value in (where or {}).items():
+            conditions.append(f"{column(name)} = ?")
+            params.append(str(value))
+
+        if foms:
+            conditions.append(f"foms.name IN ({', '.join('?' * len(foms))})")
+            params.extend(foms)
+
+        if aggregate is not None:
+            conditions.append("foms.numeric_value IS NOT NULL")
+
+        analysis_conditions = []
+        analysis_params = []
+        if workspace_name is not None:
+            analysis_conditions.append("workspace_name = ?")
+            analysis_params.append(workspace_name)
+        if last is not None:
+            analysis_filter = "SELECT id FROM analyses"
+            if analysis_conditions:
+                analysis_filter += " WHERE " + " AND ".join(analysis_conditions)
+            analysis_filter += " ORDER BY id DESC LIMIT ?"
+            conditions.append(f"analyses.id IN ({analysis_filter})")
+            params.extend(analysis_params + [last])
+        elif analysis_conditions:
+            conditions.extend(f"analyses.{cond}" for cond in analysis_conditions)
+            params.extend(analysis_params)
+
+        sql = (
+            f"SELECT {', '.join(selects)} FROM foms "
+            "JOIN contexts ON contexts.id = foms.context_id "
+            "JOIN experiments ON experiments.id = contexts.experiment_id "
+            "JOIN analyses ON analyses.id = experiments.analysis_id "
+        )
+        sql += " ".join(joins)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        if aggregate is None:
+            sql += " ORDER BY analyses.id, experiments.id, contexts.id, foms.rowid"
+        else:
+            # Values with different units are not aggregated together
+            group_selects = selects[: len(columns) - 2] + ["foms.units"]
+            sql += f" GROUP BY {', '.join(group_selects)} ORDER BY {', '.join(group_selects)}"
+
+        # Nothing was analyzed yet
+        if not os.path.exists(self.path):
+            return columns, []
+
+        try:
+            with self._connect(read_only=True) as db:
+                rows = db.execute(sql, join_params + params).fetchall()
+        except sqlite3.DatabaseError as e:
+            raise ResultsStoreError(f"Unable to query results store {self.path}: {e}")
+        return columns, rows
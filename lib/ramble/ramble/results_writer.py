@@ -0,0 +1,186 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Streaming writers for workspace results files
+
+Serializing the results of a large workspace as one document keeps the whole
+encoded document (and for YAML, the representation of every node) in memory
+at once. These writers emit the workspace level fields first, and then
+serialize results one experiment (or a small chunk of experiments) at a time.
+"""
+
+import json
+
+import spack.util.spack_yaml as syaml
+
+#: Key of raw variables in an experiment result
+raw_variables_key = "RAMBLE_RAW_VARIABLES"
+
+#: Key of raw variables shared by all experiments, when they are deduplicated
+shared_raw_variables_key = "RAMBLE_SHARED_RAW_VARIABLES"
+
+#: How raw variables of experiments are written
+raw_variables_modes = ["keep", "drop", "dedupe"]
+
+_missing = object()
+
+
+def shared_raw_variables(results):
+    """Raw variables with the same value in every experiment of results"""
+    shared = None
+    for result in results:
+        raw_variables = result.get(raw_variables_key, {})
+        if shared is None:
+            shared = dict(raw_variables)
+            continue
+        for name in list(shared):
+            if raw_variables.get(name, _missing) != shared[name]:
+                del shared[name]
+        if not shared:
+            break
+    return shared or {}
+
+
+def without_raw_variables(result, omit):
+    """A copy of result, whose raw variables do not contain those in omit
+
+    Args:
+        result (dict): Result of an experiment
+        omit (dict | None): Raw variables to omit. All raw variables are
+            omitted when this is None.
+    """
+    if raw_variables_key not in result:
+        return result
+    result = dict(result)
+    if omit is None:
+        del result[raw_variables_key]
+    else:
+        result[raw_variables_key] = {
+            name: value for name, value in result[raw_variables_key].items() if name not in omit
+        }
+    return result
+
+
+class ResultsWriter:
+    """Base class of streaming results writers
+
+    Writers are used as context managers. The workspace level fields are
+    written when entering the context, and the document is completed when
+    leaving it.
+    """
+
+    def __init__(self, stream, header):
+        """Create a writer
+
+        Args:
+            stream: File the results are written to
+            header (dict): Workspace level fields of the results
+        """
+        self.stream = stream
+        self.header = header
+        self.num_written = 0
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.end()
+
+    def begin(self):
+        pass
+
+    def write(self, result):
+        """Write the result of one experiment"""
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+
+class JsonLinesWriter(ResultsWriter):
+    """Writes JSON Lines: the workspace level fields, then one line per experiment"""
+
+    extension = ".jsonl"
+
+    def begin(self):
+        self.stream.write(json.dumps(self.header) + "\n")
+
+    def write(self, result):
+        self.stream.write(json.dumps(result) + "\n")
+        self.num_written += 1
+
+
+class JsonWriter(ResultsWriter):
+    """Writes one JSON document, with the results of experiments in an array"""
+
+    extension = ".json"
+
+    def begin(self):
+        self.stream.write("{\n")
+        for key, value in self.header.items():
+            self.stream.write(f"  {json.dumps(key)}: {self._encode(value, 2)},\n")
+        self.stream.write('  "experiments": [')
+
+    def write(self, result):
+        if self.num_written:
+            self.stream.write(",")
+        self.stream.write(f"\n    {self._encode(result, 4)}")
+        self.num_written += 1
+
+    def end(self):
+        if self.num_written:
+            self.stream.write("\n  ")
+        self.stream.write("]\n}\n")
+
+    @staticmethod
+    def _encode(value, indent):
+        """Encode value, as nested indent spaces deep"""
+        return json.dumps(value, indent=2, separators=(",", ": ")).replace(
+            "\n", "\n" + " " * indent
+        )
+
+
+class YamlWriter(ResultsWriter):
+    """Writes one YAML document, emitting experiments in chunks"""
+
+    extension = ".yaml"
+
+    #: Number of experiment results emitted at once
+    chunk_size = 64
+
+    def __init__(self, stream, header):
+        super().__init__(stream, header)
+        self._chunk = []
+
+    def begin(self):
+        if self.header:
+            syaml.dump(self.header, stream=self.stream)
+
+    def write(self, result):
+        self._chunk.append(result)
+        self.num_written += 1
+        if len(self._chunk) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._chunk:
+            if self.num_written == len(self._chunk):
+                self.stream.write("experiments:\n")
+            syaml.dump(self._chunk, stream=self.stream)
+            self._chunk = []
+
+    def end(self):
+        if not self.num_written:
+            self.stream.write("experiments: []\n")
+        self._flush()
+
+
+#: Writer of each results format
+writers = {"json": JsonWriter, "yaml": YamlWriter, "jsonl": JsonLinesWriter}
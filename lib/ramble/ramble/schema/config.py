@@ -158,6 +158,8 @@ properties["config"]["n_repeats"] = {"type": "string", "default": "0"}
 
 properties["config"]["repeat_success_strict"] = {"type": "boolean", "default": True}
 
+properties["config"]["render_jobs"] = {"type": "integer", "minimum": 1, "default": 1}
+
 
 #: Full schema with metadata
 schema = {
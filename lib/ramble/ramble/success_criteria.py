@@ -6,9 +6,9 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
-import re
 import fnmatch
 
+import ramble.analysis_plan
 from ramble.util.logger import logger
 
 
@@ -44,10 +44,15 @@ class ScopedCriteriaList:
         "application_definition": ["application_definition"],
     }
 
+    #: Scopes holding the criteria of application and modifier definitions
+    _definition_scopes = ["application_definition", "modifier_definition"]
+
     def __init__(self):
         self.criteria = {}
         for scope in self._valid_scopes:
             self.criteria[scope] = []
+        # AnalysisPlan which defined the criteria in the definition scopes
+        self.definition_plan = None
 
     def validate_scope(self, scope):
         if scope not in self._valid_scopes:
@@ -71,6 +76,9 @@ class ScopedCriteriaList:
         """
         self.validate_scope(scope)
 
+        if scope in self._definition_scopes:
+            self.definition_plan = None
+
         for scope in self._flush_scopes[scope]:
             logger.debug(f" Flushing scope: {scope}")
             logger.debug("    It contained:")
@@ -79,6 +87,15 @@ class ScopedCriteriaList:
             del self.criteria[scope]
             self.criteria[scope] = []
 
+    def signature(self):
+        """Names and files of the criteria outside of the definition scopes"""
+        return tuple(
+            (scope, criteria.name, criteria.file)
+            for scope in self._valid_scopes
+            if scope not in self._definition_scopes
+            for criteria in self.criteria[scope]
+        )
+
     def passed(self):
         succeed = True
         for scope in self._valid_scopes:
@@ -145,9 +162,9 @@ class SuccessCriteria:
                     'require exactly one of "anti_match" and "match" to be set.'
                 )
             if match is not None:
-                self.match = re.compile(match)
+                self.match = ramble.analysis_plan.compile_regex(match)
             else:
-                self.anti_match = re.compile(anti_match)
+                self.anti_match = ramble.analysis_plan.compile_regex(anti_match)
             self.file = file
 
         elif mode == "fom_comparison":
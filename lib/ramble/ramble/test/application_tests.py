@@ -7,6 +7,8 @@
 # except according to those terms.
 """Perform tests of the Application class"""
 
+import weakref
+
 import pytest
 
 import ramble.workspace
@@ -153,6 +155,22 @@ def test_application_copy_is_deep(mutable_mock_apps_repo, app_name):
                     assert copy_inst.internals[internal][exec_name][option] == value
 
 
+@pytest.mark.parametrize("app_name", ["basic", "zlib"])
+def test_application_copies_are_not_retained(mutable_mock_apps_repo, app_name):
+    src_inst = mutable_mock_apps_repo.get(app_name)
+
+    copy_inst = src_inst.copy()
+    assert copy_inst in src_inst.generated_experiments
+
+    copy_ref = weakref.ref(copy_inst)
+    del copy_inst
+
+    # Copies must be freed by reference counting alone, without needing a
+    # garbage collection pass to break reference cycles.
+    assert copy_ref() is None
+    assert not src_inst.generated_experiments
+
+
 @pytest.mark.parametrize(
     "app", ["basic", "basic-inherited", "input-test", "interleved-env-vars", "register-builtin"]
 )
@@ -0,0 +1,212 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import os
+import tarfile
+
+import py
+import pytest
+
+from spack.util.executable import which
+
+from ramble.archiver import Archiver, ArchiverError, latest_manifest, read_manifest, restore
+
+
+@pytest.fixture
+def workspace_files(tmpdir):
+    """Files of two experiments, which share a template"""
+    root = tmpdir.join("workspace")
+    for exp in ["exp1", "exp2"]:
+        exp_dir = root.join("experiments", exp)
+        exp_dir.ensure(dir=True)
+        exp_dir.join("execute_experiment").write("#!/bin/bash\necho shared\n")
+        exp_dir.join(f"{exp}.out").write(f"output of {exp}\n")
+    root.join("logs").ensure(dir=True)
+    root.join("logs", "setup.out").write("setup log\n")
+    os.symlink(str(root.join("logs", "setup.out")), str(root.join("logs", "setup.latest.out")))
+    return str(root)
+
+
+def _add_files(archiver, root):
+    archiver.add_tree(os.path.join(root, "experiments"), "experiments")
+    archiver.add_tree(os.path.join(root, "logs"), "logs", skip_links=True)
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_archiver_dedupes_directory_files(tmpdir, workspace_files, jobs):
+    archiver = Archiver(str(tmpdir.join("archive")), "test-archive", jobs=jobs)
+    _add_files(archiver, workspace_files)
+
+    assert archiver.write() == 4
+
+    archive_path = archiver.archive_path
+    assert sorted(os.listdir(os.path.join(archive_path, "logs"))) == ["setup.out"]
+
+    templates = [
+        os.path.join(archive_path, "experiments", exp, "execute_experiment")
+        for exp in ["exp1", "exp2"]
+    ]
+    assert os.path.samefile(*templates)
+    for template in templates:
+        with open(template) as f:
+            assert f.read() == "#!/bin/bash\necho shared\n"
+
+    with open(os.path.join(archive_path, "experiments", "exp2", "exp2.out")) as f:
+        assert f.read() == "output of exp2\n"
+
+    assert not os.path.exists(archiver.tar_path)
+
+
+def test_archiver_streams_tar_without_directory(tmpdir, workspace_files):
+    archiver = Archiver(
+        str(tmpdir.join("archive")), "test-archive", create_dir=False, create_tar=True, jobs=2
+    )
+    _add_files(archiver, workspace_files)
+    archiver.write()
+
+    assert not os.path.exists(archiver.archive_path)
+    assert archiver.tar_path.endswith(".tar.gz")
+    assert not os.path.exists(archiver.tar_path + ".part")
+
+    with tarfile.open(archiver.tar_path) as tar:
+        members = {member.name: member for member in tar.getmembers()}
+        assert sorted(members) == [
+            "test-archive/archive_manifest.json",
+            "test-archive/experiments/exp1/execute_experiment",
+            "test-archive/experiments/exp1/exp1.out",
+            "test-archive/experiments/exp2/execute_experiment",
+            "test-archive/experiments/exp2/exp2.out",
+            "test-archive/logs/setup.out",
+        ]
+
+        duplicate = members["test-archive/experiments/exp2/execute_experiment"]
+        assert duplicate.islnk()
+        assert duplicate.linkname == "test-archive/experiments/exp1/execute_experiment"
+
+        tar.extractall(str(tmpdir.join("extracted")))
+
+    extracted = tmpdir.join("extracted", "test-archive", "experiments", "exp2")
+    assert extracted.join("execute_experiment").read() == "#!/bin/bash\necho shared\n"
+    assert extracted.join("exp2.out").read() == "output of exp2\n"
+
+
+@pytest.mark.skipif(not which("zstd"), reason="zstd is not installed")
+def test_archiver_zstd_compression(tmpdir, workspace_files):
+    archiver = Archiver(
+        str(tmpdir.join("archive")),
+        "test-archive",
+        create_dir=False,
+        create_tar=True,
+        compression="zstd",
+    )
+    _add_files(archiver, workspace_files)
+    archiver.write()
+
+    assert archiver.tar_path.endswith(".tar.zst")
+    tar = which("tar", required=True)
+    output = tar("--zstd", "-tf", archiver.tar_path, output=str)
+    assert "test-archive/logs/setup.out" in output
+
+
+def test_archiver_unknown_compression(tmpdir):
+    with pytest.raises(ArchiverError, match="Unknown archive compression"):
+        Archiver(str(tmpdir), "test-archive", create_tar=True, compression="lzma")
+
+
+def _add_experiments(archiver, root, hashes):
+    for exp in ["exp1", "exp2"]:
+        exp_dir = os.path.join(root, "experiments", exp)
+        archiver.add_experiment(exp, hashes[exp])
+        for name in sorted(os.listdir(exp_dir)):
+            archiver.add_file(
+                os.path.join(exp_dir, name), os.path.join("experiments", exp, name), experiment=exp
+            )
+    archiver.add_tree(os.path.join(root, "logs"), "logs", skip_links=True)
+
+
+def _update_file(path, contents):
+    with open(path, "w") as f:
+        f.write(contents)
+    stat_info = os.stat(path)
+    os.utime(path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns + 10**9))
+
+
+@pytest.mark.parametrize("tar_only", [False, True])
+def test_incremental_archive_only_stores_changes(tmpdir, workspace_files, tar_only):
+    archive_dir = str(tmpdir.join("archive"))
+    hashes = {"exp1": "hash1", "exp2": "hash2"}
+
+    first = Archiver(archive_dir, "archive-1", create_dir=not tar_only, create_tar=tar_only)
+    _add_experiments(first, workspace_files, hashes)
+    assert first.write() == 4
+    assert latest_manifest(archive_dir)["archive"] == "archive-1"
+
+    _update_file(os.path.join(workspace_files, "experiments", "exp2", "exp2.out"), "rerun\n")
+    py.path.local(workspace_files).join("logs", "analyze.out").write("analyze log\n")
+
+    second = Archiver(
+        archive_dir,
+        "archive-2",
+        create_dir=not tar_only,
+        create_tar=tar_only,
+        base_manifest=latest_manifest(archive_dir),
+    )
+    _add_experiments(second, workspace_files, hashes)
+    # Only exp2, and the new log are stored again
+    assert second.write() == 3
+
+    manifest = read_manifest(archive_dir, "archive-2")
+    assert manifest["base"] == "archive-1"
+    files = manifest["files"]
+    assert files["experiments/exp1/exp1.out"]["archive"] == "archive-1"
+    assert files["logs/setup.out"]["archive"] == "archive-1"
+    assert files["experiments/exp2/exp2.out"]["archive"] == "archive-2"
+    assert files["experiments/exp2/execute_experiment"]["archive"] == "archive-2"
+    assert files["logs/analyze.out"]["archive"] == "archive-2"
+
+    if tar_only:
+        with tarfile.open(second.tar_path) as tar:
+            names = sorted(member.name for member in tar.getmembers())
+        assert names == [
+            "archive-2/archive_manifest.json",
+            "archive-2/experiments/exp2/execute_experiment",
+            "archive-2/experiments/exp2/exp2.out",
+            "archive-2/logs/analyze.out",
+        ]
+
+    restore_path = restore(archive_dir, "archive-2")
+    restored = py.path.local(restore_path)
+    assert restored.join("experiments", "exp1", "exp1.out").read() == "output of exp1\n"
+    assert restored.join("experiments", "exp1", "execute_experiment").read() == (
+        "#!/bin/bash\necho shared\n"
+    )
+    assert restored.join("experiments", "exp2", "exp2.out").read() == "rerun\n"
+    assert restored.join("logs", "setup.out").read() == "setup log\n"
+    assert restored.join("logs", "analyze.out").read() == "analyze log\n"
+
+
+def test_incremental_archive_stores_experiments_with_new_hash(tmpdir, workspace_files):
+    archive_dir = str(tmpdir.join("archive"))
+
+    first = Archiver(archive_dir, "archive-1")
+    _add_experiments(first, workspace_files, {"exp1": "hash1", "exp2": "hash2"})
+    first.write()
+
+    second = Archiver(archive_dir, "archive-2", base_manifest=latest_manifest(archive_dir))
+    _add_experiments(second, workspace_files, {"exp1": "hash1", "exp2": "new_hash"})
+    assert second.write() == 2
+
+    files = second.manifest["files"]
+    assert files["experiments/exp1/exp1.out"]["archive"] == "archive-1"
+    assert files["experiments/exp2/exp2.out"]["archive"] == "archive-2"
+
+    # Unchanged files are linked from the previous archive directory
+    assert os.path.samefile(
+        os.path.join(archive_dir, "archive-1", "experiments", "exp1", "exp1.out"),
+        os.path.join(archive_dir, "archive-2", "experiments", "exp1", "exp1.out"),
+    )
@@ -0,0 +1,173 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import os
+
+import pytest
+
+import spack.util.spack_json as sjson
+from spack.util.executable import Executable
+
+from ramble.batching import Batcher, BatchError, Submission, batch_record_file_name
+
+script_template = """#!/bin/sh
+#SBATCH -N {n_nodes}
+#SBATCH -o {run_dir}/slurm.out
+#SBATCH -J {name}
+# A regular comment
+cd "{run_dir}"
+echo {name} >> {output}
+"""
+
+
+def _add_experiment(batcher, tmpdir, name, n_nodes, submit="sbatch", directives=""):
+    run_dir = str(tmpdir.join("experiments", name))
+    os.makedirs(run_dir)
+    script = os.path.join(run_dir, "execute_experiment")
+    with open(script, "w") as f:
+        f.write(
+            script_template.format(
+                n_nodes=n_nodes, run_dir=run_dir, name=name, output=tmpdir.join("ran")
+            ).replace("# A regular comment\n", directives + "# A regular comment\n")
+        )
+    os.chmod(script, 0o755)
+    batcher.add(
+        Submission(
+            f"app.wl.{name}",
+            [submit, "-p", "debug", script],
+            run_dir,
+            short_name=name,
+            n_nodes=n_nodes,
+        )
+    )
+
+
+def test_batcher_groups_compatible_experiments(tmpdir):
+    batcher = Batcher(str(tmpdir.join("batches")), mode="array")
+    for name, n_nodes in [("exp1", "1"), ("exp2", "2"), ("exp3", "1"), ("exp4", "2")]:
+        _add_experiment(batcher, tmpdir, name, n_nodes)
+    _add_experiment(batcher, tmpdir, "exp5", "4")
+
+    commands = batcher.write()
+
+    batch_0, batch_1 = batcher.batches
+    assert [sub.name for sub in batch_0.submissions] == ["app.wl.exp1", "app.wl.exp3"]
+    assert [sub.name for sub in batch_1.submissions] == ["app.wl.exp2", "app.wl.exp4"]
+    assert commands == [
+        ("batch_0", ["sbatch", "--array=0-1", "-p", "debug", batch_0.script]),
+        ("batch_1", ["sbatch", "--array=0-1", "-p", "debug", batch_1.script]),
+        ("app.wl.exp5", batcher.submissions[-1].command),
+    ]
+
+    # Directives are kept, and refer to the batch instead of an experiment
+    batch_dir = os.path.dirname(batch_0.script)
+    with open(batch_0.script) as f:
+        script = f.read()
+    assert script.startswith(
+        f"#!/bin/sh\n#SBATCH -N 1\n#SBATCH -o {batch_dir}/slurm.out\n#SBATCH -J batch_0\n"
+    )
+    assert "A regular comment" not in script
+    assert 'case "${SLURM_ARRAY_TASK_ID}" in' in script
+
+    with open(os.path.join(str(tmpdir), "experiments", "exp3", batch_record_file_name)) as f:
+        record = sjson.load(f)
+    assert record == {"batch": "batch_0", "mode": "array", "script": batch_0.script, "index": 1}
+    assert not os.path.exists(
+        os.path.join(str(tmpdir), "experiments", "exp5", batch_record_file_name)
+    )
+
+    Executable(batch_0.script)(extra_env={"SLURM_ARRAY_TASK_ID": "1"})
+    assert tmpdir.join("ran").read() == "exp3\n"
+
+
+def test_batcher_wrapper_runs_each_experiment(tmpdir):
+    batcher = Batcher(str(tmpdir.join("batches")), mode="wrapper", max_size=2)
+    for name in ["exp1", "exp2", "exp3"]:
+        _add_experiment(batcher, tmpdir, name, "1", submit="sh")
+
+    commands = batcher.write()
+    assert [name for name, _ in commands] == ["batch_0", "app.wl.exp3"]
+
+    Executable(batcher.batches[0].script)()
+    assert tmpdir.join("ran").read() == "exp1\nexp2\n"
+
+    mapping_path = str(tmpdir.join("batches.json"))
+    batcher.write_mapping(mapping_path)
+    with open(mapping_path) as f:
+        mapping = sjson.load(f)["batches"]
+    assert [exp["name"] for exp in mapping["batch_0"]["experiments"]] == [
+        "app.wl.exp1",
+        "app.wl.exp2",
+    ]
+
+
+def test_batcher_array_fallback(tmpdir):
+    batcher = Batcher(str(tmpdir.join("batches")), mode="array")
+    for name in ["exp1", "exp2"]:
+        _add_experiment(batcher, tmpdir, name, "1", submit="sh")
+
+    batcher.write()
+    assert batcher.batches[0].mode == "wrapper"
+
+
+def test_batcher_short_experiment_names(tmpdir):
+    batcher = Batcher(str(tmpdir.join("batches")), mode="array")
+    # Names only differ in values of other directives, which are not job names
+    for name in ["4", "8"]:
+        _add_experiment(batcher, tmpdir, name, "1", directives=f"#SBATCH --ntasks={name}\n")
+    for name in ["16", "32"]:
+        _add_experiment(batcher, tmpdir, name, "1", directives=f"#SBATCH -n {name}\n")
+    for name in ["1", "2"]:
+        _add_experiment(batcher, tmpdir, name, "1", directives="#SBATCH --job-name=1\n")
+
+    batcher.write()
+    assert batcher.batches == []
+
+    batcher = Batcher(str(tmpdir.join("batches")), mode="array")
+    for name in ["5", "6"]:
+        _add_experiment(batcher, tmpdir, name, "1", directives=f"#SBATCH --job-name={name}\n")
+    batcher.write()
+
+    (batch,) = batcher.batches
+    with open(batch.script) as f:
+        script = f.read()
+    assert "#SBATCH -N 1\n" in script
+    assert "#SBATCH -J batch_0\n" in script
+    assert "#SBATCH --job-name=batch_0\n" in script
+
+
+def test_batcher_unknown_mode(tmpdir):
+    with pytest.raises(BatchError, match="Unknown batch mode"):
+        Batcher(str(tmpdir), mode="bundle")
+
+
+@pytest.mark.parametrize(
+    "directive",
+    ["#SBATCH --time=01:00:00", "#SBATCH -t 60", "#PBS -l nodes=1,walltime=01:00:00"],
+)
+def test_batcher_wrapper_time_limit(tmpdir, directive):
+    batcher = Batcher(str(tmpdir.join("batches")), mode="wrapper")
+    for name in ["exp1", "exp2"]:
+        _add_experiment(batcher, tmpdir, name, "1", directives=directive + "\n")
+
+    # The wrapper would run both experiments within the time limit of one
+    commands = batcher.write()
+    assert batcher.batches == []
+    assert [name for name, _ in commands] == ["app.wl.exp1", "app.wl.exp2"]
+
+    # Arrays give each experiment its own time limit, and wrappers are used
+    # when the number of experiments in a batch is limited
+    for mode, max_size in [("array", None), ("wrapper", 2)]:
+        limited = Batcher(str(tmpdir.join(f"{mode}_batches")), mode=mode, max_size=max_size)
+        for submission in batcher.submissions:
+            limited.add(submission)
+        limited.write()
+        (batch,) = limited.batches
+        assert batch.mode == mode
+        with open(batch.script) as f:
+            assert directive + "\n" in f.read()
@@ -10,6 +10,9 @@ import os
 
 import pytest
 
+import spack.util.spack_json as sjson
+
+import ramble.application
 import ramble.workspace
 import ramble.test.cmd.workspace
 import ramble.pipeline
@@ -89,3 +92,177 @@ def test_on_executor():
         assert os.path.exists(ws.root + "/all_experiments")
 
         on("--executor", 'echo "Index = {experiment_index}"', global_args=["-w", ws_name])
+
+
+concurrent_config = """
+ramble:
+  variables:
+    mpi_command: ''
+    batch_submit: '{execute_experiment}'
+    processes_per_node: '2'
+    n_ranks: '{processes_per_node}*{n_nodes}'
+  applications:
+    basic:
+      workloads:
+        test_wl:
+          experiments:
+            test_experiment_{n_nodes}:
+              variables:
+                n_nodes: ['1', '2']
+  software:
+    packages: {}
+    environments: {}
+"""
+
+
+def _create_concurrent_workspace(ws_name):
+    ws = ramble.workspace.create(ws_name)
+    ws.write()
+    with open(os.path.join(ws.config_dir, ramble.workspace.config_file_name), "w+") as f:
+        f.write(concurrent_config)
+    ws._re_read()
+
+    workspace("setup", "--dry-run", global_args=["-w", ws_name])
+    return ws
+
+
+@pytest.mark.parametrize("flags", [["--jobs", "2"], ["--cores", "4"]])
+def test_on_concurrent_executor(flags):
+    ws_name = "test_concurrent"
+    ws = _create_concurrent_workspace(ws_name)
+
+    output = on(
+        *flags,
+        "--executor",
+        'echo "Index = {experiment_index}"',
+        global_args=["-w", ws_name],
+    )
+    assert "[2/2]" in output
+
+    record_path = os.path.join(ws.log_dir, "execute.latest", "jobs.json")
+    with open(record_path) as f:
+        jobs = sjson.load(f)["jobs"]
+
+    assert sorted(job["name"] for job in jobs) == [
+        "basic.test_wl.test_experiment_1",
+        "basic.test_wl.test_experiment_2",
+    ]
+    for job in jobs:
+        assert job["returncode"] == 0
+        assert job["start_time"] <= job["end_time"]
+        with open(job["log_file"]) as f:
+            assert "Index = " in f.read()
+
+    if "--cores" in flags:
+        # Experiments use 2 and 4 ranks, so they cannot run together on 4 cores
+        assert sorted(job["slots"] for job in jobs) == [2, 4]
+        first, second = sorted(jobs, key=lambda job: job["start_time"])
+        assert first["end_time"] <= second["start_time"]
+
+
+def test_on_concurrent_executor_failure():
+    ws_name = "test_concurrent_failure"
+    _create_concurrent_workspace(ws_name)
+
+    output = on(
+        "--jobs",
+        "2",
+        "--executor",
+        "false",
+        global_args=["-w", ws_name],
+        fail_on_error=False,
+    )
+    assert "2 out of 2 experiments failed to execute" in output
+
+
+def test_on_serial_executor_runs_each_experiment_immediately(monkeypatch):
+    ws_name = "test_serial"
+    _create_concurrent_workspace(ws_name)
+
+    expanded = []
+    add_expand_vars = ramble.application.ApplicationBase.add_expand_vars
+
+    def _add_expand_vars(self, workspace):
+        expanded.append(self.expander.experiment_name)
+        return add_expand_vars(self, workspace)
+
+    monkeypatch.setattr(ramble.application.ApplicationBase, "add_expand_vars", _add_expand_vars)
+
+    # The first executor fails before the next experiment is expanded
+    on("--executor", "false", global_args=["-w", ws_name], fail_on_error=False)
+    assert "test_experiment_1" in expanded
+    assert "test_experiment_2" not in expanded
+
+
+batch_config = """
+ramble:
+  variables:
+    mpi_command: ''
+    batch_submit: '{execute_experiment}'
+    n_ranks: '{processes_per_node}*{n_nodes}'
+  applications:
+    basic:
+      workloads:
+        test_wl:
+          experiments:
+            test_experiment_{n_nodes}_{processes_per_node}:
+              variables:
+                n_nodes: ['1', '2']
+                processes_per_node: ['1', '2']
+              matrix:
+              - n_nodes
+              - processes_per_node
+  software:
+    packages: {}
+    environments: {}
+"""
+
+
+@pytest.mark.parametrize("mode", ["array", "wrapper"])
+def test_on_batch_submission(tmpdir, mode):
+    ws_name = f"test_batch_{mode}"
+    ws = ramble.workspace.create(ws_name)
+    ws.write()
+    with open(os.path.join(ws.config_dir, ramble.workspace.config_file_name), "w+") as f:
+        f.write(batch_config)
+    ws._re_read()
+    workspace("setup", "--dry-run", global_args=["-w", ws_name])
+
+    # A fake sbatch, which records how it was invoked
+    record_path = tmpdir.join("sbatch_calls")
+    sbatch = tmpdir.join("sbatch")
+    sbatch.write(f'#!/bin/sh\necho "$@" >> {record_path}\n')
+    sbatch.chmod(0o755)
+
+    output = on(
+        "--batch",
+        mode,
+        "--executor",
+        f"{sbatch} {{execute_experiment}}",
+        global_args=["-w", ws_name],
+    )
+    assert "Batched 4 out of 4 experiments into 2 submissions" in output
+
+    mapping_path = os.path.join(ws.log_dir, "execute.latest", "batches.json")
+    with open(mapping_path) as f:
+        batches = sjson.load(f)["batches"]
+
+    # Experiments are grouped by their number of nodes
+    assert sorted([exp["name"] for exp in batch["experiments"]] for batch in batches.values()) == [
+        ["basic.test_wl.test_experiment_1_1", "basic.test_wl.test_experiment_1_2"],
+        ["basic.test_wl.test_experiment_2_1", "basic.test_wl.test_experiment_2_2"],
+    ]
+
+    calls = record_path.read().splitlines()
+    expected_calls = []
+    for batch in batches.values():
+        assert batch["mode"] == mode
+        args = [batch["script"]]
+        if mode == "array":
+            args.insert(0, "--array=0-1")
+        expected_calls.append(" ".join(args))
+
+        for exp in batch["experiments"]:
+            with open(os.path.join(exp["run_dir"], "ramble_batch.json")) as f:
+                assert sjson.load(f)["script"] == batch["script"]
+    assert sorted(calls) == sorted(expected_calls)
@@ -6,11 +6,18 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import os
+
 import py
 import pytest
 
 import ramble.paths
 import ramble.cmd.results
+from ramble.main import RambleCommand
+from ramble.results_store import ResultsStore
+from ramble.test.results_store import analysis_results
+
+results = RambleCommand("results")
 
 INPUT_DATA = py.path.local(ramble.paths.test_path).join("data", "results_upload")
 
@@ -37,3 +44,26 @@ def test_file_import_rejects_invalid_files(filename, expected_output, capsys):
         ramble.cmd.results.import_results_file(filename)
         captured = capsys.readouterr()
         assert expected_output in captured
+
+
+def test_results_query(tmpdir):
+    store_path = str(tmpdir.join("results.sqlite"))
+    store = ResultsStore(store_path)
+    store.add_analysis(analysis_results(["10", "20"]))
+    store.add_analysis(analysis_results(["30", "40"]))
+
+    output = results(
+        "query", "--store", store_path, "--fom", "gflops", "--group-by", "n_nodes", "--last", "1"
+    )
+    lines = output.strip().splitlines()
+    assert lines[0].split() == ["n_nodes", "fom", "mean", "units"]
+    assert lines[1].split() == ["1", "gflops", "30.0", "GFLOP/s"]
+    assert lines[2].split() == ["2", "gflops", "40.0", "GFLOP/s"]
+
+    output = results("query", "--store", store_path, "--where", "bad-filter", fail_on_error=False)
+    assert "Invalid filter bad-filter" in output
+
+    missing_path = str(tmpdir.join("mistyped.sqlite"))
+    output = results("query", "--store", missing_path, fail_on_error=False)
+    assert f"Results store {missing_path} does not exist" in output
+    assert not os.path.exists(missing_path)
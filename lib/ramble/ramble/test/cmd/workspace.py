@@ -8,6 +8,7 @@
 
 import os
 import glob
+import tarfile
 
 import pytest
 
@@ -1532,6 +1533,151 @@ ramble:
     assert os.path.exists(os.path.join(ws1.archive_dir, "archive.latest.tar.gz"))
 
 
+def test_workspace_tar_only_archive():
+    test_config = """
+ramble:
+  variables:
+    mpi_command: 'mpirun -n {n_ranks} -ppn {processes_per_node}'
+    batch_submit: 'batch_submit {execute_experiment}'
+    processes_per_node: '5'
+    n_ranks: '{processes_per_node}*{n_nodes}'
+  applications:
+    basic:
+      workloads:
+        test_wl:
+          experiments:
+            test_experiment_{n_nodes}:
+              variables:
+                n_nodes: ['1', '2']
+  software:
+    packages: {}
+    environments: {}
+"""
+
+    workspace_name = "test_tar_only_archive"
+    ws1 = ramble.workspace.create(workspace_name)
+    ws1.write()
+
+    config_path = os.path.join(ws1.config_dir, ramble.workspace.config_file_name)
+
+    with open(config_path, "w+") as f:
+        f.write(test_config)
+
+    ws1._re_read()
+
+    workspace("setup", "--dry-run", global_args=["-w", workspace_name])
+
+    # Create files that match archive pattern, with the same contents in each experiment
+    archived_files = []
+    for n_nodes in ["1", "2"]:
+        experiment_dir = os.path.join(
+            ws1.root, "experiments", "basic", "test_wl", f"test_experiment_{n_nodes}"
+        )
+        new_file = os.path.join(experiment_dir, "archive_test.log")
+        with open(new_file, "w+") as f:
+            f.write("shared contents\n")
+        archived_files.append(os.path.relpath(new_file, ws1.root))
+
+    workspace("archive", "--tar-only", "-j", "2", global_args=["-w", workspace_name])
+
+    assert not ws1.latest_archive
+    assert os.path.exists(os.path.join(ws1.archive_dir, "archive.latest.tar.gz"))
+    tar_files = glob.glob(os.path.join(ws1.archive_dir, "*-archive-*.tar.gz"))
+    assert len(tar_files) == 1
+
+    archive_name = os.path.basename(tar_files[0])[: -len(".tar.gz")]
+    with tarfile.open(tar_files[0]) as tar:
+        members = {member.name: member for member in tar.getmembers()}
+
+    first, second = [os.path.join(archive_name, file) for file in archived_files]
+    assert members[first].isfile()
+    assert members[second].islnk()
+    assert members[second].linkname == first
+
+    for experiment in ["test_experiment_1", "test_experiment_2"]:
+        execute_path = os.path.join(
+            archive_name, "experiments", "basic", "test_wl", experiment, "execute_experiment"
+        )
+        assert execute_path in members
+
+
+def test_workspace_incremental_archive():
+    test_config = """
+ramble:
+  variables:
+    mpi_command: 'mpirun -n {n_ranks} -ppn {processes_per_node}'
+    batch_submit: 'batch_submit {execute_experiment}'
+    processes_per_node: '5'
+    n_ranks: '{processes_per_node}*{n_nodes}'
+  applications:
+    basic:
+      workloads:
+        test_wl:
+          experiments:
+            test_experiment_{n_nodes}:
+              variables:
+                n_nodes: ['1', '2']
+  software:
+    packages: {}
+    environments: {}
+"""
+
+    workspace_name = "test_incremental_archive"
+    ws1 = ramble.workspace.create(workspace_name)
+    ws1.write()
+
+    config_path = os.path.join(ws1.config_dir, ramble.workspace.config_file_name)
+
+    with open(config_path, "w+") as f:
+        f.write(test_config)
+
+    ws1._re_read()
+
+    workspace("setup", "--dry-run", global_args=["-w", workspace_name])
+
+    exp_dirs = {}
+    for n_nodes in ["1", "2"]:
+        exp_dirs[n_nodes] = os.path.join(
+            ws1.root, "experiments", "basic", "test_wl", f"test_experiment_{n_nodes}"
+        )
+        with open(os.path.join(exp_dirs[n_nodes], "archive_test.log"), "w+") as f:
+            f.write(f"first run of {n_nodes} nodes\n")
+
+    workspace("archive", "-p", "full", global_args=["-w", workspace_name])
+
+    # Change the output of a single experiment
+    changed_file = os.path.join(exp_dirs["2"], "archive_test.log")
+    with open(changed_file, "w+") as f:
+        f.write("second run of 2 nodes\n")
+    stat_info = os.stat(changed_file)
+    os.utime(changed_file, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns + 10**9))
+
+    output = workspace(
+        "archive", "-i", "--tar-only", "-p", "incremental", global_args=["-w", workspace_name]
+    )
+    assert "Archiving changes since full-archive-" in output
+
+    tar_files = glob.glob(os.path.join(ws1.archive_dir, "incremental-archive-*.tar.gz"))
+    assert len(tar_files) == 1
+    archive_name = os.path.basename(tar_files[0])[: -len(".tar.gz")]
+
+    with tarfile.open(tar_files[0]) as tar:
+        names = [member.name for member in tar.getmembers()]
+
+    rel_exp_dirs = {n: os.path.relpath(exp_dir, ws1.root) for n, exp_dir in exp_dirs.items()}
+    assert os.path.join(archive_name, rel_exp_dirs["2"], "archive_test.log") in names
+    unchanged_dir = os.path.join(archive_name, rel_exp_dirs["1"])
+    assert not any(name.startswith(unchanged_dir) for name in names)
+
+    workspace("archive", "--restore", archive_name, global_args=["-w", workspace_name])
+
+    restored = os.path.join(ws1.archive_dir, archive_name)
+    for n_nodes, contents in [("1", "first run of 1 nodes\n"), ("2", "second run of 2 nodes\n")]:
+        with open(os.path.join(restored, rel_exp_dirs[n_nodes], "archive_test.log")) as f:
+            assert f.read() == contents
+        assert os.path.exists(os.path.join(restored, rel_exp_dirs[n_nodes], "execute_experiment"))
+
+
 def test_workspace_tar_upload_archive():
     test_config = """
 ramble:
@@ -0,0 +1,167 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import hashlib
+import http.server
+import os
+import threading
+
+import pytest
+
+from ramble.download_scheduler import DownloadScheduler
+from ramble.fetch_strategy import FsCache, URLFetchStrategy
+from ramble.mirror import MirrorCollection, mirror_archive_paths
+
+archive_contents = b"input archive contents\n" * 4096
+
+
+class _ArchiveHandler(http.server.BaseHTTPRequestHandler):
+    """Serve archive_contents, with support for range requests"""
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("Range")))
+        if self.path != "/input.tar.gz":
+            self.send_error(404)
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header[len("bytes=") :].rstrip("-"))
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        body = archive_contents[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def archive_server():
+    _ArchiveHandler.requests = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ArchiveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _digest(contents):
+    return hashlib.sha256(contents).hexdigest()
+
+
+def test_download_scheduler_downloads_each_checksum_once(tmpdir, archive_server):
+    cache = FsCache(str(tmpdir))
+    scheduler = DownloadScheduler(jobs=4, cache=cache)
+
+    url = f"{archive_server}/input.tar.gz"
+    digest = _digest(archive_contents)
+    for storage_path in ["app1/input.tar.gz", "app2/input.tar.gz", "app1/input.tar.gz"]:
+        assert scheduler.add(URLFetchStrategy(url, digest), storage_path)
+
+    assert len(scheduler.downloads) == 1
+    assert scheduler.run() == []
+    assert len(_ArchiveHandler.requests) == 1
+
+    for storage_path in ["app1/input.tar.gz", "app2/input.tar.gz"]:
+        with open(os.path.join(cache.root, storage_path), "rb") as f:
+            assert f.read() == archive_contents
+
+    # Archives which are already cached are not downloaded again
+    scheduler = DownloadScheduler(jobs=4, cache=cache)
+    scheduler.add(URLFetchStrategy(url, digest), "app1/input.tar.gz")
+    scheduler.add(URLFetchStrategy(url, digest), "app3/input.tar.gz")
+    assert scheduler.run() == []
+    assert len(_ArchiveHandler.requests) == 1
+    assert os.path.isfile(os.path.join(cache.root, "app3/input.tar.gz"))
+
+
+def test_download_scheduler_resumes_partial_downloads(tmpdir, archive_server):
+    cache = FsCache(str(tmpdir))
+    dest = os.path.join(cache.root, "input.tar.gz")
+    with open(dest + ".part", "wb") as f:
+        f.write(archive_contents[:1000])
+
+    scheduler = DownloadScheduler(jobs=2, cache=cache)
+    scheduler.add(
+        URLFetchStrategy(f"{archive_server}/input.tar.gz", _digest(archive_contents)),
+        "input.tar.gz",
+    )
+    assert scheduler.run() == []
+
+    assert _ArchiveHandler.requests == [("/input.tar.gz", "bytes=1000-")]
+    assert not os.path.exists(dest + ".part")
+    with open(dest, "rb") as f:
+        assert f.read() == archive_contents
+
+
+def test_download_scheduler_reports_failures(tmpdir, archive_server):
+    cache = FsCache(str(tmpdir))
+    scheduler = DownloadScheduler(jobs=2, cache=cache)
+
+    scheduler.add(
+        URLFetchStrategy(f"{archive_server}/input.tar.gz", _digest(b"other contents")),
+        "bad-checksum.tar.gz",
+    )
+    scheduler.add(
+        URLFetchStrategy(f"{archive_server}/missing.tar.gz", _digest(archive_contents)),
+        "missing.tar.gz",
+    )
+    failed = scheduler.run()
+
+    assert len(failed) == 2
+    assert all(download.error for download in failed)
+    assert os.listdir(cache.root) == []
+
+
+def test_download_scheduler_skips_unsupported_fetchers(tmpdir):
+    scheduler = DownloadScheduler(jobs=2, cache=FsCache(str(tmpdir)))
+
+    # Inputs without a checksum are not stored in the fetch cache
+    assert not scheduler.add(URLFetchStrategy("http://example.com/input.tar.gz"), "input")
+    assert not scheduler.add(
+        URLFetchStrategy("ftp://example.com/input.tar.gz", _digest(archive_contents)), "input"
+    )
+    assert scheduler.downloads == {}
+    assert scheduler.run() == []
+
+
+def test_download_scheduler_tries_mirrors_first(tmpdir):
+    mirror_dir = tmpdir.mkdir("mirror")
+    digest = _digest(archive_contents)
+    fetcher = URLFetchStrategy("http://127.0.0.1:1/input.tar.gz", digest)
+    mirror_paths = mirror_archive_paths(fetcher, os.path.join("app", "input"))
+    mirror_file = mirror_dir.join(mirror_paths.storage_path)
+    mirror_file.dirpath().ensure(dir=True)
+    mirror_file.write_binary(archive_contents)
+
+    cache = FsCache(str(tmpdir.join("cache")))
+    mirrors = MirrorCollection({"local": f"file://{mirror_dir}"})
+    scheduler = DownloadScheduler(jobs=2, cache=cache, mirrors=mirrors)
+    assert scheduler.add(fetcher, mirror_paths.storage_path, mirror_paths)
+
+    (download,) = scheduler.downloads.values()
+    assert download.urls[-1] == fetcher.url
+    assert download.urls[0].startswith(f"file://{mirror_dir}")
+
+    # The upstream URL is unreachable, and is not tried
+    assert scheduler.run() == []
+    with open(os.path.join(cache.root, mirror_paths.storage_path), "rb") as f:
+        assert f.read() == archive_contents
+
+    # Inputs are left to their experiments when only mirrors may be used
+    scheduler = DownloadScheduler(jobs=2, cache=cache, mirrors=mirrors, mirror_only=True)
+    assert not scheduler.add(fetcher, mirror_paths.storage_path, mirror_paths)
+    assert scheduler.downloads == {}
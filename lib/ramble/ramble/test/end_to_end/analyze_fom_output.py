@@ -8,17 +8,22 @@
 
 import os
 import glob
+import json
+import shutil
 
 import pytest
 
 import llnl.util.tty as tty
 
+import spack.util.spack_yaml as syaml
+
 import ramble.workspace
 import ramble.config
 import ramble.software_environments
+import ramble.util.experiment_index
+import ramble.util.log_scanner
 from ramble.main import RambleCommand
 
-
 # everything here uses the mock_workspace_path
 pytestmark = pytest.mark.usefixtures(
     "mutable_config",
@@ -76,6 +81,13 @@ def test_analyze_fom_output():
         assert "default (null) context figures of merit" in content
         assert "possible hostname = test-user.c.googlers.com" in content
 
+    # Results of each analysis are also appended to the workspace's results store
+    workspace("analyze", global_args=["-w", workspace_name])
+    _, rows = ws.results_store.query(foms=["possible hostname"])
+    assert [row[2:] for row in rows] == [
+        ("hostname.local.test", "null", "possible hostname", "test-user.c.googlers.com", "")
+    ] * 2
+
 
 def test_analyze_print(monkeypatch):
     workspace_name = "test-analyze-print"
@@ -95,3 +107,140 @@ def test_analyze_print(monkeypatch):
     msg_list = []
     workspace("analyze", "-p", global_args=["-w", workspace_name])
     assert any(m.startswith("Results from the analysis pipeline") for m in msg_list)
+
+
+def test_analyze_reuses_unchanged_experiments(monkeypatch):
+    workspace_name = "test-incremental-analyze"
+    ws = _setup_workspace(workspace_name)
+    exp_dir = os.path.join(ws.experiment_dir, "hostname", "local", "test")
+    results_path = os.path.join(ws.root, "results.latest.json")
+
+    workspace("analyze", "-f", "json", global_args=["-w", workspace_name])
+    assert os.path.exists(os.path.join(exp_dir, "ramble_analysis.json"))
+    with open(results_path) as f:
+        first_results = f.read()
+
+    def fail_read(*args, **kwargs):
+        raise AssertionError("unchanged log was read again")
+
+    # Unchanged experiments are not read again, and give the same results
+    with monkeypatch.context() as m:
+        m.setattr(ramble.util.log_scanner.LogScanner, "lines", fail_read)
+        workspace("analyze", "-f", "json", global_args=["-w", workspace_name])
+        with open(results_path) as f:
+            assert f.read() == first_results
+
+        with pytest.raises(AssertionError, match="unchanged log"):
+            workspace("analyze", "--reanalyze", global_args=["-w", workspace_name])
+
+    with open(os.path.join(exp_dir, "test.out"), "w+") as f:
+        f.write("other-host\n")
+
+    workspace("analyze", "-f", "json", global_args=["-w", workspace_name])
+    with open(results_path) as f:
+        assert "other-host" in f.read()
+
+
+def test_experiment_records_are_indexed():
+    workspace_name = "test-experiment-index"
+    ws = _setup_workspace(workspace_name)
+    exp_dir = os.path.join(ws.experiment_dir, "hostname", "local", "test")
+    exp_key = os.path.relpath(exp_dir, ws.root)
+
+    index = ramble.util.experiment_index.ExperimentIndex(ws.experiment_index.path)
+    assert index.get(exp_key, "status") == {"experiment_status": "SETUP"}
+    assert index.get(exp_key, "inventory") is not None
+
+    # Records are read from the workspace index, instead of each experiment
+    for file_name in ["ramble_status.json", "ramble_inventory.json"]:
+        os.remove(os.path.join(exp_dir, file_name))
+
+    workspace("analyze", "-p", global_args=["-w", workspace_name])
+    with open(os.path.join(ws.root, "results.latest.txt")) as f:
+        assert "possible hostname = test-user.c.googlers.com" in f.read()
+
+    assert os.path.exists(os.path.join(exp_dir, "ramble_status.json"))
+    index = ramble.util.experiment_index.ExperimentIndex(ws.experiment_index.path)
+    assert index.get(exp_key, "analysis")["status"] == "SUCCESS"
+
+
+def test_experiment_records_require_run_dir():
+    workspace_name = "test-experiment-index-removed"
+    ws = _setup_workspace(workspace_name)
+    exp_dir = os.path.join(ws.experiment_dir, "hostname", "local", "test")
+
+    ws.software_environments = ramble.software_environments.SoftwareEnvironments(ws)
+    _, app_inst, _ = next(ws.build_experiment_set().all_experiments())
+    app_inst.read_status(ws)
+    assert app_inst.get_status() == "SETUP"
+
+    # Records of a removed run directory are not used
+    shutil.rmtree(exp_dir)
+    app_inst.read_status(ws)
+    assert app_inst.get_status() == "UNKNOWN"
+
+    ws.experiment_index.update(os.path.relpath(exp_dir, ws.root), "inventory", {"stale": True})
+    app_inst.populate_inventory(ws)
+    assert app_inst.hash_inventory != {"stale": True}
+
+    output = workspace(
+        "info", "--where", '"{experiment_status}" == "SETUP"', global_args=["-w", workspace_name]
+    )
+    assert "hostname.local.test" not in output
+
+
+def test_analyze_streamed_formats():
+    workspace_name = "test-analyze-formats"
+    ws = _setup_workspace(workspace_name)
+
+    workspace("analyze", "-f", "json", "jsonl", "yaml", global_args=["-w", workspace_name])
+    with open(os.path.join(ws.root, "results.latest.json")) as f:
+        json_results = json.load(f)
+    with open(os.path.join(ws.root, "results.latest.yaml")) as f:
+        assert syaml.load(f) == json_results
+    with open(os.path.join(ws.root, "results.latest.jsonl")) as f:
+        lines = [json.loads(line) for line in f]
+    assert dict(lines[0], experiments=lines[1:]) == json_results
+    assert json_results["experiments"][0]["RAMBLE_RAW_VARIABLES"]["n_nodes"] == "1"
+
+    workspace(
+        "analyze", "-f", "json", "--raw-variables", "dedupe", global_args=["-w", workspace_name]
+    )
+    with open(os.path.join(ws.root, "results.latest.json")) as f:
+        deduped = json.load(f)
+    assert deduped["RAMBLE_SHARED_RAW_VARIABLES"]["n_nodes"] == "1"
+    assert deduped["experiments"][0]["RAMBLE_RAW_VARIABLES"] == {}
+
+    workspace(
+        "analyze", "-f", "json", "--raw-variables", "drop", global_args=["-w", workspace_name]
+    )
+    with open(os.path.join(ws.root, "results.latest.json")) as f:
+        dropped = json.load(f)
+    assert "RAMBLE_RAW_VARIABLES" not in dropped["experiments"][0]
+    assert dropped["experiments"][0]["CONTEXTS"] == json_results["experiments"][0]["CONTEXTS"]
+
+
+def test_analysis_plan_is_reused():
+    workspace_name = "test-analysis-plan"
+    ws = _setup_workspace(workspace_name)
+    ws.software_environments = ramble.software_environments.SoftwareEnvironments(ws)
+    experiment_set = ws.build_experiment_set()
+    _, app_inst, _ = next(experiment_set.all_experiments())
+    app_inst.add_expand_vars(ws)
+
+    plan = app_inst._analysis_plan(ws.success_list)
+    assert app_inst._analysis_plan(ws.success_list) is plan
+    assert ws.success_list.definition_plan is plan
+
+    # Experiments with the same definitions share the template
+    other_inst = app_inst.copy()
+    other_inst.add_expand_vars(ws)
+    other_plan = other_inst._analysis_plan(ws.success_list)
+    assert other_plan.template is plan.template
+    assert ws.success_list.definition_plan is other_plan
+
+    # The plan is expanded again when the experiment's variables change
+    app_inst.variables["log_file"] = "{experiment_run_dir}/renamed.out"
+    new_plan = app_inst._analysis_plan(ws.success_list)
+    assert new_plan is not plan
+    assert any(path.endswith("renamed.out") for path in new_plan.files)
@@ -0,0 +1,84 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import os
+
+import pytest
+
+import ramble.workspace
+import ramble.config
+import ramble.pipeline
+from ramble.main import RambleCommand
+
+# everything here uses the mock_workspace_path
+pytestmark = pytest.mark.usefixtures(
+    "mutable_config",
+    "mutable_mock_workspace_path",
+)
+
+workspace = RambleCommand("workspace")
+
+
+@pytest.mark.skipif(
+    not ramble.pipeline._parallel_pipeline_supported(),
+    reason="Parallel analysis is not supported on this platform",
+)
+def test_parallel_analyze_matches_serial():
+    test_config = """
+ramble:
+  config:
+    n_repeats: '2'
+  variables:
+    mpi_command: ''
+    batch_submit: 'batch_submit {execute_experiment}'
+    processes_per_node: '1'
+  applications:
+    hostname:
+      workloads:
+        local:
+          experiments:
+            test_{n_nodes}:
+              variables:
+                n_nodes: ['1', '2', '3', '4', '5', '6']
+  software:
+    packages: {}
+    environments: {}
+"""
+    workspace_name = "test-parallel-analyze"
+    ws = ramble.workspace.create(workspace_name)
+    ws.write()
+
+    config_path = os.path.join(ws.config_dir, ramble.workspace.config_file_name)
+
+    with open(config_path, "w+") as f:
+        f.write(test_config)
+
+    ws._re_read()
+
+    workspace("setup", "--dry-run", global_args=["-w", workspace_name])
+
+    # Leave one experiment without output, so it fails analysis
+    exp_root = os.path.join(ws.experiment_dir, "hostname", "local")
+    for exp_name in os.listdir(exp_root):
+        if exp_name != "test_3.2":
+            with open(os.path.join(exp_root, exp_name, f"{exp_name}.out"), "w+") as f:
+                f.write(f"host-{exp_name}\n")
+
+    results_path = os.path.join(ws.root, "results.latest.json")
+
+    workspace("analyze", "-f", "json", global_args=["-w", workspace_name])
+    with open(results_path) as f:
+        serial_results = f.read()
+
+    workspace("analyze", "-f", "json", "-j", "4", global_args=["-w", workspace_name])
+    with open(results_path) as f:
+        parallel_results = f.read()
+
+    assert "host-test_6.1" in serial_results
+    assert '"RAMBLE_STATUS": "FAILED"' in serial_results
+    assert parallel_results == serial_results
@@ -0,0 +1,94 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import os
+
+import pytest
+
+import ramble.workspace
+import ramble.config
+import ramble.pipeline
+from ramble.main import RambleCommand
+
+# everything here uses the mock_workspace_path
+pytestmark = pytest.mark.usefixtures(
+    "mutable_config",
+    "mutable_mock_workspace_path",
+)
+
+workspace = RambleCommand("workspace")
+
+
+@pytest.mark.skipif(
+    not ramble.pipeline._parallel_pipeline_supported(),
+    reason="Parallel setup is not supported on this platform",
+)
+def test_parallel_setup_prepares_each_environment_once():
+    test_config = """
+ramble:
+  variants:
+    package_manager: pip
+  variables:
+    mpi_command: ''
+    batch_submit: '{execute_experiment}'
+    processes_per_node: '1'
+  applications:
+    hostname:
+      workloads:
+        local:
+          experiments:
+            test_{env_name}_{n_nodes}:
+              variables:
+                env_name: ['env_a', 'env_b', 'env_c']
+                n_nodes: ['1', '2']
+              matrix:
+                - env_name
+                - n_nodes
+  software:
+    packages:
+      pkg_a:
+        pkg_spec: 'pkg-a==1.0'
+      pkg_b:
+        pkg_spec: 'pkg-b==2.0'
+      pkg_c:
+        pkg_spec: 'pkg-c==3.0'
+    environments:
+      env_a:
+        packages: [pkg_a]
+      env_b:
+        packages: [pkg_b]
+      env_c:
+        packages: [pkg_c]
+"""
+    workspace_name = "test-parallel-setup"
+    ws = ramble.workspace.create(workspace_name)
+    ws.write()
+
+    config_path = os.path.join(ws.config_dir, ramble.workspace.config_file_name)
+
+    with open(config_path, "w+") as f:
+        f.write(test_config)
+
+    ws._re_read()
+
+    output = workspace("setup", "--dry-run", "-j", "3", global_args=["-w", workspace_name])
+
+    assert "Setting up 3 software environments using 3 jobs" in output
+
+    env_log_dir = os.path.join(ws.log_dir, "setup.latest", "software")
+    for env_name, pkg_spec in [
+        ("env_a", "pkg-a==1.0"),
+        ("env_b", "pkg-b==2.0"),
+        ("env_c", "pkg-c==3.0"),
+    ]:
+        with open(os.path.join(env_log_dir, f"pip.{env_name}.out")) as f:
+            env_log = f.read()
+        assert "Installing packages" in env_log
+
+        with open(os.path.join(ws.software_dir, env_name, "requirements.txt")) as f:
+            assert pkg_spec in f.read()
@@ -181,3 +181,81 @@ def test_expansion_namespaces():
     assert expander.application_namespace == "foo"
     assert expander.workload_namespace == "foo.bar"
     assert expander.experiment_namespace == "foo.bar.baz"
+
+
+def test_expansion_cache_invalidation():
+    expansion_vars = exp_dict()
+
+    expander = ramble.expander.Expander(expansion_vars, None, no_expand_vars=set())
+
+    assert expander.expand_var("{var1}") == "3"
+    assert ("{var1}", True) in expander._expansion_cache
+
+    # Modifying the variable definitions in place should invalidate the cache
+    expansion_vars["var3"] = "5"
+    assert expander.expand_var("{var1}") == "5"
+
+    expander.add_no_expand_var("var1")
+    assert expander.expand_var("{var1}") == "{var2}"
+
+
+def test_expansion_cache_tracks_used_variables():
+    expansion_vars = exp_dict()
+
+    expander = ramble.expander.Expander(expansion_vars, None)
+
+    expander.expand_var("{var1} {n_nodes}")
+    expected = {"var1", "var2", "var3", "n_nodes"}
+    assert expander._used_variables == expected
+
+    expander._used_variables = set()
+    expander.expand_var("{var1} {n_nodes}")
+    assert expander._used_variables == expected
+
+    expander.flush_used_variable_stage()
+    expander.expand_var("{var2}", merge_used_stage=False)
+    assert expander._used_variable_stage == {"var2", "var3"}
+
+
+def test_nondeterministic_expansions_are_not_cached():
+    expander = ramble.expander.Expander(exp_dict(), None)
+
+    expander.expand_var("randint(1, 100)")
+    assert ("randint(1, 100)", True) not in expander._expansion_cache
+
+
+def test_compiled_templates_are_reused():
+    template = ramble.expander.compile_template("{n_nodes}*{processes_per_node}")
+    assert template is ramble.expander.compile_template("{n_nodes}*{processes_per_node}")
+
+    # Two variable nodes, followed by the root node
+    assert len(template.nodes) == 3
+    assert template.nodes[-1][1]
+
+
+def test_variable_scope_copy_on_write():
+    base = {"var1": "{var2}", "var2": "{var3}", "var3": "3"}
+    scope = ramble.expander.VariableScope({}, base)
+
+    scope["var3"] = "5"
+    copy_scope = scope.copy()
+    copy_scope["var2"] = "7"
+
+    assert base == {"var1": "{var2}", "var2": "{var3}", "var3": "3"}
+    assert copy_scope.maps[1] is base
+    assert ramble.expander.Expander(scope, None).expand_var("{var1}") == "5"
+    assert ramble.expander.Expander(copy_scope, None).expand_var("{var1}") == "7"
+
+
+def test_extra_vars_do_not_modify_scope():
+    base = exp_dict()
+    scope = ramble.expander.VariableScope({}, base)
+    expander = ramble.expander.Expander(scope, None)
+
+    assert expander.expand_var("{var1}", extra_vars={"var3": "9"}) == "9"
+    assert "var3" not in scope.maps[0]
+    assert expander.expand_var("{var1}") == "3"
+
+    # Writes to the local layer invalidate cached expansions
+    scope["var3"] = "4"
+    assert expander.expand_var("{var1}") == "4"
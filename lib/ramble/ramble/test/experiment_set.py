@@ -9,9 +9,12 @@
 import os
 import pytest
 
+import ramble.config
 import ramble.workspace
 import ramble.experiment_set
 import ramble.context
+import ramble.expander
+import ramble.filters
 import ramble.renderer
 from ramble.application import ChainCycleDetectedError, InvalidChainError
 from ramble.main import RambleCommand
@@ -95,6 +98,15 @@ def test_vector_experiment_in_set(mutable_mock_workspace_path):
         assert "basic.test_wl.series1_4" in exp_set.experiments.keys()
         assert "basic.test_wl.series1_8" in exp_set.experiments.keys()
 
+        # Experiments only materialize their own variables, on top of shared
+        # template definitions
+        app_inst_4 = exp_set.experiments["basic.test_wl.series1_4"]
+        app_inst_8 = exp_set.experiments["basic.test_wl.series1_8"]
+        assert app_inst_4.variables.maps[1] is app_inst_8.variables.maps[1]
+        assert "exp_var1" not in app_inst_4.variables.maps[0]
+        assert app_inst_4.variables["n_nodes"] == "2"
+        assert app_inst_8.variables["n_nodes"] == "4"
+
 
 def test_vector_length_mismatch_errors(request, mutable_mock_workspace_path, capsys):
     ws_name = request.node.name
@@ -1845,3 +1857,178 @@ def test_custom_executables_track_variables(request, mutable_mock_workspace_path
         app_inst = exp_set.get_experiment("basic.test_wl.test1.chain.0.expanded_foms.test_wl.test")
 
         assert app_inst.variables["my_var"] == "5.0"
+
+
+@pytest.mark.parametrize("render_jobs", [1, 4])
+def test_parallel_render_matches_serial(request, mutable_mock_workspace_path, render_jobs):
+    ws_name = request.node.name.replace("[", "_").replace("]", "")
+    workspace("create", ws_name)
+
+    assert ws_name in workspace("list")
+
+    with ramble.config.override("config:render_jobs", render_jobs):
+        with ramble.workspace.read(ws_name) as ws:
+            exp_set = ramble.experiment_set.ExperimentSet(ws)
+
+            application_context = ramble.context.Context()
+            application_context.context_name = "basic"
+            application_context.variables = {
+                "app_var1": "1",
+                "app_var2": "2",
+                "n_ranks": "{processes_per_node}*{n_nodes}",
+                "mpi_command": "",
+                "batch_submit": "",
+            }
+
+            workload_context = ramble.context.Context()
+            workload_context.context_name = "test_wl"
+            workload_context.variables = {"wl_var1": "1", "wl_var2": "2"}
+
+            experiment_context = ramble.context.Context()
+            experiment_context.context_name = "series1_{n_nodes}_{processes_per_node}"
+            experiment_context.variables = {
+                "other_var": ["1", "2"],
+                "n_nodes": [str(n) for n in range(1, 11)],
+                "processes_per_node": [str(n) for n in range(1, 9)],
+            }
+            experiment_context.matrices = [["n_nodes", "processes_per_node"]]
+
+            exp_set.set_application_context(application_context)
+            exp_set.set_workload_context(workload_context)
+            exp_set.set_experiment_context(experiment_context)
+            exp_set.build_experiment_chains()
+
+            expected = [
+                f"basic.test_wl.series1_{n_nodes}_{ppn}"
+                for n_nodes in range(1, 11)
+                for ppn in range(1, 9)
+            ]
+            assert exp_set.experiment_order == expected
+            assert list(exp_set.experiments.keys()) == expected
+
+
+@pytest.mark.parametrize(
+    "exp_vars,expected",
+    [
+        # Alternate values of a vector reference other vectors
+        (
+            {
+                "n_nodes": ["1", "2"],
+                "sel": ["{a_val}", "{b_val}"],
+                "a_val": "1",
+                "b_val": ["x", "y"],
+            },
+            ["test_1_1", "test_2_y"],
+        ),
+        # Variable names built from the values of vectors
+        (
+            {"n_nodes": ["1", "2"], "sel": "{val_{n_nodes}}", "val_1": "a", "val_2": ["b", "c"]},
+            ["test_1_a", "test_2_c"],
+        ),
+    ],
+)
+def test_used_variables_of_all_vector_values(
+    request, mutable_mock_workspace_path, exp_vars, expected
+):
+    ws_name = request.node.name.replace("[", "_").replace("]", "").replace("-", "_")
+    workspace("create", ws_name)
+
+    assert ws_name in workspace("list")
+
+    with ramble.workspace.read(ws_name) as ws:
+        exp_set = ramble.experiment_set.ExperimentSet(ws)
+
+        application_context = ramble.context.Context()
+        application_context.context_name = "basic"
+        application_context.variables = {
+            "app_var1": "1",
+            "app_var2": "2",
+            "processes_per_node": "1",
+            "mpi_command": "",
+            "batch_submit": "",
+        }
+
+        workload_context = ramble.context.Context()
+        workload_context.context_name = "test_wl"
+        workload_context.variables = {"wl_var1": "1", "wl_var2": "2"}
+
+        experiment_context = ramble.context.Context()
+        experiment_context.context_name = "test_{n_nodes}_{sel}"
+        experiment_context.variables = exp_vars
+
+        exp_set.set_application_context(application_context)
+        exp_set.set_workload_context(workload_context)
+        exp_set.set_experiment_context(experiment_context)
+        exp_set.build_experiment_chains()
+
+        assert exp_set.experiment_order == [f"basic.test_wl.{name}" for name in expected]
+
+
+def test_filtered_experiments_evaluates_each_value_once(
+    request, mutable_mock_workspace_path, monkeypatch
+):
+    ws_name = request.node.name
+    workspace("create", ws_name)
+
+    assert ws_name in workspace("list")
+
+    with ramble.workspace.read(ws_name) as ws:
+        exp_set = ramble.experiment_set.ExperimentSet(ws)
+
+        application_context = ramble.context.Context()
+        application_context.context_name = "basic"
+        application_context.variables = {
+            "n_ranks": "{processes_per_node}*{n_nodes}",
+            "mpi_command": "",
+            "batch_submit": "",
+        }
+
+        workload_context = ramble.context.Context()
+        workload_context.context_name = "test_wl"
+
+        for series, tags in [("series1", ["tag_a"]), ("series2", ["tag_a", "tag_b"])]:
+            experiment_context = ramble.context.Context()
+            experiment_context.context_name = series + "_{n_nodes}_{processes_per_node}"
+            experiment_context.variables = {
+                "n_nodes": [str(n) for n in range(1, 9)],
+                "processes_per_node": ["1", "2"],
+            }
+            experiment_context.matrices = [["n_nodes", "processes_per_node"]]
+            experiment_context.tags = tags
+
+            exp_set.set_application_context(application_context)
+            exp_set.set_workload_context(workload_context)
+            exp_set.set_experiment_context(experiment_context)
+        exp_set.build_experiment_chains()
+
+        evaluated = []
+        evaluate_predicate = ramble.expander.Expander.evaluate_predicate
+
+        def _count_evaluations(self, in_str, *args, **kwargs):
+            evaluated.append(in_str)
+            return evaluate_predicate(self, in_str, *args, **kwargs)
+
+        monkeypatch.setattr(ramble.expander.Expander, "evaluate_predicate", _count_evaluations)
+
+        filters = ramble.filters.Filters(
+            include_where_filters=[["{n_nodes} > 4"]],
+            exclude_where_filters=[["{processes_per_node} == 2"]],
+            tags=[["tag_b"]],
+        )
+        selected = [exp for exp, _, _ in exp_set.filtered_experiments(filters)]
+
+        assert selected == [f"basic.test_wl.series2_{n}_1" for n in range(5, 9)]
+        # Once for each value of n_nodes in series2, then once for each value
+        # of processes_per_node in the remaining experiments
+        assert evaluated.count("{n_nodes} > 4") == 8
+        assert evaluated.count("{processes_per_node} == 2") == 2
+
+        # Results match evaluating every expression for each experiment
+        expected = [
+            exp
+            for exp, inst, _ in exp_set.all_experiments()
+            if inst.has_tags(["tag_b"])
+            and inst.expander.evaluate_predicate("{n_nodes} > 4")
+            and not inst.expander.evaluate_predicate("{processes_per_node} == 2")
+        ]
+        assert selected == expected
@@ -0,0 +1,96 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import pytest
+
+import spack.util.spack_json as sjson
+
+from ramble.job_scheduler import Job, JobScheduler
+
+
+def _overlapping(jobs):
+    """Largest number of jobs which ran at the same time"""
+    events = []
+    for job in jobs:
+        events.append((job.start_time, 1))
+        events.append((job.end_time, -1))
+
+    running = 0
+    most = 0
+    # Ends sort before starts at the same time
+    for _, change in sorted(events):
+        running += change
+        most = max(most, running)
+    return most
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_job_scheduler_limits_running_jobs(jobs):
+    scheduler = JobScheduler(jobs=jobs)
+    for i in range(6):
+        scheduler.add(Job(f"exp{i}", ["sleep", "0.5"]))
+
+    progress = []
+    failed = scheduler.run(progress=lambda job, count: progress.append((job.name, count)))
+
+    assert not failed
+    assert sorted(name for name, _ in progress) == [f"exp{i}" for i in range(6)]
+    assert [count for _, count in progress] == list(range(1, 7))
+    overlapping = _overlapping(scheduler.scheduled)
+    assert overlapping <= jobs
+    if jobs > 1:
+        assert overlapping > 1
+
+
+def test_job_scheduler_limits_slots():
+    scheduler = JobScheduler(jobs=4, slots=4)
+    large = [Job(f"large{i}", ["sleep", "0.5"], slots=3) for i in range(2)]
+    small = Job("small", ["sleep", "0.5"], slots=1)
+    oversized = Job("oversized", ["sleep", "0.1"], slots=8)
+    for job in large + [small, oversized]:
+        scheduler.add(job)
+
+    assert not scheduler.run()
+
+    # Large jobs never run together, and the small job fills the free slot
+    assert _overlapping(large) == 1
+    assert _overlapping([large[0], small]) == 2
+
+    # Jobs needing more slots than are available run on their own
+    others = [job for job in scheduler.scheduled if job is not oversized]
+    for job in others:
+        assert job.end_time <= oversized.start_time or job.start_time >= oversized.end_time
+
+
+def test_job_scheduler_records_jobs(tmpdir):
+    log_path = str(tmpdir.join("exp.out"))
+    with open(log_path, "w") as f:
+        f.write("setup output\n")
+
+    scheduler = JobScheduler(jobs=2)
+    scheduler.add(Job("exp", ["echo", "executed"], log_path=log_path))
+    scheduler.add(Job("failing", ["false"]))
+    scheduler.add(Job("missing", [str(tmpdir.join("no-such-executor"))]))
+
+    failed = scheduler.run()
+    assert [job.name for job in failed] == ["failing", "missing"]
+    assert failed[0].returncode == 1
+    assert failed[1].error is not None
+
+    with open(log_path) as f:
+        assert f.read() == "setup output\nexecuted\n"
+
+    record_path = str(tmpdir.join("jobs.json"))
+    scheduler.write_record(record_path)
+    with open(record_path) as f:
+        record = sjson.load(f)
+
+    exp = record["jobs"][0]
+    assert exp["name"] == "exp"
+    assert exp["returncode"] == 0
+    assert exp["start_time"] <= exp["end_time"]
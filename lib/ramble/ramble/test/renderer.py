@@ -0,0 +1,65 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+"""Perform tests of the Renderer class"""
+
+import itertools
+
+import ramble.renderer
+
+
+def _render_group(variables, zips=None, matrices=None):
+    render_group = ramble.renderer.RenderGroup("experiment", "create")
+    render_group.variables = variables
+    render_group.zips = zips or {}
+    render_group.matrices = matrices or []
+    return render_group
+
+
+def test_matrix_and_vector_order():
+    render_group = _render_group(
+        {
+            "experiment_name": "test_{a}_{b}_{c}_{d}",
+            "a": ["1", "2"],
+            "b": ["x", "y", "z"],
+            "c": ["3", "4"],
+            "d": ["5", "6"],
+        },
+        zips={"cd": ["c", "d"]},
+        matrices=[["a", "cd"]],
+    )
+    render_group.used_variables = {"a", "b", "c", "d"}
+
+    rendered = [
+        (obj["b"], obj["a"], obj["c"], obj["d"])
+        for obj, _ in ramble.renderer.Renderer().render_objects(render_group)
+    ]
+
+    # Remaining vectors are crossed with the matrix, which is ordered like
+    # itertools.product
+    expected = [
+        (b, a, c, d)
+        for b in ["x", "y", "z"]
+        for a, (c, d) in itertools.product(["1", "2"], [("3", "5"), ("4", "6")])
+    ]
+    assert rendered == expected
+
+
+def test_large_matrices_are_rendered_lazily():
+    vector = [str(i) for i in range(1000)]
+    render_group = _render_group(
+        {"experiment_name": "test_{a}_{b}_{c}", "a": vector, "b": vector, "c": vector},
+        matrices=[["a", "b", "c"]],
+    )
+
+    # 10^9 objects could never all be held in memory
+    objects = ramble.renderer.Renderer().render_objects(render_group)
+    first, _ = next(objects)
+    second, _ = next(objects)
+
+    assert (first["a"], first["b"], first["c"]) == ("0", "0", "0")
+    assert (second["a"], second["b"], second["c"]) == ("0", "0", "1")
@@ -6,10 +6,14 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import os
+
 import pytest
 
+import ramble.caches
 import ramble.repository
 import ramble.paths
+import ramble.util.file_cache
 
 
 @pytest.fixture(params=["applications", "", "foo"])
@@ -112,6 +116,114 @@ def test_list_object_files(
         assert actual[i][1].endswith(expected[i][1])
 
 
+metadata_app = """
+from ramble.appkit import *
+
+
+class MetadataApp(ExecutableApplication):
+    \"\"\"An application only used for the metadata index\"\"\"
+
+    name = "metadata-app"
+
+    tags("indexed")
+    maintainers("maintainer-1")
+
+    executable("foo", "echo foo", use_mpi=False)
+{workloads}
+    workload_variable("n_ranks", default="1", description="Number of ranks", workload="wl1")
+"""
+
+
+def _write_metadata_app(repo_dir, workloads, mtime_offset=0):
+    app_file = repo_dir.join("applications", "metadata-app", "application.py")
+    app_file.ensure()
+    workload_defs = "".join(f'    workload("{wl}", executable="foo")\n' for wl in workloads)
+    app_file.write(metadata_app.format(workloads=workload_defs))
+    if mtime_offset:
+        stat_info = os.stat(str(app_file))
+        os.utime(str(app_file), (stat_info.st_atime, stat_info.st_mtime + mtime_offset))
+
+
+def test_repo_metadata_index(tmpdir, monkeypatch):
+    obj_type = ramble.repository.ObjectTypes.applications
+    monkeypatch.setattr(
+        ramble.caches, "misc_cache", ramble.util.file_cache.FileCache(str(tmpdir.join("cache")))
+    )
+
+    repo_dir = tmpdir.join("metadata_repo")
+    repo_dir.join("repo.yaml").write("repo:\n  namespace: metadata_test\n", ensure=True)
+    _write_metadata_app(repo_dir, ["wl1"])
+
+    with ramble.repository.use_repositories(str(repo_dir), object_type=obj_type) as repo_path:
+        metadata = repo_path.get_obj_metadata("metadata-app")
+        app_inst = repo_path.get("metadata-app")
+
+    assert metadata.name == "metadata-app"
+    assert metadata.__doc__ == app_inst.__doc__
+    assert metadata.tags == ["indexed"]
+    assert metadata.maintainers == ["maintainer-1"]
+    assert list(metadata.workloads) == ["wl1"]
+    assert list(metadata.executables) == list(app_inst.executables)
+    # Directive data which JSON cannot represent is stored as it is printed
+    assert metadata.workloads["wl1"] == str(app_inst.workloads["wl1"])
+    assert "n_ranks" in metadata.workloads["wl1"]
+
+    # Objects are not imported when the index is current
+    def _fail_import(self, obj_name):
+        raise AssertionError(f"{obj_name} was imported")
+
+    with monkeypatch.context() as m:
+        m.setattr(ramble.repository.Repo, "_get_obj_module", _fail_import)
+        with ramble.repository.use_repositories(str(repo_dir), object_type=obj_type) as repo_path:
+            assert list(repo_path.get_obj_metadata("metadata-app").workloads) == ["wl1"]
+            assert repo_path.objects_with_tags("indexed") == ["metadata-app"]
+
+            with pytest.raises(ramble.repository.UnknownObjectError):
+                repo_path.get_obj_metadata("missing-app")
+
+    # Changed objects are indexed again
+    _write_metadata_app(repo_dir, ["wl1", "wl2"], mtime_offset=10)
+    with ramble.repository.use_repositories(str(repo_dir), object_type=obj_type) as repo_path:
+        assert list(repo_path.get_obj_metadata("metadata-app").workloads) == ["wl1", "wl2"]
+
+
+broken_app = """
+from ramble.appkit import *
+
+
+class BrokenApp(ExecutableApplication):
+    name = "broken-app"
+
+    def __init__(self, file_path):
+        raise ValueError("broken application")
+"""
+
+
+def test_repo_metadata_index_records_errors(tmpdir, monkeypatch):
+    obj_type = ramble.repository.ObjectTypes.applications
+    repo_dir = tmpdir.join("metadata_repo")
+    repo_dir.join("repo.yaml").write("repo:\n  namespace: metadata_test\n", ensure=True)
+    app_file = repo_dir.join("applications", "broken-app", "application.py")
+    app_file.write(broken_app, ensure=True)
+
+    with ramble.repository.use_repositories(str(repo_dir), object_type=obj_type) as repo_path:
+        index = ramble.repository.MetadataIndex(object_type=obj_type)
+        index.update_object("metadata_test.broken-app")
+        assert "broken application" in index["broken-app"]["error"]
+        assert str(app_file) in index["broken-app"]["sources"]
+
+        # Objects which failed to load are not loaded again until they change
+        assert not index.needs_update("broken-app")
+        stat_info = os.stat(str(app_file))
+        os.utime(str(app_file), (stat_info.st_atime, stat_info.st_mtime + 10))
+        assert index.needs_update("broken-app")
+
+        # Their metadata reports the error
+        monkeypatch.setattr(ramble.repository.Repo, "metadata_index", index)
+        with pytest.raises(ramble.repository.FailedConstructorError):
+            repo_path.get_obj_metadata("broken-app")
+
+
 #
 #
 # def test_repo_anonymous_app(mutable_mock_apps_repo):
@@ -0,0 +1,133 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import os
+
+import pytest
+
+from ramble.results_store import ResultsStore, ResultsStoreError
+
+
+def analysis_results(gflops):
+    """Results of an analysis of two experiments, with the given FOM values"""
+    experiments = []
+    for n_nodes, value in zip(["1", "2"], gflops):
+        experiments.append(
+            {
+                "name": f"app.wl.exp_{n_nodes}",
+                "RAMBLE_STATUS": "SUCCESS",
+                "N_REPEATS": 0,
+                "n_nodes": n_nodes,
+                "RAMBLE_VARIABLES": {"partition": "debug"},
+                "RAMBLE_RAW_VARIABLES": {"partition": "debug"},
+                "CONTEXTS": [
+                    {
+                        "name": "null",
+                        "display_name": "default (null) context",
+                        "foms": [
+                            {
+                                "name": "gflops",
+                                "value": value,
+                                "units": "GFLOP/s",
+                                "origin": "app",
+                                "origin_type": "application",
+                            },
+                            {
+                                "name": "hostname",
+                                "value": f"host{n_nodes}",
+                                "units": "",
+                                "origin": "app",
+                                "origin_type": "application",
+                            },
+                        ],
+                    }
+                ],
+            }
+        )
+    return {"workspace_name": "test", "workspace_hash": "abc", "experiments": experiments}
+
+
+@pytest.fixture
+def store(tmpdir):
+    store = ResultsStore(str(tmpdir.join("results.sqlite")))
+    store.add_analysis(analysis_results(["10", "20"]), timestamp="2024-01-01T00:00:00")
+    store.add_analysis(analysis_results(["30", "40"]), timestamp="2024-01-02T00:00:00")
+    store.add_analysis(analysis_results(["50", "60"]), timestamp="2024-01-03T00:00:00")
+    return store
+
+
+def test_results_store_lists_foms(store):
+    columns, rows = store.query(foms=["gflops"], where={"n_nodes": "2"}, last=2)
+    assert columns == ["analysis", "timestamp", "experiment", "context", "fom", "value", "units"]
+    assert rows == [
+        (2, "2024-01-02T00:00:00", "app.wl.exp_2", "null", "gflops", "40", "GFLOP/s"),
+        (3, "2024-01-03T00:00:00", "app.wl.exp_2", "null", "gflops", "60", "GFLOP/s"),
+    ]
+
+    _, rows = store.query(foms=["hostname"], where={"partition": "debug", "status": "SUCCESS"})
+    assert [row[5] for row in rows] == ["host1", "host2"] * 3
+
+
+def test_results_store_aggregates_foms(store):
+    columns, rows = store.query(group_by=["n_nodes"], aggregate="mean", last=2)
+    assert columns == ["n_nodes", "fom", "mean", "units"]
+    # Only numeric figures of merit are aggregated
+    assert rows == [("1", "gflops", 40.0, "GFLOP/s"), ("2", "gflops", 50.0, "GFLOP/s")]
+
+    _, rows = store.query(foms=["gflops"], group_by=["analysis"], aggregate="max")
+    assert [row[2] for row in rows] == [20.0, 40.0, 60.0]
+
+    with pytest.raises(ResultsStoreError, match="Unknown aggregation"):
+        store.query(aggregate="median")
+
+
+def test_results_store_groups_units(store):
+    results = analysis_results(["1000", "2000"])
+    for exp in results["experiments"]:
+        exp["CONTEXTS"][0]["foms"][0]["units"] = "MFLOP/s"
+    store.add_analysis(results, timestamp="2024-01-04T00:00:00")
+
+    # Values with different units are aggregated separately
+    _, rows = store.query(foms=["gflops"], group_by=["n_nodes"], aggregate="max")
+    assert rows == [
+        ("1", "gflops", 50.0, "GFLOP/s"),
+        ("1", "gflops", 1000.0, "MFLOP/s"),
+        ("2", "gflops", 60.0, "GFLOP/s"),
+        ("2", "gflops", 2000.0, "MFLOP/s"),
+    ]
+
+
+def test_results_store_query_is_read_only(tmpdir):
+    path = str(tmpdir.join("missing.sqlite"))
+    assert ResultsStore(path).query() == (
+        ["analysis", "timestamp", "experiment", "context", "fom", "value", "units"],
+        [],
+    )
+    assert not os.path.exists(path)
+
+    path = str(tmpdir.join("invalid.sqlite"))
+    with open(path, "w") as f:
+        f.write("not a database")
+    with pytest.raises(ResultsStoreError, match="Unable to query"):
+        ResultsStore(path).query()
+
+
+def test_results_store_identifies_analyses(tmpdir):
+    store = ResultsStore(str(tmpdir.join("results.sqlite")))
+    # Analyses finishing within the same second are kept apart
+    for gflops in [["10", "20"], ["30", "40"]]:
+        store.add_analysis(analysis_results(gflops), timestamp="2024-01-01T00:00:00")
+
+    _, rows = store.query(foms=["gflops"], group_by=["analysis"], aggregate="max")
+    assert rows == [(1, "gflops", 20.0, "GFLOP/s"), (2, "gflops", 40.0, "GFLOP/s")]
+
+    _, rows = store.query(foms=["gflops"], where={"analysis": "2"})
+    assert [row[5] for row in rows] == ["30", "40"]
+
+    _, rows = store.query(foms=["gflops"], group_by=["timestamp"], aggregate="count")
+    assert rows == [("2024-01-01T00:00:00", "gflops", 4, "GFLOP/s")]
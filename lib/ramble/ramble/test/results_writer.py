@@ -0,0 +1,68 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import io
+import json
+
+import pytest
+
+import spack.util.spack_yaml as syaml
+
+import ramble.results_writer
+from ramble.results_writer import shared_raw_variables, without_raw_variables
+
+
+def experiment_results(num_experiments):
+    return [
+        {
+            "name": f"app.wl.exp_{idx}",
+            "RAMBLE_STATUS": "SUCCESS",
+            "n_nodes": str(idx),
+            "RAMBLE_RAW_VARIABLES": {"partition": "debug", "n_nodes": str(idx)},
+            "CONTEXTS": [{"name": "null", "foms": [{"name": "gflops", "value": str(idx)}]}],
+        }
+        for idx in range(num_experiments)
+    ]
+
+
+def _load(output_format, text):
+    if output_format == "json":
+        return json.loads(text)
+    if output_format == "jsonl":
+        lines = [json.loads(line) for line in text.splitlines()]
+        return dict(lines[0], experiments=lines[1:])
+    return syaml.load(text)
+
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl", "yaml"])
+@pytest.mark.parametrize("num_experiments", [0, 1, 3, 130])
+def test_results_writers_round_trip(output_format, num_experiments):
+    header = {"workspace_name": "test", "workspace_hash": "abc"}
+    experiments = experiment_results(num_experiments)
+
+    stream = io.StringIO()
+    with ramble.results_writer.writers[output_format](stream, header) as writer:
+        for result in experiments:
+            writer.write(result)
+
+    assert writer.num_written == num_experiments
+    assert _load(output_format, stream.getvalue()) == dict(header, experiments=experiments)
+
+
+def test_raw_variables_dedupe_and_drop():
+    experiments = experiment_results(3)
+
+    shared = shared_raw_variables(experiments)
+    assert shared == {"partition": "debug"}
+
+    deduped = without_raw_variables(experiments[1], shared)
+    assert deduped["RAMBLE_RAW_VARIABLES"] == {"n_nodes": "1"}
+    assert "RAMBLE_RAW_VARIABLES" not in without_raw_variables(experiments[1], None)
+
+    # Results are copied, rather than modified
+    assert experiments[1]["RAMBLE_RAW_VARIABLES"] == {"partition": "debug", "n_nodes": "1"}
@@ -6,6 +6,7 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import ramble.analysis_plan
 import ramble.success_criteria
 
 
@@ -91,3 +92,16 @@ def test_criteria_list(tmpdir):
     remark_all(list(criteria_list.all_criteria()), log_path)
 
     assert not criteria_list.passed()
+
+
+def test_criteria_share_compiled_regexes():
+    crit_list = ramble.success_criteria.ScopedCriteriaList()
+    crit_list.add_criteria("experiment", "first", mode="string", match=r".*Success.*")
+    first = crit_list.find_criteria("first")
+
+    crit_list.flush_scope("experiment")
+    crit_list.add_criteria("experiment", "second", mode="string", match=r".*Success.*")
+
+    second = crit_list.find_criteria("second")
+    assert second.match is first.match
+    assert second.match is ramble.analysis_plan.compile_regex(r".*Success.*")
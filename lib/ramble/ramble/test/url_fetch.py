@@ -0,0 +1,97 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import functools
+import hashlib
+import http.server
+import os
+import threading
+
+import pytest
+
+import spack.util.crypto
+
+import ramble.config
+import ramble.util.hashing
+from ramble.fetch_strategy import ChecksumError, URLFetchStrategy
+from ramble.stage import InputStage
+
+archive_contents = b"streamed archive contents\n" * 8192
+
+
+@pytest.fixture
+def archive_dir(tmpdir):
+    archive_dir = tmpdir.join("archives")
+    archive_dir.ensure(dir=True)
+    with open(archive_dir.join("input.tar.gz"), "wb") as f:
+        f.write(archive_contents)
+    return str(archive_dir)
+
+
+@pytest.fixture
+def archive_server(archive_dir):
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=archive_dir)
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_rehashing(monkeypatch):
+    """Fail if an archive is read again to verify its checksum"""
+
+    def _rehash(*args, **kwargs):
+        raise AssertionError("The archive was read again to verify its checksum")
+
+    monkeypatch.setattr(ramble.util.hashing, "hash_file", _rehash)
+    monkeypatch.setattr(spack.util.crypto.Checker, "check", _rehash)
+
+
+def _fetch(url, digest, stage_path):
+    fetcher = URLFetchStrategy(url, digest)
+    with ramble.config.override("config:url_fetch_method", "urllib"):
+        with InputStage(fetcher, name="url_fetch_test", path=stage_path) as stage:
+            stage.fetch()
+            assert not os.path.exists(stage.save_filename + ".part")
+            with open(fetcher.archive_file, "rb") as f:
+                assert f.read() == archive_contents
+            fetcher.check()
+
+
+@pytest.mark.parametrize("scheme", ["file", "http"])
+def test_urllib_fetch_verifies_checksum_while_streaming(
+    tmpdir, archive_dir, archive_server, no_rehashing, scheme
+):
+    if scheme == "file":
+        url = f"file://{archive_dir}/input.tar.gz"
+    else:
+        url = f"{archive_server}/input.tar.gz"
+
+    _fetch(url, hashlib.sha256(archive_contents).hexdigest(), str(tmpdir.join("stage")))
+
+
+def test_urllib_fetch_detects_checksum_mismatch(tmpdir, archive_server, no_rehashing):
+    with pytest.raises(ChecksumError):
+        _fetch(
+            f"{archive_server}/input.tar.gz",
+            hashlib.sha256(b"other contents").hexdigest(),
+            str(tmpdir.join("stage")),
+        )
+
+
+def test_urllib_fetch_copies_local_files_without_checksum(tmpdir, archive_dir):
+    fetcher = URLFetchStrategy(f"file://{archive_dir}/input.tar.gz")
+    with ramble.config.override("config:url_fetch_method", "urllib"):
+        with InputStage(fetcher, name="url_fetch_test", path=str(tmpdir.join("stage"))):
+            fetcher.fetch()
+            with open(fetcher.archive_file, "rb") as f:
+                assert f.read() == archive_contents
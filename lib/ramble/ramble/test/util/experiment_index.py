@@ -0,0 +1,99 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import ramble.util.experiment_index
+from ramble.util.experiment_index import ExperimentIndex
+
+
+def _num_lines(path):
+    with open(path) as f:
+        return len(f.readlines())
+
+
+def test_experiment_index_records(tmpdir):
+    path = str(tmpdir.join("internal", "experiment_index.jsonl"))
+    index = ExperimentIndex(path)
+    assert index.get("experiments/app/wl/exp1", "status") is None
+
+    index.update("experiments/app/wl/exp1", "status", {"experiment_status": "SETUP"})
+    index.update("experiments/app/wl/exp1", "inventory", {"inputs": [{"digest": "abc"}]})
+    # Unchanged values are not appended again
+    index.update("experiments/app/wl/exp1", "status", {"experiment_status": "SETUP"})
+    assert _num_lines(path) == 2
+
+    status = index.get("experiments/app/wl/exp1", "status")
+    assert status == {"experiment_status": "SETUP"}
+    # Values are copies, which can be modified
+    status["experiment_status"] = "FAILED"
+    assert index.get("experiments/app/wl/exp1", "status") == {"experiment_status": "SETUP"}
+
+    # Later values, including those appended by other instances, replace earlier ones
+    other = ExperimentIndex(path)
+    assert other.get("experiments/app/wl/exp1", "inventory") == {"inputs": [{"digest": "abc"}]}
+    other.update("experiments/app/wl/exp1", "status", {"experiment_status": "SUCCESS"})
+    index.update("experiments/app/wl/exp2", "status", {"experiment_status": "SETUP"})
+    assert index.get("experiments/app/wl/exp1", "status") == {"experiment_status": "SUCCESS"}
+
+    # An incomplete line from an interrupted writer is ignored
+    with open(path, "a") as f:
+        f.write('{"key":"experiments/app/wl/exp3","na')
+    index.update("experiments/app/wl/exp3", "status", {"experiment_status": "SETUP"})
+
+    new_index = ExperimentIndex(path)
+    assert new_index.get("experiments/app/wl/exp2", "status") == {"experiment_status": "SETUP"}
+    assert new_index.get("experiments/app/wl/exp3", "status") == {"experiment_status": "SETUP"}
+
+
+def test_experiment_index_compaction(tmpdir, monkeypatch):
+    monkeypatch.setattr(ramble.util.experiment_index, "_min_compact_lines", 4)
+    path = str(tmpdir.join("experiment_index.jsonl"))
+    index = ExperimentIndex(path)
+
+    for i in range(10):
+        index.update("exp1", "status", {"experiment_status": f"STATUS{i}"})
+        index.update("exp2", "status", {"experiment_status": "SETUP"})
+
+    assert _num_lines(path) <= 4
+
+    new_index = ExperimentIndex(path)
+    assert new_index.get("exp1", "status") == {"experiment_status": "STATUS9"}
+    assert new_index.get("exp2", "status") == {"experiment_status": "SETUP"}
+
+    # Instances which read the file before it was compacted see later updates
+    new_index.update("exp2", "status", {"experiment_status": "SUCCESS"})
+    for i in range(3):
+        index.update("exp1", "status", {"experiment_status": f"RERUN{i}"})
+    assert index.get("exp2", "status") == {"experiment_status": "SUCCESS"}
+    assert ExperimentIndex(path).get("exp1", "status") == {"experiment_status": "RERUN2"}
+
+
+def test_experiment_index_buffered_updates(tmpdir):
+    path = str(tmpdir.join("experiment_index.jsonl"))
+    index = ExperimentIndex(path)
+
+    with index.buffered():
+        with index.buffered():
+            for i in range(3):
+                index.update(f"exp{i}", "status", {"experiment_status": "SETUP"})
+        index.update("exp0", "status", {"experiment_status": "SUCCESS"})
+
+        # Buffered values are visible to this instance, but not written yet
+        assert index.get("exp0", "status") == {"experiment_status": "SUCCESS"}
+        assert ExperimentIndex(path).get("exp1", "status") is None
+
+    assert _num_lines(path) == 3
+    new_index = ExperimentIndex(path)
+    assert new_index.get("exp0", "status") == {"experiment_status": "SUCCESS"}
+    assert new_index.get("exp2", "status") == {"experiment_status": "SETUP"}
+
+    # Updates already in the file, such as those from another instance, are not repeated
+    new_index.update("exp1", "status", {"experiment_status": "FAILED"})
+    with index.buffered():
+        index.update("exp1", "status", {"experiment_status": "FAILED"})
+        index.update("exp2", "status", {"experiment_status": "SETUP"})
+    assert _num_lines(path) == 4
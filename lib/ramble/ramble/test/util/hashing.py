@@ -0,0 +1,105 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import hashlib
+import os
+
+import ramble.util.file_cache
+import ramble.util.hashing
+
+
+def test_hash_file_contents_in_blocks(tmpdir):
+    contents = os.urandom(10000)
+    file_path = os.path.join(tmpdir, "data.bin")
+    with open(file_path, "wb") as f:
+        f.write(contents)
+
+    expected = hashlib.sha256(contents).hexdigest()
+    assert ramble.util.hashing.hash_file_contents(file_path, block_size=1000) == expected
+    assert ramble.util.hashing.hash_file(file_path) == expected
+
+
+def test_file_hash_cache(tmpdir, monkeypatch):
+    file_cache = ramble.util.file_cache.FileCache(os.path.join(tmpdir, "cache"))
+    file_path = os.path.join(tmpdir, "data.txt")
+    with open(file_path, "w") as f:
+        f.write("first")
+
+    hash_cache = ramble.util.hashing.FileHashCache(file_cache)
+    first_digest = hash_cache.digest(file_path)
+    assert first_digest == hashlib.sha256(b"first").hexdigest()
+
+    # Unchanged files are never read again, even from a new cache instance
+    def fail_hash(*args, **kwargs):
+        raise AssertionError("unchanged file was hashed again")
+
+    monkeypatch.setattr(ramble.util.hashing, "hash_file_contents", fail_hash)
+    assert hash_cache.digest(file_path) == first_digest
+    assert ramble.util.hashing.FileHashCache(file_cache).digest(file_path) == first_digest
+    monkeypatch.undo()
+
+    # Modified files are hashed again
+    with open(file_path, "w") as f:
+        f.write("second file")
+
+    new_cache = ramble.util.hashing.FileHashCache(file_cache)
+    assert new_cache.digest(file_path) == hashlib.sha256(b"second file").hexdigest()
+
+
+def test_file_hash_cache_buffered(tmpdir, monkeypatch):
+    file_cache = ramble.util.file_cache.FileCache(os.path.join(tmpdir, "cache"))
+    paths = []
+    for idx in range(10):
+        paths.append(os.path.join(tmpdir, f"data_{idx}.txt"))
+        with open(paths[-1], "w") as f:
+            f.write(str(idx))
+
+    writes = []
+    write_transaction = file_cache.write_transaction
+
+    def count_writes(key):
+        writes.append(key)
+        return write_transaction(key)
+
+    monkeypatch.setattr(file_cache, "write_transaction", count_writes)
+
+    hash_cache = ramble.util.hashing.FileHashCache(file_cache)
+    with hash_cache.buffered():
+        with hash_cache.buffered():
+            digests = [hash_cache.digest(path) for path in paths]
+        # Digests are only written when the outermost block exits
+        assert writes == []
+        assert hash_cache.digest(paths[0]) == digests[0]
+    assert len(writes) == 1
+
+    new_cache = ramble.util.hashing.FileHashCache(file_cache)
+    assert [new_cache.digest(path) for path in paths] == digests
+    assert len(writes) == 1
+
+
+def test_file_hash_cache_compaction(tmpdir, monkeypatch):
+    monkeypatch.setattr(ramble.util.hashing, "_min_compact_entries", 4)
+    file_cache = ramble.util.file_cache.FileCache(os.path.join(tmpdir, "cache"))
+    hash_cache = ramble.util.hashing.FileHashCache(file_cache)
+
+    def hash_new_file(name):
+        path = os.path.join(tmpdir, name)
+        with open(path, "w") as f:
+            f.write(name)
+        hash_cache.digest(path)
+        return path
+
+    removed = [hash_new_file(f"removed_{idx}") for idx in range(3)]
+    for path in removed:
+        os.remove(path)
+
+    # Entries of removed files are kept until the cache grows enough
+    hash_new_file("kept_0")
+    assert len(hash_cache._read()) == 4
+    hash_new_file("kept_1")
+    assert sorted(os.path.basename(path) for path in hash_cache._read()) == ["kept_0", "kept_1"]
@@ -0,0 +1,31 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import ramble.util.file_cache
+import ramble.util.install_cache
+
+
+def test_persistent_set_cache(tmpdir):
+    file_cache = ramble.util.file_cache.FileCache(str(tmpdir.join("cache")))
+    install_cache = ramble.util.install_cache.PersistentSetCache(file_cache)
+
+    entry = ("spack-install", "/path/to/env", "abc123")
+    assert not install_cache.contains(entry)
+
+    install_cache.add(entry)
+    assert install_cache.contains(entry)
+
+    # Entries are visible to later invocations, and merged with their entries
+    other_cache = ramble.util.install_cache.PersistentSetCache(file_cache)
+    assert other_cache.contains(entry)
+    other_cache.add(("input-file", "def456", "/path/to/input"))
+
+    new_cache = ramble.util.install_cache.PersistentSetCache(file_cache)
+    assert new_cache.contains(entry)
+    assert new_cache.contains(("input-file", "def456", "/path/to/input"))
+    assert not new_cache.contains(("spack-install", "/path/to/env", "changed"))
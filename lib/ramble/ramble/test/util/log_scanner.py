@@ -0,0 +1,72 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+import os
+import re
+
+import pytest
+
+import ramble.util.log_scanner as log_scanner
+
+
+@pytest.mark.parametrize(
+    "pattern,literal",
+    [
+        (r"Performance:\s+(?P<perf>[0-9\.]+)", "Performance:"),
+        (r"\s*Step\s+(?P<step>\d+) done", " done"),
+        (r"(?P<name>Time) elapsed", "Time elapsed"),
+        (r".*(error|warning)", None),
+        (r"(?i)Kernel time", None),
+        (r"", None),
+    ],
+)
+def test_required_literal(pattern, literal):
+    assert log_scanner.required_literal(re.compile(pattern)) == literal
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        [r"\s*Step\s+(?P<step>\d+)", r"Total time: (?P<t>[0-9\.]+)"],
+        [r"Total time: (?P<t>[0-9\.]+)", r".*Step"],
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [7, 64, None])
+def test_log_scanner_candidate_lines(tmpdir, patterns, chunk_size):
+    log_lines = []
+    for i in range(200):
+        log_lines.append(f"Step {i}\n" if i % 3 == 0 else f"noise line {i}\n")
+    log_lines.append("Total time: 3.5\n")
+    log_lines.append("  Step 200 (no newline)")
+
+    log_path = os.path.join(tmpdir, "out.log")
+    with open(log_path, "w") as f:
+        f.write("".join(log_lines))
+
+    regexes = [re.compile(p) for p in patterns]
+    scanner = log_scanner.LogScanner(regexes, chunk_size=chunk_size)
+    with open(log_path) as f:
+        candidates = list(scanner.lines(f))
+
+    # Every matching line is yielded, in order, and unchanged
+    expected = [line for line in log_lines if any(r.match(line) for r in regexes)]
+    assert [line for line in candidates if any(r.match(line) for r in regexes)] == expected
+
+    if scanner.prefilter is not None:
+        assert len(candidates) < len(log_lines)
+    else:
+        assert candidates == log_lines
+
+
+def test_prefilter_is_shared():
+    regexes = [re.compile(r"Performance:\s+(?P<perf>[0-9\.]+)"), re.compile(r"Step \d+")]
+
+    first = log_scanner.LogScanner(regexes)
+    second = log_scanner.LogScanner(list(regexes))
+    assert first.prefilter is not None
+    assert first.prefilter is second.prefilter
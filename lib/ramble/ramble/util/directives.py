@@ -6,6 +6,8 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import weakref
+
 
 def define_directive_methods(obj_inst):
     """Create class methods that execute directives
@@ -55,9 +57,15 @@ def wrap_named_directive(obj_inst, name):
 
     Create a wrapper method that executes a directive, to inject the
     `(self)` argument to simplify use of directives as class methods
+
+    The wrapper only holds a weak reference to the instance, so storing it on
+    the instance does not create a reference cycle, and instances are freed
+    as soon as they are no longer used.
     """
+    obj_ref = weakref.ref(obj_inst)
 
     def _execute_directive(*args, directive_name=name, **kwargs):
-        obj_inst._directive_functions[directive_name](*args, **kwargs)(obj_inst)
+        obj = obj_ref()
+        obj._directive_functions[directive_name](*args, **kwargs)(obj)
 
     return _execute_directive
@@ -0,0 +1,196 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Workspace-wide index of per-experiment records
+
+Each experiment keeps its status, inventory and analysis records in files
+within its run directory. Reading these when building the experiment set
+opens (and locks) several small files per experiment. The ExperimentIndex
+stores the same records in a single append-only file, which is read in one
+pass. The per-experiment files are still written, for compatibility with
+tools (and older versions of ramble) which read them.
+
+Each line of the index file is a JSON object with the key of an experiment,
+the name of a record, and its value. Later lines replace earlier values of
+the same record. The file is compacted when it holds many replaced values.
+
+Updates made within ``ExperimentIndex.buffered()`` are collected, and appended
+together under a single lock when the outermost buffered block exits.
+"""
+
+import contextlib
+import json
+import os
+
+import ramble.util.lock as lk
+
+#: Lines of the index file are only compacted when there are more than this
+#: many, and more than twice as many as there are current records
+_min_compact_lines = 1024
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _line(key, name, encoded):
+    """Line of the index file storing the encoded value of a record"""
+    return f'{{"key":{_encode(key)},"name":{_encode(name)},"value":{encoded}}}\n'
+
+
+class ExperimentIndex:
+    """Records of experiments, stored in a single append-only file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = lk.Lock(path + ".lock")
+        # Encoded value of each record, keyed by experiment key and record name
+        self._records = None
+        self._num_records = 0
+        self._num_lines = 0
+        self._size = 0
+        self._ino = None
+        # Encoded values of updated records not yet written, keyed by (key, name)
+        self._pending = {}
+        self._buffer_depth = 0
+
+    def _set_record(self, key, name, encoded):
+        exp_records = self._records.setdefault(key, {})
+        if name not in exp_records:
+            self._num_records += 1
+        exp_records[name] = encoded
+
+    def _read_new_lines(self):
+        """Read lines other processes appended since the index was last read"""
+        try:
+            with open(self.path, "rb") as f:
+                ino = os.fstat(f.fileno()).st_ino
+                if ino != self._ino:
+                    # The file was compacted (or created) by another process
+                    self._records.clear()
+                    self._num_records = 0
+                    self._num_lines = 0
+                    self._size = 0
+                    self._ino = ino
+                f.seek(self._size)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # An incomplete last line is read again once it is complete
+        complete = data[: data.rfind(b"\n") + 1]
+        self._size += len(complete)
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+                key, name, value = entry["key"], entry["name"], entry["value"]
+            except (ValueError, TypeError, KeyError):
+                continue
+            self._set_record(key, name, _encode(value))
+            self._num_lines += 1
+
+    def _read(self):
+        if self._records is None:
+            self._records = {}
+            if os.path.exists(self.path):
+                with lk.ReadTransaction(self._lock):
+                    self._read_new_lines()
+        return self._records
+
+    def get(self, key, name):
+        """Value of a record of an experiment
+
+        Args:
+            key (str): Key of the experiment
+            name (str): Name of the record
+
+        Returns:
+            The value of the record, or None if the index does not contain it
+        """
+        if (key, name) in self._pending:
+            encoded = self._pending[(key, name)]
+        else:
+            encoded = self._read().get(key, {}).get(name)
+        if encoded is None:
+            return None
+        return json.loads(encoded)
+
+    def update(self, key, name, value):
+        """Store the value of a record of an experiment
+
+        Within buffered(), the value is written when the buffer is flushed.
+        Nothing is written when the index already contains the same value.
+        """
+        self._read()
+        self._pending[(key, name)] = _encode(value)
+
+        if not self._buffer_depth:
+            self.flush()
+
+    @contextlib.contextmanager
+    def buffered(self):
+        """Collect updates, and write them together when the block exits"""
+        self._buffer_depth += 1
+        try:
+            yield self
+        finally:
+            self._buffer_depth -= 1
+            if not self._buffer_depth:
+                self.flush()
+
+    def flush(self):
+        """Append every pending update to the index file, under one lock"""
+        if not self._pending:
+            return
+
+        pending = self._pending
+        self._pending = {}
+
+        index_dir = os.path.dirname(self.path)
+        if not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+
+        with lk.WriteTransaction(self._lock):
+            self._read_new_lines()
+
+            lines = []
+            for (key, name), encoded in pending.items():
+                if self._records.get(key, {}).get(name) != encoded:
+                    lines.append(_line(key, name, encoded))
+                self._set_record(key, name, encoded)
+            if not lines:
+                return
+
+            with open(self.path, "ab") as f:
+                # Terminate an incomplete line left by an interrupted writer
+                if f.tell() != self._size:
+                    lines[0] = "\n" + lines[0]
+                f.write("".join(lines).encode())
+                self._ino = os.fstat(f.fileno()).st_ino
+                self._size = f.tell()
+            self._num_lines += len(lines)
+
+            if self._num_lines > max(_min_compact_lines, 2 * self._num_records):
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the index file with only the current value of each record"""
+        tmp_path = f"{self.path}.tmp"
+        size = 0
+        num_lines = 0
+        with open(tmp_path, "w") as f:
+            for key, exp_records in self._records.items():
+                for name, encoded in exp_records.items():
+                    line = _line(key, name, encoded)
+                    f.write(line)
+                    size += len(line.encode())
+                    num_lines += 1
+        os.replace(tmp_path, self.path)
+        self._ino = os.stat(self.path).st_ino
+        self._size = size
+        self._num_lines = num_lines
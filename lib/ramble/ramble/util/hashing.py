@@ -6,17 +6,46 @@
 # option. This file may not be copied, modified, or distributed
 # except according to those terms.
 
+import contextlib
+import os
 import json
 import hashlib
 import spack.util.spack_json as sjson
 
+import ramble.caches
 
-def hash_file(file_path):
-    file_hash = None
+#: Number of bytes read at a time while hashing files
+hash_block_size = 2**20
+
+#: Entries of the file hash cache are only compacted when there are more than
+#: this many, and more than twice as many as after the last compaction
+_min_compact_entries = 1024
+
+
+def hash_file_contents(file_path, block_size=hash_block_size):
+    """Compute the sha256 of a file, streaming its contents in blocks
+
+    Args:
+        file_path (str): Path to the file to hash
+        block_size (int): Number of bytes to read at a time
+
+    Returns:
+        (str): Hex digest of the file contents
+    """
+    hasher = hashlib.sha256()
     with open(file_path, "rb") as f:
-        bytes = f.read()
-        file_hash = hashlib.sha256(bytes).hexdigest()
-    return file_hash
+        for block in iter(lambda: f.read(block_size), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def hash_file(file_path):
+    """Compute the sha256 of a file
+
+    Digests are stored in the persistent file hash cache, so unchanged files
+    are not read again.
+    """
+    return ramble.caches.file_hash_cache.digest(file_path)
 
 
 def hash_string(string):
@@ -30,3 +59,104 @@ def hash_json(in_json):
     json_data = json.dumps(data, **_json_dump_args)
 
     return hashlib.sha256(json_data.encode("UTF-8")).hexdigest()
+
+
+class FileHashCache:
+    """Persistent cache of file digests
+
+    Digests are stored in a single entry of a FileCache (i.e. misc_cache),
+    keyed by absolute path. An entry is only valid while the size,
+    modification time (in nanoseconds), and inode of the file are the same as
+    when it was hashed.
+
+    Digests computed within ``buffered()`` are kept in memory, and written
+    together under a single lock when the outermost buffered block exits.
+    Entries of files which no longer exist are dropped when the cache has
+    grown to twice its size after the last compaction.
+    """
+
+    def __init__(self, file_cache, key="hashes/file-hashes.json"):
+        self._file_cache = file_cache
+        self._key = key
+        self._entries = None
+        # Entries not yet written, keyed by absolute path
+        self._pending = {}
+        self._buffer_depth = 0
+
+    @staticmethod
+    def fingerprint(stat_info):
+        """Identity of a version of a file, from its os.stat result"""
+        return [stat_info.st_size, stat_info.st_mtime_ns, stat_info.st_ino]
+
+    @staticmethod
+    def _load(f):
+        """Read the entries, and their number after the last compaction"""
+        try:
+            data = sjson.load(f)
+        except (ValueError, sjson.SpackJSONError):
+            return {}, 0
+        if not isinstance(data, dict) or not isinstance(data.get("entries"), dict):
+            return {}, 0
+        return data["entries"], data.get("compacted_size", 0)
+
+    def _read(self):
+        if self._entries is None:
+            self._entries = {}
+            if self._file_cache.init_entry(self._key):
+                with self._file_cache.read_transaction(self._key) as f:
+                    self._entries, _ = self._load(f)
+        return self._entries
+
+    @contextlib.contextmanager
+    def buffered(self):
+        """Collect new digests, and write them together when the block exits"""
+        self._buffer_depth += 1
+        try:
+            yield self
+        finally:
+            self._buffer_depth -= 1
+            if not self._buffer_depth:
+                self.flush()
+
+    def flush(self):
+        """Write every pending entry to the cache, under one lock"""
+        if not self._pending:
+            return
+
+        pending = self._pending
+        self._pending = {}
+
+        self._file_cache.init_entry(self._key)
+        with self._file_cache.write_transaction(self._key) as (old, new):
+            entries, compacted_size = self._load(old) if old else ({}, 0)
+            entries.update(pending)
+
+            if len(entries) > max(_min_compact_entries, 2 * compacted_size):
+                # Drop entries for files which no longer exist
+                entries = {path: entry for path, entry in entries.items() if os.path.exists(path)}
+                compacted_size = len(entries)
+
+            sjson.dump({"compacted_size": compacted_size, "entries": entries}, new)
+        self._entries = entries
+
+    def digest(self, file_path):
+        """Return the sha256 of a file, hashing it only if it changed
+
+        Args:
+            file_path (str): Path to the file to hash
+
+        Returns:
+            (str): Hex digest of the file contents
+        """
+        path = os.path.abspath(file_path)
+        fingerprint = self.fingerprint(os.stat(path))
+
+        entry = self._pending.get(path) or self._read().get(path)
+        if entry and entry.get("fingerprint") == fingerprint:
+            return entry["sha256"]
+
+        digest = hash_file_contents(path)
+        self._pending[path] = {"fingerprint": fingerprint, "sha256": digest}
+        if not self._buffer_depth:
+            self.flush()
+        return digest
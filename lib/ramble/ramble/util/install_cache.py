@@ -8,6 +8,8 @@
 
 """Provide data structures to assist with caching operations"""
 
+import spack.util.spack_json as sjson
+
 
 class SetCache:
     def __init__(self):
@@ -18,3 +20,47 @@ class SetCache:
 
     def contains(self, tupl):
         return tupl in self.store
+
+
+class PersistentSetCache:
+    """A SetCache which persists across ramble invocations
+
+    Entries are stored in a single entry of a FileCache, so they are shared
+    between (and protected by a lock across) concurrent ramble processes.
+    Entries should be keyed by content fingerprints, so they become unused
+    (instead of invalid) when the cached content changes.
+    """
+
+    def __init__(self, file_cache, key="install-cache.json"):
+        self._file_cache = file_cache
+        self._key = key
+        self._store = None
+
+    @staticmethod
+    def _load(f):
+        try:
+            entries = sjson.load(f)
+        except (ValueError, sjson.SpackJSONError):
+            return set()
+        if not isinstance(entries, list):
+            return set()
+        return set(tuple(entry) for entry in entries if isinstance(entry, list))
+
+    def _read(self):
+        if self._store is None:
+            self._store = set()
+            if self._file_cache.init_entry(self._key):
+                with self._file_cache.read_transaction(self._key) as f:
+                    self._store = self._load(f)
+        return self._store
+
+    def add(self, tupl):
+        self._file_cache.init_entry(self._key)
+        with self._file_cache.write_transaction(self._key) as (old, new):
+            store = self._load(old) if old else set()
+            store.add(tuple(tupl))
+            sjson.dump(sorted(list(entry) for entry in store), new)
+        self._store = store
+
+    def contains(self, tupl):
+        return tuple(tupl) in self._read()
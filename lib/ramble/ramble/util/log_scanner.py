@@ -0,0 +1,154 @@
+# Copyright 2022-2024 The Ramble Authors
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE-APACHE or
+# https://www.apache.org/licenses/LICENSE-2.0> or the MIT license
+# <LICENSE-MIT or https://opensource.org/licenses/MIT>, at your
+# option. This file may not be copied, modified, or distributed
+# except according to those terms.
+
+"""Streaming scanner for extracting lines of interest from log files
+
+Analysis applies a set of regular expressions (success criteria, FOM
+contexts, and FOMs) to every line of a log file using ``re.match``. Most
+lines of large logs match none of them. The ``LogScanner`` computes a
+literal string every regular expression requires, and only yields lines
+containing at least one of these literals. The search for literals is
+performed over large chunks of the file at once, so lines which cannot match
+are skipped without being handled individually.
+"""
+
+import functools
+import re
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+#: Number of characters read at a time while scanning a file
+scan_chunk_size = 2**22
+
+_break = object()
+
+
+def _literal_tokens(parsed, ignore_case):
+    """Yield literal characters of a parsed pattern, or _break between runs"""
+    for op, av in parsed:
+        if op is sre_parse.LITERAL and not ignore_case:
+            yield chr(av)
+        elif op is sre_parse.SUBPATTERN:
+            add_flags, del_flags, sub_pattern = av[-3], av[-2], av[-1]
+            sub_ignore_case = (ignore_case or add_flags & re.IGNORECASE) and not (
+                del_flags & re.IGNORECASE
+            )
+            yield from _literal_tokens(sub_pattern, sub_ignore_case)
+        else:
+            yield _break
+
+
+def required_literal(regex):
+    """Find the longest literal string any match of a regular expression contains
+
+    Only literals in the top level sequence of the pattern (including within
+    groups) are considered, as these are required for the pattern to match.
+
+    Args:
+        regex (re.Pattern): Compiled regular expression
+
+    Returns:
+        (str | None): The required literal, or None if there is no such literal
+    """
+    if regex.flags & re.VERBOSE:
+        return None
+
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+
+    longest = ""
+    cur = []
+    for token in _literal_tokens(parsed, bool(regex.flags & re.IGNORECASE)):
+        if token is _break:
+            cur = []
+        else:
+            cur.append(token)
+            if len(cur) > len(longest):
+                longest = "".join(cur)
+    return longest or None
+
+
+@functools.lru_cache(maxsize=1024)
+def _prefilter(regexes):
+    """Build (with caching) a regex finding any required literal of regexes
+
+    Experiments of the same application usually analyze their logs with the
+    same regexes, so the prefilter is only built once for all of them.
+
+    Args:
+        regexes (tuple): Compiled regular expressions
+
+    Returns:
+        (re.Pattern | None): The prefilter, or None if lines cannot be filtered
+    """
+    literals = set()
+    for regex in regexes:
+        literal = required_literal(regex)
+        if literal is None:
+            return None
+        literals.add(literal)
+
+    if not literals:
+        return None
+
+    ordered = sorted(literals, key=len, reverse=True)
+    return re.compile("|".join(re.escape(lit) for lit in ordered))
+
+
+class LogScanner:
+    """Yield the lines of a file which could match any of a set of regexes
+
+    If any of the regular expressions has no required literal, every line is
+    yielded.
+    """
+
+    def __init__(self, regexes, chunk_size=None):
+        self.chunk_size = chunk_size if chunk_size else scan_chunk_size
+        self.prefilter = _prefilter(tuple(regexes))
+
+    def lines(self, f):
+        """Yield candidate lines of an open file, in order
+
+        Lines are identical to those produced by iterating over the file.
+        """
+        if self.prefilter is None:
+            yield from f
+            return
+
+        search = self.prefilter.search
+        remainder = ""
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                break
+
+            buf = remainder + chunk
+            end = buf.rfind("\n") + 1
+            remainder = buf[end:]
+            yield from self._candidates(buf, end, search)
+
+        if remainder:
+            yield from self._candidates(remainder, len(remainder), search)
+
+    @staticmethod
+    def _candidates(buf, end, search):
+        pos = 0
+        while pos < end:
+            hit = search(buf, pos, end)
+            if hit is None:
+                return
+            start = buf.rfind("\n", 0, hit.start()) + 1
+            line_end = buf.find("\n", hit.start(), end)
+            line_end = end if line_end == -1 else line_end + 1
+            yield buf[start:line_end]
+            pos = line_end
@@ -85,7 +85,7 @@ __UNABLE_TO_VERIFY_SSL = (lambda pyver: ((pyver < (2, 7, 9)) or ((3,) < pyver <
 )
 
 
-def read_from_url(url, accept_content_type=None):
+def read_from_url(url, accept_content_type=None, headers=None):
     url = url_util.parse(url)
     context = None
 
@@ -114,7 +114,10 @@ def read_from_url(url, accept_content_type=None):
     url = url_util.format(url)
     if sys.platform == "win32" and url_scheme == "file":
         url = convert_to_posix_path(url)
-    req = Request(url, headers={"User-Agent": SPACK_USER_AGENT})
+    request_headers = {"User-Agent": SPACK_USER_AGENT}
+    if headers:
+        request_headers.update(headers)
+    req = Request(url, headers=request_headers)
 
     content_type = None
     is_web_url = url_scheme in ("http", "https")
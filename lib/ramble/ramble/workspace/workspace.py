@@ -29,6 +29,10 @@ import ramble.context
 import ramble.util.web
 import ramble.fetch_strategy
 import ramble.util.install_cache
+import ramble.util.file_cache
+import ramble.util.experiment_index
+import ramble.results_store
+import ramble.results_writer
 import ramble.success_criteria
 import ramble.keywords
 import ramble.software_environments
@@ -408,6 +412,8 @@ class Workspace:
         self.txlock = lk.Lock(self._transaction_lock_path)
         self.dry_run = dry_run
         self.repeat_success_strict = True
+        self.incremental_analysis = True
+        self.results_raw_variables = "keep"
 
         self.read_default_template = read_default_template
         self.configs = ramble.config.ConfigScope("workspace", self.config_dir)
@@ -421,6 +427,8 @@ class Workspace:
         self.input_mirror_cache = None
         self.software_mirror_cache = None
         self.software_environments = None
+        self.archiver = None
+        self._latest_archive = None
         self.metadata = syaml.syaml_dict()
         self.hash_inventory = {"experiments": [], "versions": []}
 
@@ -441,6 +449,8 @@ class Workspace:
         self.config_sections = {}
 
         self.install_cache = ramble.util.install_cache.SetCache()
+        self._persistent_install_cache = None
+        self._experiment_index = None
 
         # A per-package_manager dict mapping package spec to its install prefix.
         # This can be re-used by all experiments of the workspace.
@@ -1439,11 +1449,16 @@ ramble:
 
         return res
 
+    def _prepare_result(self, result):
+        if self.results_raw_variables == "drop":
+            return ramble.results_writer.without_raw_variables(result, None)
+        return result
+
     def append_result(self, result):
         if not self.results:
             self.results = self.default_results()
 
-        self.results["experiments"].append(result)
+        self.results["experiments"].append(self._prepare_result(result))
 
     def insert_result(self, result, insert_before_exp):
         """Insert a result before a specified experiment"""
@@ -1457,6 +1472,7 @@ ramble:
         if not self.results:
             self.results = self.default_results()
 
+        result = self._prepare_result(result)
         insert_index = search_exp_index(self.results["experiments"], insert_before_exp)
 
         tty.debug(f"Attempting to insert result before experiment {insert_before_exp}")
@@ -1555,20 +1571,31 @@ ramble:
 
             self.simlink_result(filename_base, latest_base, file_extension)
 
-        if "json" in output_formats:
-            file_extension = ".json"
-            out_file = os.path.join(self.root, filename_base + file_extension)
-            results_written.append(out_file)
-            with open(out_file, "w+") as f:
-                sjson.dump(results, f)
-            self.simlink_result(filename_base, latest_base, file_extension)
+        header = {key: value for key, value in results.items() if key != "experiments"}
+        experiments = results.get("experiments", [])
+        shared_raw_variables = None
+        if self.results_raw_variables == "dedupe":
+            shared_raw_variables = ramble.results_writer.shared_raw_variables(experiments)
+            if shared_raw_variables:
+                header[ramble.results_writer.shared_raw_variables_key] = shared_raw_variables
+
+        # Results are serialized one experiment at a time, to limit the memory
+        # used for large workspaces
+        for output_format, writer_cls in ramble.results_writer.writers.items():
+            if output_format not in output_formats:
+                continue
 
-        if "yaml" in output_formats:
-            file_extension = ".yaml"
+            file_extension = writer_cls.extension
             out_file = os.path.join(self.root, filename_base + file_extension)
             results_written.append(out_file)
             with open(out_file, "w+") as f:
-                syaml.dump(results, stream=f)
+                with writer_cls(f, header) as writer:
+                    for result in experiments:
+                        if shared_raw_variables:
+                            result = ramble.results_writer.without_raw_variables(
+                                result, shared_raw_variables
+                            )
+                        writer.write(result)
             self.simlink_result(filename_base, latest_base, file_extension)
 
         if not results_written:
@@ -1672,7 +1699,7 @@ ramble:
 
     @property
     def latest_archive(self):
-        if hasattr(self, "_latest_archive") and self._latest_archive:
+        if self._latest_archive:
             return self._latest_archive
 
         if os.path.exists(self.archive_dir):
@@ -1690,6 +1717,10 @@ ramble:
 
         return None
 
+    def set_latest_archive(self, archive_name):
+        """Record the name of the archive most recently created for this workspace"""
+        self._latest_archive = archive_name
+
     def date_string(self):
         now = datetime.datetime.now()
         return now.strftime("%Y-%m-%d_%H.%M.%S")
@@ -2001,11 +2032,54 @@ ramble:
         if self._previous_active:
             activate(self._previous_active)
 
-    def check_cache(self, tupl):
+    @property
+    def persistent_install_cache(self):
+        """Install cache which is kept across ramble invocations"""
+        if self._persistent_install_cache is None:
+            file_cache = ramble.util.file_cache.FileCache(
+                os.path.join(self.internal_subdir, "install_cache")
+            )
+            self._persistent_install_cache = ramble.util.install_cache.PersistentSetCache(
+                file_cache
+            )
+        return self._persistent_install_cache
+
+    @property
+    def experiment_index(self):
+        """Index of the status, inventory, and analysis records of experiments"""
+        if self._experiment_index is None:
+            self._experiment_index = ramble.util.experiment_index.ExperimentIndex(
+                os.path.join(self.internal_subdir, "experiment_index.jsonl")
+            )
+        return self._experiment_index
+
+    @property
+    def results_store(self):
+        """Store of the results of every analysis of this workspace"""
+        fs.mkdirp(self.internal_subdir)
+        return ramble.results_store.ResultsStore(
+            os.path.join(self.internal_subdir, "results.sqlite")
+        )
+
+    def check_cache(self, tupl, persistent=False):
+        """Test if an entry is in the install cache
+
+        Args:
+            tupl (tuple): Entry to look up
+            persistent (bool): Whether to use the cache that is kept across
+                               ramble invocations. Its entries should be keyed
+                               by content fingerprints, rather than by paths.
+        """
+        if persistent:
+            return self.persistent_install_cache.contains(tupl)
         return self.install_cache.contains(tupl)
 
-    def add_to_cache(self, tupl):
-        self.install_cache.add(tupl)
+    def add_to_cache(self, tupl, persistent=False):
+        """Add an entry to the install cache (see check_cache)"""
+        if persistent:
+            self.persistent_install_cache.add(tupl)
+        else:
+            self.install_cache.add(tupl)
 
 
 def read(name):
@@ -2082,7 +2156,7 @@ def no_active_workspace():
 def _filter_results(results, summary_only):
     if not summary_only or "experiments" not in results:
         return results
-    results = copy.deepcopy(results)
+    results = dict(results)
     results["experiments"] = [r for r in results["experiments"] if r["N_REPEATS"] > 0]
     return results
 
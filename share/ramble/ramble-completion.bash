@@ -532,7 +532,7 @@ _ramble_mods() {
 }
 
 _ramble_on() {
-    RAMBLE_COMPREPLY="-h --help --executor --enable-per-experiment-prints --suppress-run-header --where --exclude-where --filter-tags"
+    RAMBLE_COMPREPLY="-h --help --executor --enable-per-experiment-prints --suppress-run-header --batch --batch-size --where --exclude-where --filter-tags -j --jobs --cores"
 }
 
 _ramble_python() {
@@ -598,7 +598,7 @@ _ramble_results() {
     then
         RAMBLE_COMPREPLY="-h --help"
     else
-        RAMBLE_COMPREPLY="upload"
+        RAMBLE_COMPREPLY="upload query"
     fi
 }
 
@@ -611,6 +611,10 @@ _ramble_results_upload() {
     fi
 }
 
+_ramble_results_query() {
+    RAMBLE_COMPREPLY="-h --help --fom --where --group-by --aggregate --last --format --store"
+}
+
 _ramble_software_definitions() {
     RAMBLE_COMPREPLY="-h --help -s --summary -c --conflicts -e --error-on-conflict"
 }
@@ -652,7 +656,7 @@ _ramble_workspace_activate() {
 }
 
 _ramble_workspace_archive() {
-    RAMBLE_COMPREPLY="-h --help --tar-archive -t --prefix -p --upload-url -u --include-secrets --phases --include-phase-dependencies --where --exclude-where"
+    RAMBLE_COMPREPLY="-h --help --tar-archive -t --tar-only --compression --incremental -i --restore --prefix -p --upload-url -u --include-secrets --phases --include-phase-dependencies --where --exclude-where -j --jobs"
 }
 
 _ramble_workspace_deactivate() {
@@ -673,11 +677,11 @@ _ramble_workspace_concretize() {
 }
 
 _ramble_workspace_setup() {
-    RAMBLE_COMPREPLY="-h --help --dry-run --phases --include-phase-dependencies --where --exclude-where --filter-tags"
+    RAMBLE_COMPREPLY="-h --help --dry-run --phases --include-phase-dependencies --where --exclude-where --filter-tags -j --jobs"
 }
 
 _ramble_workspace_analyze() {
-    RAMBLE_COMPREPLY="-h --help -f --formats -u --upload -p --print-results -s --summary-only --phases --include-phase-dependencies --where --exclude-where --filter-tags"
+    RAMBLE_COMPREPLY="-h --help -f --formats -u --upload -p --print-results -s --summary-only --reanalyze --raw-variables --phases --include-phase-dependencies --where --exclude-where --filter-tags -j --jobs"
 }
 
 _ramble_workspace_push_to_cache() {
@@ -8,6 +8,7 @@
 
 from ramble.pkgmankit import *  # noqa: F403
 
+import json
 import os
 import re
 import shutil
@@ -500,6 +501,8 @@ spack_namespace = "spack"
 
 package_name_regex = re.compile(r"[\s-]*(?P<package_name>[\w][\w-]+).*")
 
+spec_name_regex = re.compile(r"(?P<name>[a-zA-Z0-9\-_]+).*")
+
 
 class SpackRunner(ramble.util.command_runner.CommandRunner):
     """Runner for executing several spack commands
@@ -1094,6 +1097,100 @@ class SpackRunner(ramble.util.command_runner.CommandRunner):
 
         return self.hash
 
+    def install_fingerprint(self):
+        """
+        Fingerprint of the content an install of the environment depends on
+
+        This combines the digests of the environment's spack.yaml and
+        spack.lock files with the install flags, and the spack instance and
+        install tree the environment is installed with.
+
+        This command requires an active spack environment.
+
+        Returns:
+            (str | None): The fingerprint, or None if the environment is
+                          not concretized.
+        """
+        self._check_active()
+
+        env_file = os.path.join(self.env_path, "spack.yaml")
+        lock_file = os.path.join(self.env_path, "spack.lock")
+        if not (os.path.isfile(env_file) and os.path.isfile(lock_file)):
+            return None
+
+        install_flags = ramble.config.get(f"{self.install_config_name}:flags")
+
+        return ramble.util.hashing.hash_json(
+            {
+                "spack.yaml": ramble.util.hashing.hash_file(env_file),
+                "spack.lock": ramble.util.hashing.hash_file(lock_file),
+                "flags": install_flags if install_flags is not None else "",
+                "spack_dir": self.spack_dir,
+                "install_root": self.install_root(),
+            }
+        )
+
+    def install_root(self):
+        """
+        Root of the install tree, as configured for the active environment
+
+        Returns:
+            (str | None): The configured root, or None if it is not known
+        """
+        output = self.execute(
+            self.spack, ["config", "get", "config"], return_output=True
+        )
+        if output is None:
+            return None
+
+        try:
+            install_tree = syaml.load(output)["config"]["install_tree"]
+        except (syaml.SpackYAMLError, KeyError, TypeError):
+            return None
+
+        # Older versions of spack configure the root directly
+        if isinstance(install_tree, dict):
+            install_tree = install_tree.get("root")
+        return str(install_tree) if install_tree is not None else None
+
+    def roots_installed(self):
+        """
+        Whether every root spec of the environment's spack.lock is installed
+
+        The installed specs of the environment, and their prefixes, are
+        listed with a single spack invocation. Roots are only considered
+        installed while their install prefix exists.
+
+        This command requires an active spack environment.
+        """
+        self._check_active()
+
+        lock_file = os.path.join(self.env_path, "spack.lock")
+        try:
+            with open(lock_file) as f:
+                root_hashes = [
+                    root["hash"] for root in json.load(f).get("roots", [])
+                ]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+        output = self.execute(
+            self.spack, ["find", "--format={hash} {prefix}"], return_output=True
+        )
+        if output is None:
+            return False
+
+        prefixes = {}
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) == 2 and os.path.isabs(parts[1]):
+                prefixes[parts[0]] = parts[1]
+
+        return all(
+            root_hash in prefixes and os.path.isdir(prefixes[root_hash])
+            for root_hash in root_hashes
+        )
+
     def install(self):
         """
         Install spack packages that have been added to an environment.
@@ -1111,9 +1208,59 @@ class SpackRunner(ramble.util.command_runner.CommandRunner):
 
         self.execute(self.installer, args)
 
+    def get_package_paths(self, package_specs):
+        """Return the names and installation directories of several packages
+
+        All packages are looked up with a single spack invocation. Packages
+        which cannot be unambiguously matched to the output (e.g. because the
+        environment contains several packages with the same name) are
+        resolved individually using get_package_path.
+
+        Args:
+            package_specs (list(str)): Package specs to resolve
+
+        Returns:
+            (dict): Mapping of each package spec to a (name, location) tuple
+        """
+        spec_names = {}
+        find_args = ["find", "--format={name} {prefix}"]
+        for package_spec in package_specs:
+            spec_args = shlex.split(package_spec)
+            name_match = spec_name_regex.match(spec_args[0])
+            spec_names[package_spec] = (
+                name_match.group("name") if name_match else None
+            )
+            find_args.extend(spec_args)
+
+        locations = {}
+        duplicates = set()
+        output = None
+        if len(package_specs) > 1:
+            output = self.execute(self.spack, find_args, return_output=True)
+
+        if output is not None:
+            for line in output.splitlines():
+                parts = line.split()
+                if len(parts) != 2 or not os.path.isabs(parts[1]):
+                    continue
+                name, location = parts
+                if name in locations and locations[name] != location:
+                    duplicates.add(name)
+                locations[name] = location
+
+        package_paths = {}
+        for package_spec in package_specs:
+            name = spec_names[package_spec]
+            if name in locations and name not in duplicates:
+                package_paths[package_spec] = (name, locations[name])
+            else:
+                package_paths[package_spec] = self.get_package_path(
+                    package_spec
+                )
+        return package_paths
+
     def get_package_path(self, package_spec):
         """Return the installation directory for a package"""
-        name_regex = re.compile(r"(?P<name>[a-zA-Z0-9\-_]+).*")
         loc_args = ["location", "-i"]
         loc_args.extend(shlex.split(package_spec))
 
@@ -1125,7 +1272,7 @@ class SpackRunner(ramble.util.command_runner.CommandRunner):
 
         if name is None:
             name = shlex.split(package_spec)[0]
-            name_match = name_regex.match(name)
+            name_match = spec_name_regex.match(name)
             if name_match:
                 name = name_match.group("name")
         else:
@@ -577,3 +577,83 @@ def test_multiword_args(tmpdir, capsys):
             assert "package_path=-multiword -args" in captured.out
     except RunnerError as e:
         pytest.skip("%s" % e)
+
+
+def test_get_package_paths_single_invocation(tmpdir, monkeypatch):
+    try:
+        sr = SpackRunner(dry_run=True)
+        find_output = "zlib /opt/zlib-1.3\ngcc /opt/gcc-12\ngcc /opt/gcc-13\n"
+        calls = []
+
+        def mock_execute(executable, args, return_output=False):
+            calls.append(args)
+            if args[0] == "find" and len(calls) == 1:
+                return find_output
+            return None
+
+        monkeypatch.setattr(sr, "execute", mock_execute)
+
+        paths = sr.get_package_paths(["zlib@1.3", "gcc@12", "hdf5+mpi"])
+
+        assert paths["zlib@1.3"] == ("zlib", "/opt/zlib-1.3")
+        # Ambiguous and missing packages are resolved individually
+        assert paths["gcc@12"] == (
+            "gcc",
+            os.path.join("dry-run", "path", "to", "gcc@12"),
+        )
+        assert paths["hdf5+mpi"][0] == "hdf5"
+        assert calls[0] == [
+            "find",
+            "--format={name} {prefix}",
+            "zlib@1.3",
+            "gcc@12",
+            "hdf5+mpi",
+        ]
+        assert len(calls) == 5
+    except RunnerError as e:
+        pytest.skip("%s" % e)
+
+
+def test_roots_installed(tmpdir, monkeypatch):
+    try:
+        sr = SpackRunner(dry_run=True)
+        sr.env_path = str(tmpdir)
+        sr.active = True
+        with open(os.path.join(sr.env_path, "spack.lock"), "w") as f:
+            f.write('{"roots": [{"hash": "abc", "spec": "zlib"}]}')
+
+        prefix = tmpdir.mkdir("zlib-abc")
+        find_output = f"abc {prefix}\ndef /missing/prefix\n"
+        monkeypatch.setattr(
+            sr,
+            "execute",
+            lambda executable, args, return_output=False: find_output,
+        )
+        assert sr.roots_installed()
+
+        # Removed prefixes, and roots missing from spack's database, are not installed
+        prefix.remove()
+        assert not sr.roots_installed()
+        find_output = "def /missing/prefix\n"
+        assert not sr.roots_installed()
+    except RunnerError as e:
+        pytest.skip("%s" % e)
+
+
+def test_install_root(monkeypatch):
+    try:
+        sr = SpackRunner(dry_run=True)
+        outputs = {
+            "config:\n  install_tree:\n    root: /opt/spack\n": "/opt/spack",
+            "config:\n  install_tree: /old/spack\n": "/old/spack",
+            "config: {}\n": None,
+        }
+        for output, expected in outputs.items():
+            monkeypatch.setattr(
+                sr,
+                "execute",
+                lambda executable, args, return_output=False: output,
+            )
+            assert sr.install_root() == expected
+    except RunnerError as e:
+        pytest.skip("%s" % e)
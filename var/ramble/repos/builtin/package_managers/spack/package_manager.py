@@ -54,7 +54,27 @@ class Spack(SpackLightweight):
             logger.msg("Installing software")
 
             self.runner.activate()
+
+            # Skip environments which were installed by a previous run, have
+            # not changed since, and are still installed.
+            install_tupl = None
+            if not workspace.dry_run:
+                fingerprint = self.runner.install_fingerprint()
+                if fingerprint is not None:
+                    install_tupl = ("spack-install", env_path, fingerprint)
+                    if workspace.check_cache(
+                        install_tupl, persistent=True
+                    ) and self.runner.roots_installed():
+                        logger.msg(
+                            f"Environment {env_path} is already installed. "
+                            "Skipping install..."
+                        )
+                        return
+
             self.runner.install()
+
+            if install_tupl is not None:
+                workspace.add_to_cache(install_tupl, persistent=True)
         except RunnerError as e:
             logger.die(e)
 
@@ -127,16 +147,18 @@ class Spack(SpackLightweight):
 
                 self.runner.activate()
 
+                # Resolve all packages of the environment at once, to avoid
+                # starting spack several times per package.
+                package_paths = self.runner.get_package_paths(unresolved_specs)
+                cache.update(package_paths)
+
                 for pkg_spec in unresolved_specs:
-                    spack_pkg_name, pkg_path = self.runner.get_package_path(
-                        pkg_spec
-                    )
+                    spack_pkg_name, pkg_path = package_paths[pkg_spec]
                     if f"{spack_pkg_name}_path" not in self.app_inst.variables:
                         self.app_inst.define_variable(spack_pkg_name, pkg_path)
                         self.app_inst.define_variable(
                             f"{spack_pkg_name}_path", pkg_path
                         )
-                        cache[pkg_spec] = (spack_pkg_name, pkg_path)
                     else:
                         logger.msg(
                             f"Variable {spack_pkg_name} defined. "